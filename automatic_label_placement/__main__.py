@@ -0,0 +1,3 @@
+from automatic_label_placement.cli import main
+
+main()
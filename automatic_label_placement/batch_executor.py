@@ -0,0 +1,211 @@
+import random
+import timeit
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, List, Optional, Sequence
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    generate_random_points,
+    calculate_overlaps,
+)
+from automatic_label_placement.solver import algorithms
+
+
+if TYPE_CHECKING:
+    from automatic_label_placement.instance_cache import InstanceCache
+
+
+class Instance:
+    """A label placement instance, given by a seed or by explicit point coordinates."""
+
+    __slots__ = ("seed_value", "xs", "ys", "selected")
+
+    def __init__(
+        self,
+        seed_value: Optional[int] = None,
+        xs: Optional[Sequence[float]] = None,
+        ys: Optional[Sequence[float]] = None,
+        selected: Optional[Sequence[bool]] = None,
+    ):
+        """
+        Args:
+            seed_value: Seed value to generate the random points from.
+            xs: X-coordinates of explicit points.
+            ys: Y-coordinates of explicit points.
+            selected: For each explicit point, whether it gets a label.
+        """
+
+        if (seed_value is None) == (xs is None):
+            raise ValueError(
+                "An instance needs either a seed value or explicit points."
+            )
+        if xs is not None and not len(xs) == len(ys) == len(selected):
+            raise ValueError("xs, ys and selected must have the same length.")
+
+        self.seed_value = seed_value
+        self.xs = xs
+        self.ys = ys
+        self.selected = selected
+
+
+class BatchResult:
+    """Placement and timings of one instance of a batch."""
+
+    __slots__ = ("index", "num_overlaps", "positions", "solve_time", "total_time")
+
+    def __init__(
+        self,
+        index: int,
+        num_overlaps: int,
+        positions: List[int],
+        solve_time: float,
+        total_time: float,
+    ):
+        """
+        Args:
+            index: The index of the instance in the submitted batch.
+            num_overlaps: The number of overlaps of the placement.
+            positions: The position index of every label.
+            solve_time: Seconds spent in the algorithm.
+            total_time: Seconds spent on the instance, including loading the points.
+        """
+
+        self.index = index
+        self.num_overlaps = num_overlaps
+        self.positions = positions
+        self.solve_time = solve_time
+        self.total_time = total_time
+
+
+def _solve_instance(task: tuple) -> BatchResult:
+    """Solve one instance of a batch in a worker process.
+
+    Args:
+        task: A tuple (index, seed_value, shm_name, offset, num_points, rng_seed,
+            algorithm, options, cache). Explicit points are read from the shared memory
+            block shm_name, where they are stored as num_points x-coordinates,
+            y-coordinates and selection flags starting at offset. Seeded instances are
+            loaded from the InstanceCache cache, together with their ConflictGraph, if
+            it is not None.
+
+    Returns:
+        The BatchResult of the instance.
+    """
+
+    (
+        index,
+        seed_value,
+        shm_name,
+        offset,
+        num_points,
+        rng_seed,
+        algorithm,
+        options,
+        cache,
+    ) = task
+    start_time = timeit.default_timer()
+
+    if seed_value is not None and cache is not None:
+        instance = cache.load(seed_value)
+        points = instance.points
+        options = dict(options, graph=instance.graph)
+    elif seed_value is not None:
+        points = generate_random_points(seed_value)
+    else:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            with shm.buf.cast("d") as values:
+                xs = values[offset : offset + num_points].tolist()
+                ys = values[offset + num_points : offset + 2 * num_points].tolist()
+                selected = values[
+                    offset + 2 * num_points : offset + 3 * num_points
+                ].tolist()
+        finally:
+            shm.close()
+
+        points = [Point(x, y, flag != 0) for x, y, flag in zip(xs, ys, selected)]
+
+    solve_start_time = timeit.default_timer()
+    boxes = algorithms[algorithm](points, **dict(options, rng=random.Random(rng_seed)))
+    end_time = timeit.default_timer()
+
+    return BatchResult(
+        index,
+        calculate_overlaps(points, boxes),
+        [box.position for box in boxes],
+        end_time - solve_start_time,
+        end_time - start_time,
+    )
+
+
+def run_batch(
+    instances: Sequence[Instance],
+    algorithm: str = "greedy",
+    max_workers: Optional[int] = None,
+    cache: Optional["InstanceCache"] = None,
+    **options,
+) -> List[BatchResult]:
+    """Solve many independent instances on a pool of worker processes.
+
+    Explicit point coordinates are copied once into a shared memory block that the
+    workers read from, so only small task tuples are pickled.
+
+    Args:
+        instances: The instances to solve.
+        algorithm: "greedy", "local_search" or "simulated_annealing" (default greedy).
+        max_workers: Number of worker processes (default the number of CPUs).
+        cache: An InstanceCache the workers load seeded instances from; the workers
+            map the same files, so they share the pages of repeated seeds (default
+            None).
+        **options: Keyword arguments passed on to the solve function of the algorithm.
+
+    Returns:
+        The results, in the order the instances were submitted.
+    """
+
+    if algorithm not in algorithms:
+        raise ValueError(
+            f"Unknown algorithm {algorithm!r}, expected one of {list(algorithms)}."
+        )
+
+    values = array("d")
+    offsets = []
+    for instance in instances:
+        offsets.append(len(values))
+        if instance.seed_value is None:
+            values.extend(instance.xs)
+            values.extend(instance.ys)
+            values.extend(1.0 if flag else 0.0 for flag in instance.selected)
+
+    shm = None
+    if values:
+        shm = shared_memory.SharedMemory(
+            create=True, size=values.itemsize * len(values)
+        )
+        shm.buf[: values.itemsize * len(values)] = memoryview(values).cast("B")
+
+    tasks = [
+        (
+            index,
+            instance.seed_value,
+            shm.name if shm is not None else None,
+            offsets[index],
+            len(instance.xs) if instance.xs is not None else 0,
+            # Every instance gets its own reproducible random stream
+            instance.seed_value if instance.seed_value is not None else index,
+            algorithm,
+            options,
+            cache,
+        )
+        for index, instance in enumerate(instances)
+    ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_solve_instance, tasks))
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,94 @@
+import time
+from typing import Optional
+
+
+class Budget:
+    """Wall-clock and iteration budget of an anytime search.
+
+    The time limit runs from the creation of the budget. A search asks next_iteration
+    before each of its iterations and stops once it returns False; inside long
+    iterations it polls expired, which only reads the clock every check_interval calls
+    unless the calls stand for more work, as the greedy placements' do. A search that
+    stops because of its budget leaves exhausted set, so the placement it returns is
+    the best found so far but has not converged.
+    """
+
+    __slots__ = (
+        "deadline",
+        "max_iterations",
+        "check_interval",
+        "iterations",
+        "exhausted",
+        "countdown",
+    )
+
+    def __init__(
+        self,
+        time_limit: Optional[float] = None,
+        max_iterations: Optional[int] = None,
+        check_interval: int = 256,
+    ):
+        """
+        Args:
+            time_limit: Seconds the search may run for (default None, unlimited).
+            max_iterations: Number of iterations the search may run (default None,
+                unlimited).
+            check_interval: Number of calls of expired between two reads of the
+                clock (default 256).
+        """
+
+        self.deadline = (
+            time.perf_counter() + time_limit if time_limit is not None else None
+        )
+        self.max_iterations = max_iterations
+        self.check_interval = check_interval
+        self.iterations = 0
+        self.exhausted = False
+        self.countdown = check_interval
+
+    def next_iteration(self, num_iterations: int = 1) -> bool:
+        """Count the next iteration if the budget allows it.
+
+        Args:
+            num_iterations: Number of iterations the next step of the search runs
+                (default 1).
+
+        Returns:
+            True if the search may run the iterations, False once the budget is used up.
+        """
+
+        if (
+            self.exhausted
+            or self.max_iterations is not None
+            and self.iterations >= self.max_iterations
+            or self.deadline is not None
+            and time.perf_counter() >= self.deadline
+        ):
+            self.exhausted = True
+            return False
+
+        self.iterations += num_iterations
+        return True
+
+    def expired(self, work: int = 1) -> bool:
+        """Whether the time limit has passed, checked cheaply from within an iteration.
+
+        Args:
+            work: Number of calls of expired this call stands for; check_interval or
+                more reads the clock on every call (default 1).
+
+        Returns:
+            True once the deadline has been seen to pass.
+        """
+
+        if self.exhausted:
+            return True
+
+        self.countdown -= work
+        if self.countdown > 0:
+            return False
+
+        self.countdown = self.check_interval
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        return self.exhausted
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import random
+from typing import Optional, Sequence
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Place the labels of a generated or loaded point set and report the overlaps."""
+
+    parser = argparse.ArgumentParser(
+        prog="automatic-label-placement", description=main.__doc__
+    )
+    parser.add_argument(
+        "--algorithm",
+        default="greedy",
+        help="greedy, local_search or simulated_annealing (default greedy)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="default the first configured seed"
+    )
+    parser.add_argument("--config", default=None, help="config file to read instead")
+    parser.add_argument(
+        "--points",
+        default=None,
+        help="csv or binary point file to label instead of generated points",
+    )
+    parser.add_argument("--output", default=None, help="svg file to write")
+    parser.add_argument("--preview", default=None, help="PNG overview to write")
+    parser.add_argument("--open", action="store_true", help="open the svg file")
+    parser.add_argument(
+        "--export",
+        default=None,
+        help="placement file to write: .csv, .geojson or else the binary format",
+    )
+    parser.add_argument(
+        "--initial",
+        default=None,
+        help="exported placement (.csv, .geojson or binary) to start the search from",
+    )
+    parser.add_argument(
+        "--decompose",
+        action="store_true",
+        help="solve the connected components of the labels independently",
+    )
+    parser.add_argument(
+        "--partition",
+        action="store_true",
+        help="solve tiles of the area in parallel and repair the seams",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=None, help="seconds the search may run"
+    )
+    parser.add_argument(
+        "--max-iterations",
+        type=int,
+        default=None,
+        help="iterations the search may run",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="print the result and stats as JSON"
+    )
+    args = parser.parse_args(argv)
+
+    # Nothing is loaded before the arguments are known, so --config still applies
+    from automatic_label_placement import config_reader
+
+    if args.config is not None:
+        config_reader.config_path = args.config
+
+    from automatic_label_placement.budget import Budget
+    from automatic_label_placement.instrumentation import Stats
+    from automatic_label_placement.label_placement_utils import generate_random_points
+    from automatic_label_placement.solver import solve
+
+    seed_value = args.seed if args.seed is not None else config_reader.seeds[0]
+    stats = Stats() if args.stats else None
+    budget = (
+        Budget(args.time_limit, args.max_iterations)
+        if args.time_limit is not None or args.max_iterations is not None
+        else None
+    )
+    if args.points is not None:
+        from automatic_label_placement.point_loader import load_points
+
+        try:
+            points = load_points(args.points)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    else:
+        points = generate_random_points(seed_value)
+
+    # The components of decompose and the tiles of partition are seeded from this rng
+    options = {"rng": random.Random(seed_value)}
+    if args.initial is not None:
+        from automatic_label_placement.placement_export import load_positions
+
+        if args.algorithm == "greedy":
+            parser.error("--initial needs local_search or simulated_annealing")
+        try:
+            options["initial_positions"] = load_positions(args.initial)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    try:
+        result = solve(
+            points,
+            args.algorithm,
+            stats,
+            decompose=args.decompose,
+            budget=budget,
+            partition=args.partition,
+            **options,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.output is not None:
+        result.save_svg(args.output, points)
+        if args.open:
+            import webbrowser
+
+            webbrowser.open(f"file://{os.path.abspath(args.output)}")
+    if args.preview is not None:
+        result.save_preview(args.preview, points)
+    if args.export is not None:
+        from automatic_label_placement import placement_export
+
+        suffix = os.path.splitext(args.export)[1].lower()
+        if suffix == ".csv":
+            placement_export.write_csv(args.export, points, result)
+        elif suffix in (".geojson", ".json"):
+            placement_export.write_geojson(args.export, points, result)
+        else:
+            placement_export.write_placement(args.export, result)
+
+    if args.stats:
+        print(json.dumps(result.as_dict(), indent=2))
+    else:
+        print(f"Numer of overlaps from {args.algorithm}: {result.num_overlaps}")
+        if not result.converged:
+            print("Stopped by the budget before converging")
+
+
+if __name__ == "__main__":
+    main()
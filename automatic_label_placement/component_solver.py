@@ -0,0 +1,206 @@
+import random
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import Point, LabelBox
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.instrumentation import Stats, phase
+from automatic_label_placement.partitioned_solver import halo_margins, points_near
+from automatic_label_placement.solver import algorithms
+
+
+def label_components(graph: ConflictGraph) -> List[List[int]]:
+    """Find the connected components of the labels of a conflict graph.
+
+    Two labels are connected when a candidate box of one overlaps a candidate box of the
+    other. Labels of different components can never overlap, whatever their positions.
+
+    Args:
+        graph: The ConflictGraph of the points.
+
+    Returns:
+        The labels of every component in increasing order, with the components ordered
+        by their first label.
+    """
+
+    num_positions = graph.num_positions
+    component_of = [-1] * graph.num_labels
+    components = []
+
+    for start in range(graph.num_labels):
+        if component_of[start] >= 0:
+            continue
+
+        component_of[start] = len(components)
+        component = [start]
+        stack = [start]
+        while stack:
+            label = stack.pop()
+            for position in graph.valid_positions(label):
+                for other in graph.neighbours[graph.node(label, position)]:
+                    other_label = other // num_positions
+                    if component_of[other_label] < 0:
+                        component_of[other_label] = len(components)
+                        component.append(other_label)
+                        stack.append(other_label)
+
+        components.append(sorted(component))
+
+    return components
+
+
+def _solve_component(task: tuple) -> tuple:
+    """Solve the labels of one component, in a worker process or in-process.
+
+    Args:
+        task: A tuple (coordinates, rng_seed, algorithm, options), where coordinates
+            holds (x, y, selected) for the points of the component and the points
+            around them; only the points of the component's labels are selected.
+
+    Returns:
+        A tuple (positions, solve_time) with the position of every label of the
+        component, in the order of its points.
+    """
+
+    coordinates, rng_seed, algorithm, options = task
+    points = [Point(x, y, selected) for x, y, selected in coordinates]
+
+    start_time = timeit.default_timer()
+    boxes = algorithms[algorithm](points, **dict(options, rng=random.Random(rng_seed)))
+    solve_time = timeit.default_timer() - start_time
+
+    return [box.position for box in boxes], solve_time
+
+
+def component_solve(
+    points: List[Point],
+    algorithm: str = "greedy",
+    max_workers: Optional[int] = None,
+    min_parallel_components: int = 8,
+    seed_value: int = 0,
+    stats: Optional[Stats] = None,
+    rng: Optional[random.Random] = None,
+    **options,
+) -> List[LabelBox]:
+    """Solve the connected components of the labels independently.
+
+    A label without any possible overlap with another label is put at its cheapest
+    position straight away, the lowest position index winning ties. Every other
+    component is solved as its own instance, made of its labels and the points around
+    them as obstacles. With at least min_parallel_components such components they are
+    solved concurrently on a process pool. Every component gets its own random stream
+    seeded from rng, or from seed_value without one, so the result does not depend on
+    the number of workers. The components build their own instances, so a graph cannot
+    be passed on.
+
+    Args:
+        points: A list of Point objects.
+        algorithm: The algorithm that solves each component, a key of
+            solver.algorithms (default greedy).
+        max_workers: Number of worker processes (default the number of CPUs).
+        min_parallel_components: Solve the components in-process below this number
+            of components with more than one label (default 8).
+        seed_value: Seed of the random streams of the components when no rng is
+            given (default 0).
+        stats: Stats to record the decompose and optimise phases, the number of
+            components and a "components" record per component in (default None).
+        rng: The random number generator to draw the seeds of the components from
+            (default a random.Random seeded with seed_value).
+        **options: Keyword arguments passed on to the solve function of the algorithm.
+
+    Raises:
+        ValueError: If the algorithm is unknown or a graph is passed.
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    if algorithm not in algorithms:
+        raise ValueError(
+            f"Unknown algorithm {algorithm!r}, expected one of {list(algorithms)}."
+        )
+    if options.get("graph") is not None:
+        raise ValueError("A graph cannot be combined with decompose.")
+
+    with phase(stats, "decompose"):
+        graph = ConflictGraph(points)
+        components = label_components(graph)
+        placement = [-1] * graph.num_labels
+
+        for component in components:
+            if len(component) == 1:
+                placement[component[0]] = graph.cheapest_position(component[0])
+
+        point_of = [index for index, point in enumerate(points) if point.selected]
+        halo_x, halo_y = halo_margins()
+        grid = SpatialGrid(halo_x, halo_y)
+        for index, point in enumerate(points):
+            grid.insert(index, point.x, point.y)
+
+        rng = rng if rng is not None else random.Random(seed_value)
+        coupled = [i for i, component in enumerate(components) if len(component) > 1]
+        tasks = []
+        for i in coupled:
+            owned = {point_of[label] for label in components[i]}
+            members = set()
+            for index in owned:
+                point = points[index]
+                members.update(
+                    points_near(
+                        grid,
+                        points,
+                        point.x - halo_x,
+                        point.y - halo_y,
+                        point.x + halo_x,
+                        point.y + halo_y,
+                    )
+                )
+
+            tasks.append(
+                (
+                    [(points[m].x, points[m].y, m in owned) for m in sorted(members)],
+                    rng.getrandbits(64),
+                    algorithm,
+                    options,
+                )
+            )
+
+    with phase(stats, "optimise"):
+        if len(tasks) >= min_parallel_components:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_solve_component, tasks, chunksize=4))
+        else:
+            results = [_solve_component(task) for task in tasks]
+
+    solve_times = [0.0] * len(components)
+    for i, (positions, solve_time) in zip(coupled, results):
+        for label, position in zip(components[i], positions):
+            placement[label] = position
+        solve_times[i] = solve_time
+
+    if stats is not None:
+        stats.count("components", len(components))
+        stats.count("singleton_components", len(components) - len(coupled))
+
+        for component, solve_time in zip(components, solve_times):
+            # Overlaps never cross components, so each is counted within its own
+            num_label_overlaps = 0
+            num_label_point_overlaps = 0
+            for label in component:
+                point_cost = graph.point_costs[graph.node(label, placement[label])]
+                num_label_point_overlaps += point_cost
+                num_label_overlaps += (
+                    graph.cost(label, placement[label], placement) - point_cost
+                )
+            stats.record(
+                "components",
+                {
+                    "num_labels": len(component),
+                    "num_overlaps": num_label_overlaps // 2 + num_label_point_overlaps,
+                    "solve_time": solve_time,
+                },
+            )
+
+    return graph.label_boxes(placement)
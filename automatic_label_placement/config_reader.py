@@ -2,29 +2,82 @@ import configparser
 from pathlib import Path
 
 
-# script_file = Path(__file__)
-config = configparser.ConfigParser()
-config.read(f"{Path(__file__).parent}/config.ini")
+# The settings are read from this file the first time one of them is looked up
+config_path = Path(__file__).parent / "config.ini"
 
-# PIXEL
-pixel_size = config["PIXEL"].getint("pixel_size")
+__all__ = [
+    "pixel_size",
+    "boundary_width",
+    "boundary_height",
+    "num_points_generated",
+    "num_points_selected",
+    "point_radius",
+    "box_width",
+    "box_height",
+    "box_point_distance",
+    "num_label_positions",
+    "num_converge",
+    "min_improvement",
+    "initial_temperature",
+    "final_temperature",
+    "cooling_rate",
+    "moves_per_label",
+    "seeds",
+]
 
-# BOUNDARY
-boundary_width = config["BOUNDARY"].getint("boundary_width")
-boundary_height = config["BOUNDARY"].getint("boundary_height")
 
-# POINT
-num_points_generated = config["POINT"].getint("num_points_generated")
-num_points_selected = config["POINT"].getint("num_points_selected")
-point_radius = config["POINT"].getint("point_radius")
+def load_config(path=None) -> dict:
+    """Parse a config file into the settings used across the package.
 
-# LABEL
-box_width = config["LABEL"].getint("box_width")
-box_height = config["LABEL"].getint("box_height")
-box_point_distance = config["LABEL"].getint("box_point_distance")
+    Args:
+        path: The config file to read (default config_path).
 
-# CONVERGE
-num_converge = config["CONVERGE"].getint("num_converge")
+    Returns:
+        A dict from the setting names in __all__ to their values.
+    """
 
-# SEEDS
-seeds = list(map(int, config["SEEDS"]["seeds"].split(",")))
+    config = configparser.ConfigParser()
+    config.read(path if path is not None else config_path)
+
+    return {
+        # PIXEL
+        "pixel_size": config["PIXEL"].getint("pixel_size"),
+        # BOUNDARY
+        "boundary_width": config["BOUNDARY"].getint("boundary_width"),
+        "boundary_height": config["BOUNDARY"].getint("boundary_height"),
+        # POINT
+        "num_points_generated": config["POINT"].getint("num_points_generated"),
+        "num_points_selected": config["POINT"].getint("num_points_selected"),
+        "point_radius": config["POINT"].getint("point_radius"),
+        # LABEL
+        "box_width": config["LABEL"].getint("box_width"),
+        "box_height": config["LABEL"].getint("box_height"),
+        "box_point_distance": config["LABEL"].getint("box_point_distance"),
+        "num_label_positions": config["LABEL"].getint(
+            "num_label_positions", fallback=4
+        ),
+        # CONVERGE
+        "num_converge": config["CONVERGE"].getint("num_converge"),
+        "min_improvement": config["CONVERGE"].getint("min_improvement", fallback=0),
+        # ANNEALING
+        "initial_temperature": config["ANNEALING"].getfloat("initial_temperature"),
+        "final_temperature": config["ANNEALING"].getfloat("final_temperature"),
+        "cooling_rate": config["ANNEALING"].getfloat("cooling_rate"),
+        "moves_per_label": config["ANNEALING"].getint("moves_per_label"),
+        # SEEDS
+        "seeds": list(map(int, config["SEEDS"]["seeds"].split(","))),
+    }
+
+
+def __getattr__(name: str):
+    """Load the settings on the first lookup of one of them.
+
+    The modules of the package take their defaults from `import *` of this module when
+    they are imported, so a different config_path has to be set before that.
+    """
+
+    if name in __all__:
+        globals().update(load_config())
+        return globals()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
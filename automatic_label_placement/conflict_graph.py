@@ -0,0 +1,316 @@
+from typing import List, Optional, Sequence, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import Point, LabelBox
+from automatic_label_placement.overlap_kernel import (
+    positions,
+    candidate_boxes,
+    candidates_within_boundary,
+    per_label,
+)
+from automatic_label_placement.spatial_index import SpatialGrid
+
+
+class ConflictGraph:
+    """Sparse graph of the conflicts between the candidate positions of the labels.
+
+    A node is a (label, position) pair, numbered label * K + position for the K
+    positions. Its cost is the
+    static number of points the candidate box overlaps, and its edges lead to the
+    candidates of other labels whose boxes overlap it. Points never move, so the graph
+    is built once and a placement is scored with adjacency-list lookups only.
+    """
+
+    def __init__(
+        self,
+        points: List[Point],
+        radius: int = point_radius,
+        label_width: int = box_width,
+        label_height: int = box_height,
+        label_distance: int = box_point_distance,
+        label_widths: Optional[Sequence[float]] = None,
+        label_heights: Optional[Sequence[float]] = None,
+        width: int = boundary_width,
+        height: int = boundary_height,
+    ):
+        """
+        Args:
+            points: A list of Point objects; the selected ones are the labels.
+            radius: The radius of the points (default 4).
+            label_width: The width of the label (default 88).
+            label_height: The height of the label (default 23).
+            label_distance: The distance between labels and points (default 1).
+            label_widths: The width of every label, in the order of the selected
+                points, for labels of different sizes (default label_width for all).
+            label_heights: The height of every label, in the order of the selected
+                points (default label_height for all).
+            width: Width of the boundary the boxes have to lie within (default 2000).
+            height: Height of the boundary (default 2000).
+        """
+
+        selected_points = [point for point in points if point.selected]
+        self.num_labels = len(selected_points)
+        self.num_positions = len(positions)
+
+        widths = label_widths if label_widths is not None else label_width
+        heights = label_heights if label_heights is not None else label_height
+        candidate_xs, candidate_ys = candidate_boxes(
+            [point.x for point in selected_points],
+            [point.y for point in selected_points],
+            radius,
+            widths,
+            heights,
+            label_distance,
+            backend="python",
+        )
+        within_boundary = candidates_within_boundary(
+            candidate_xs, candidate_ys, widths, heights, width, height, backend="python"
+        )
+        widths = per_label(widths, self.num_labels)
+        heights = per_label(heights, self.num_labels)
+        max_width = max(widths, default=label_width)
+        max_height = max(heights, default=label_height)
+
+        # The size shared by all labels, or None if they have sizes of their own
+        self.label_size: Optional[Tuple[float, float]] = (
+            (max_width, max_height)
+            if len(set(widths)) <= 1 and len(set(heights)) <= 1
+            else None
+        )
+
+        num_nodes = self.num_labels * self.num_positions
+        self.xs = [x for row in candidate_xs for x in row]
+        self.ys = [y for row in candidate_ys for y in row]
+        self.valid = [flag for row in within_boundary for flag in row]
+        self.point_costs: List[Optional[int]] = [None] * num_nodes
+        self.neighbours: List[List[int]] = [[] for _ in range(num_nodes)]
+
+        point_grid = SpatialGrid(max_width, max_height)
+        for index, point in enumerate(points):
+            point_grid.insert(index, point.x, point.y)
+
+        node_grid = SpatialGrid(max_width, max_height)
+        for node in range(num_nodes):
+            if self.valid[node]:
+                node_grid.insert(node, self.xs[node], self.ys[node])
+
+        for node in range(num_nodes):
+            if not self.valid[node]:
+                continue
+
+            x, y = self.xs[node], self.ys[node]
+            label = node // self.num_positions
+            w, h = widths[label], heights[label]
+
+            num_point_overlaps = 0
+            for index in point_grid.query(
+                x - radius, y - radius, x + w + radius, y + h + radius
+            ):
+                point = points[index]
+                if (
+                    x < point.x + radius
+                    and x + w > point.x - radius
+                    and y < point.y + radius
+                    and y + h > point.y - radius
+                ):
+                    num_point_overlaps += 1
+            self.point_costs[node] = num_point_overlaps
+
+            # A box overlapping this one has its corner less than its own size away
+            for other in node_grid.query(x - max_width, y - max_height, x + w, y + h):
+                other_label = other // self.num_positions
+                # Candidates of the same label never coexist
+                if other_label == label:
+                    continue
+
+                bx, by = self.xs[other], self.ys[other]
+                if (
+                    x < bx + widths[other_label]
+                    and x + w > bx
+                    and y < by + heights[other_label]
+                    and y + h > by
+                ):
+                    self.neighbours[node].append(other)
+
+    @classmethod
+    def from_tables(
+        cls,
+        num_labels: int,
+        xs,
+        ys,
+        valid,
+        point_costs,
+        neighbours,
+        label_size: Optional[Tuple[float, float]],
+    ) -> "ConflictGraph":
+        """Build a graph from precomputed node tables, such as those of an
+        InstanceCache, without touching the points.
+
+        Args:
+            num_labels: The number of labels.
+            xs: The x-coordinate of the candidate box of every node.
+            ys: The y-coordinate of the candidate box of every node.
+            valid: Whether the candidate box of every node lies within the boundary.
+            point_costs: The number of points the candidate box of every valid node
+                overlaps.
+            neighbours: The nodes of other labels whose boxes overlap every node.
+            label_size: The (width, height) shared by all labels, or None if they
+                have sizes of their own.
+
+        Returns:
+            The ConflictGraph of the tables.
+        """
+
+        graph = cls.__new__(cls)
+        graph.num_labels = num_labels
+        graph.num_positions = len(positions)
+        graph.xs = xs
+        graph.ys = ys
+        graph.valid = valid
+        graph.point_costs = point_costs
+        graph.neighbours = neighbours
+        graph.label_size = label_size
+
+        return graph
+
+    def node(self, label: int, position: int) -> int:
+        """Return the node of a label at a position."""
+
+        return label * self.num_positions + position
+
+    def valid_positions(self, label: int) -> List[int]:
+        """Return the positions of a label whose box lies within the boundary."""
+
+        return [
+            position
+            for position in range(self.num_positions)
+            if self.valid[self.node(label, position)]
+        ]
+
+    def cheapest_position(self, label: int) -> int:
+        """Return the valid position of a label overlapping the fewest points, the
+        lowest position index winning ties."""
+
+        return min(
+            self.valid_positions(label),
+            key=lambda position: self.point_costs[self.node(label, position)],
+        )
+
+    def cost(self, label: int, position: int, placement: List[int]) -> int:
+        """Number of overlaps of a label at a position given the other labels' positions.
+
+        Args:
+            label: The index of the label.
+            position: The candidate position of the label.
+            placement: The position of every label, or -1 for unplaced labels.
+
+        Returns:
+            Overlaps of the candidate box with points and with the placed boxes.
+        """
+
+        node = self.node(label, position)
+        num_positions = self.num_positions
+        num_overlaps = self.point_costs[node]
+
+        for other in self.neighbours[node]:
+            if placement[other // num_positions] == other % num_positions:
+                num_overlaps += 1
+
+        return num_overlaps
+
+    def total_overlaps(self, placement: List[int]) -> int:
+        """Total number of label-label and label-point overlaps of a placement."""
+
+        num_label_overlaps = 0
+        num_label_point_overlaps = 0
+
+        for label, position in enumerate(placement):
+            if position < 0:
+                continue
+            point_cost = self.point_costs[self.node(label, position)]
+            num_label_point_overlaps += point_cost
+            num_label_overlaps += self.cost(label, position, placement) - point_cost
+
+        # Every label overlap is seen from both of its labels
+        return num_label_overlaps // 2 + num_label_point_overlaps
+
+    def conflicting_labels(self, placement: List[int]) -> List[int]:
+        """Return the labels that overlap a point or another placed label."""
+
+        return [
+            label
+            for label, position in enumerate(placement)
+            if position >= 0 and self.cost(label, position, placement) > 0
+        ]
+
+    def label_boxes(self, placement: List[int]) -> List[LabelBox]:
+        """Build the label boxes of a placement."""
+
+        boxes = []
+        for label, position in enumerate(placement):
+            node = self.node(label, position)
+            boxes.append(LabelBox(self.xs[node], self.ys[node], position))
+
+        return boxes
+
+
+class PlacementState:
+    """A placement on a ConflictGraph with the overlap count of every candidate kept up
+    to date.
+
+    For every node the state counts the placed candidates it overlaps, so the change of
+    the total number of overlaps for moving one label is found in constant time. Only
+    committing a move walks the edges of the old and the new candidate.
+    """
+
+    def __init__(self, graph: ConflictGraph, placement: List[int]):
+        """
+        Args:
+            graph: The ConflictGraph of the points.
+            placement: The position of every label, or -1 for unplaced labels.
+        """
+
+        self.graph = graph
+        self.placement = list(placement)
+        self.active = [0] * len(graph.neighbours)
+
+        for label, position in enumerate(self.placement):
+            if position >= 0:
+                for other in graph.neighbours[graph.node(label, position)]:
+                    self.active[other] += 1
+
+        self.total = graph.total_overlaps(self.placement)
+
+    def cost(self, label: int, position: int) -> int:
+        """Number of overlaps of a label at a position given the placed labels."""
+
+        node = self.graph.node(label, position)
+        return self.graph.point_costs[node] + self.active[node]
+
+    def delta(self, label: int, position: int) -> int:
+        """Change of the total number of overlaps if a label moved to a position."""
+
+        current = self.placement[label]
+        if current < 0:
+            return self.cost(label, position)
+        return self.cost(label, position) - self.cost(label, current)
+
+    def move(self, label: int, position: int) -> int:
+        """Move a label to a position and update the counts of the affected candidates.
+
+        Returns:
+            The total number of overlaps after the move.
+        """
+
+        graph = self.graph
+        active = self.active
+        current = self.placement[label]
+        self.total += self.delta(label, position)
+
+        if current >= 0:
+            for other in graph.neighbours[graph.node(label, current)]:
+                active[other] -= 1
+        for other in graph.neighbours[graph.node(label, position)]:
+            active[other] += 1
+        self.placement[label] = position
+
+        return self.total
@@ -0,0 +1,131 @@
+from typing import Iterable, Optional, Set
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.instrumentation import Stats
+
+
+class Convergence:
+    """Decides when the local search has converged, from its overlap count and its
+    placement.
+
+    The search reports the number of overlaps after every iteration. An iteration
+    improves the search when it lowers the best number of overlaps by more than
+    min_improvement, and the search has stalled after patience iterations in a row
+    without improvement. Random tie-breaking can also move labels back and forth
+    between placements with the same number of overlaps, so the placement is
+    fingerprinted as well: its signature is the XOR of a hash of every (label,
+    position), updated in constant time per move, and the search has cycled as soon
+    as an iteration ends on a signature seen since the last improvement. A search
+    with no labels left to examine has settled.
+
+    Subclasses can override update to stop on other criteria.
+    """
+
+    __slots__ = (
+        "patience",
+        "min_improvement",
+        "stats",
+        "best",
+        "stale",
+        "signature",
+        "seen",
+        "iterations",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        patience: int = num_converge,
+        min_improvement: int = min_improvement,
+        stats: Optional[Stats] = None,
+    ):
+        """
+        Args:
+            patience: Number of iterations in a row without improvement after which
+                the search has stalled (default 4).
+            min_improvement: Number of overlaps an iteration has to remove from the
+                best number of overlaps to count as an improvement (default 0).
+            stats: Stats to record every iteration in, under "convergence", and to
+                count the cycles in (default None).
+        """
+
+        if patience < 1:
+            raise ValueError("patience must be at least 1.")
+
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.stats = stats
+        self.best = float("inf")
+        self.stale = 0
+        self.signature = 0
+        self.seen: Set[int] = set()
+        self.iterations = 0
+        self.reason: Optional[str] = None
+
+    def start(self, placement: Iterable[int]) -> None:
+        """Set the signature to that of the initial placement.
+
+        Args:
+            placement: The position of every label, or -1 for unplaced labels.
+        """
+
+        signature = 0
+        for label, position in enumerate(placement):
+            if position >= 0:
+                signature ^= hash((label, position))
+        self.signature = signature
+
+    def moved(self, label: int, old_position: int, new_position: int) -> None:
+        """Update the signature for a label that moved to another position."""
+
+        if old_position >= 0:
+            self.signature ^= hash((label, old_position))
+        self.signature ^= hash((label, new_position))
+
+    def update(self, num_overlaps: int, num_queued: int = 1) -> bool:
+        """Take the outcome of an iteration into account.
+
+        Args:
+            num_overlaps: The number of overlaps after the iteration.
+            num_queued: The number of labels left to examine (default 1).
+
+        Returns:
+            True if the search goes on, False once it has converged; reason is then
+            "settled", "cycled" or "stalled".
+        """
+
+        self.iterations += 1
+        improved = self.best - num_overlaps > self.min_improvement
+        revisited = False
+
+        if improved:
+            self.best = num_overlaps
+            self.stale = 0
+            self.seen.clear()
+        else:
+            self.stale += 1
+            revisited = self.signature in self.seen
+        self.seen.add(self.signature)
+
+        if num_queued == 0:
+            self.reason = "settled"
+        elif revisited:
+            self.reason = "cycled"
+        elif self.stale >= self.patience:
+            self.reason = "stalled"
+
+        if self.stats is not None:
+            if revisited:
+                self.stats.count("cycles")
+            self.stats.record(
+                "convergence",
+                {
+                    "iteration": self.iterations,
+                    "num_overlaps": num_overlaps,
+                    "improved": improved,
+                    "revisited": revisited,
+                    "queued": num_queued,
+                    "stop": self.reason,
+                },
+            )
+
+        return self.reason is None
@@ -1,67 +1,162 @@
 from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+    PlacementResult,
     generate_random_points,
-    reset_colors,
-    create_drawing
-)
-from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
-    calculate_overlaps,
+    evaluate_placement,
 )
 from automatic_label_placement.greedy_algorithm.greedy_algorithm_processor import (
-    label_boxes_for_positions,
+    greedy_placement,
+    greedy_placement_on_graph,
+    priority_greedy_placement,
 )
-import random
-import webbrowser
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.instrumentation import Stats, phase, profiling
+from automatic_label_placement.budget import Budget
+from typing import TYPE_CHECKING, List, Optional
 import os
+import random
 from automatic_label_placement.config_reader import *
 
 
-def greedy_algorithm(seed_value: int) -> None:
+if TYPE_CHECKING:
+    from automatic_label_placement.instance_cache import InstanceCache
+
+
+def greedy_solve(
+    points: List[Point],
+    backend: Optional[str] = None,
+    use_conflict_graph: bool = False,
+    priority_queue: bool = False,
+    stats: Optional[Stats] = None,
+    graph: Optional[ConflictGraph] = None,
+    budget: Optional[Budget] = None,
+    rng: Optional[random.Random] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
+    """Place the labels of the selected points with the greedy algorithm.
+
+    Args:
+        points: A list of Point objects.
+        backend: Backend of the overlap kernel, "python" or "numpy" (default numpy if
+            it is installed).
+        use_conflict_graph: Precompute a ConflictGraph and score the positions with
+            graph lookups instead of the overlap kernel (default False).
+        priority_queue: Place the labels most-constrained first from a priority queue
+            instead of in the order of the points; this always runs on a ConflictGraph
+            (default False).
+        stats: Stats to record the counters and the initial_placement phase in
+            (default None).
+        graph: A precomputed ConflictGraph of the points, such as a cached one, to
+            use instead of building it (default None).
+        budget: A Budget whose clock is read before every label; once its time limit
+            passes, the remaining labels are placed without scoring their overlaps
+            with other labels (default None). The greedy placement is a single pass,
+            so the iteration limit does not apply.
+        rng: The random number generator to break ties with (default the global
+            random module).
+        width: Width of the boundary the boxes have to lie within, when no graph is
+            given (default 2000).
+        height: Height of the boundary, when no graph is given (default 2000).
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    # The greedy placement is final, so there is no optimise phase
+    with phase(stats, "initial_placement"):
+        if priority_queue or use_conflict_graph:
+            if graph is None:
+                graph = ConflictGraph(points, width=width, height=height)
+        if priority_queue:
+            return priority_greedy_placement(graph, stats, budget, rng)
+        if use_conflict_graph:
+            return greedy_placement_on_graph(graph, stats, budget, rng)
+        return greedy_placement(
+            points,
+            backend=backend,
+            stats=stats,
+            budget=budget,
+            rng=rng,
+            width=width,
+            height=height,
+        )
+
+
+def greedy_algorithm(
+    seed_value: int,
+    backend: Optional[str] = None,
+    use_conflict_graph: bool = False,
+    priority_queue: bool = False,
+    stats: Optional[Stats] = None,
+    output_file: Optional[str] = "greedy_algorithm.svg",
+    open_browser: bool = True,
+    cache: Optional["InstanceCache"] = None,
+    budget: Optional[Budget] = None,
+) -> PlacementResult:
     """Run the greedy algorithm for label placement.
 
     Args:
         seed_value: Seed value for random number generation.
+        backend: Backend of the overlap kernel, "python" or "numpy" (default numpy if
+            it is installed).
+        use_conflict_graph: Precompute a ConflictGraph and score the positions with
+            graph lookups instead of the overlap kernel (default False).
+        priority_queue: Place the labels most-constrained first from a priority queue
+            instead of in the order of the points; this always runs on a ConflictGraph
+            (default False).
+        stats: Stats to record the run in, including the generate and render phases
+            (default None, no instrumentation).
+        output_file: The svg file to write the drawing to, or None to skip rendering
+            (default greedy_algorithm.svg).
+        open_browser: Whether to open the svg file in a web browser (default True).
+        cache: An InstanceCache to load the points and their ConflictGraph from
+            instead of generating them (default None).
+        budget: A Budget limiting the search; the result is the best placement found
+            within it and records whether the search converged (default None).
+
+    Returns:
+        The PlacementResult of the run, with the stats attached.
     """
 
-    # Prepare the svg graph
-    d = create_drawing()
-
-    points = generate_random_points(seed_value)
-
-    for point in points:
-        d.append(point[0])
-
-    boxes = []
-    # Add a box with minimal numer of overlaps
-    for point in points:
-        if point[1]:
-            list_tuples = []
-            boxes_for_positions = label_boxes_for_positions(selected_point=point)
-
-            # Calculate the number of overlaps for each position
-            for box in boxes_for_positions:
-                num_overlaps = (
-                    calculate_overlaps(points, boxes + [box])
-                    if box is not None
-                    else None
-                )
-                list_tuples.append((box, num_overlaps))
-
-            list_tuples = [t for t in list_tuples if t[1] is not None]
-            min_value = min(list_tuples, key=lambda x: x[1])[1]
-            selected_tuple = random.choice(
-                [t for t in list_tuples if t[1] == min_value]
-            )
-            box = selected_tuple[0]
-            boxes.append(box)
-            box_location = d.elements.index(point[0])
-            d.insert(box_location, box)
-
-            reset_colors(d)
-
-    num_overlaps = calculate_overlaps(points, boxes)
-    print(f"Numer of overlaps from greedy algorithm: {num_overlaps}")
-    d.save_svg("greedy_algorithm.svg")
-    webbrowser.open(f"file://{os.path.abspath('greedy_algorithm.svg')}")
+    with profiling(stats):
+        with phase(stats, "generate"):
+            if cache is not None:
+                instance = cache.load(seed_value)
+                points, graph = instance.points, instance.graph
+            else:
+                points, graph = generate_random_points(seed_value), None
+        # The search draws from its own stream, so the caller's random state is kept
+        rng = random.Random(seed_value)
+
+        boxes = greedy_solve(
+            points,
+            backend,
+            use_conflict_graph,
+            priority_queue,
+            stats,
+            graph,
+            budget,
+            rng,
+        )
+
+        result = evaluate_placement(
+            points, boxes, stats, converged=budget is None or not budget.exhausted
+        )
+        print(f"Numer of overlaps from greedy algorithm: {result.num_overlaps}")
+
+        # The svg graph is only built once the placement is final
+        if output_file is not None:
+            with phase(stats, "render"):
+                result.save_svg(output_file, points)
+
+    if output_file is not None and open_browser:
+        import webbrowser
+
+        webbrowser.open(f"file://{os.path.abspath(output_file)}")
+
+    return result
 
 
 if __name__ == "__main__":
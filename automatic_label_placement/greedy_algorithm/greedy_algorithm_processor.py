@@ -1,60 +1,337 @@
+import heapq
+import random
 from automatic_label_placement.config_reader import *
-from drawsvg import Circle, Rectangle
-from typing import List, Tuple, Optional
-from automatic_label_placement.label_placement_utils import box_within_boundary
+from typing import List, Optional, Tuple
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+)
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.overlap_kernel import (
+    positions,
+    resolve_backend,
+    candidate_boxes,
+    candidates_within_boundary,
+    count_candidate_overlaps,
+)
 
 
 def label_boxes_for_positions(
-    selected_point: Tuple[Circle, bool],
+    selected_point: Point,
     radius: int = point_radius,
     label_width: int = box_width,
     label_height: int = box_height,
     label_distance: int = box_point_distance,
-) -> List[Optional[Rectangle]]:
-    """Generate a list of four label boxes for a selected point for each position.
+) -> List[Optional[LabelBox]]:
+    """Generate a label box for a selected point at each of the positions.
 
     Args:
-        selected_point: A tuple where the first element is a Circle object and
-            the second element is a boolean indicating if the point is selected.
+        selected_point: A selected Point object.
         radius: radius of each point (default 4).
         label_width: Width of the label boxes (default 88).
         label_height: Height of the label boxes (default 23).
         label_distance: Distance between the label boxes and the points (default 1).
 
     Returns:
-        label_boxes: A list of four boxes for each position.
+        label_boxes: A list with a box for each position, None where the box would
+            be outside the boundary.
     """
 
-    x, y = selected_point[0].args["cx"], selected_point[0].args["cy"]
-    positions = ["right", "above", "below", "left"]
-    label_boxes = []
-
-    for p in positions:
-        if p == "right":
-            label_x = x + radius + label_distance
-            label_y = y - label_height / 2
-        elif p == "above":
-            label_x = x - label_width / 2
-            label_y = y + radius + label_distance
-        elif p == "below":
-            label_x = x - label_width / 2
-            label_y = y - radius - label_distance - label_height
+    candidate_xs, candidate_ys = candidate_boxes(
+        [selected_point.x],
+        [selected_point.y],
+        radius,
+        label_width,
+        label_height,
+        label_distance,
+        backend="python",
+    )
+    within_boundary = candidates_within_boundary(
+        candidate_xs, candidate_ys, label_width, label_height, backend="python"
+    )[0]
+
+    return [
+        LabelBox(candidate_xs[0][p], candidate_ys[0][p], p)
+        if within_boundary[p]
+        else None
+        for p in range(len(positions))
+    ]
+
+
+def greedy_placement(
+    points: List[Point],
+    backend: Optional[str] = None,
+    stats: Optional[Stats] = None,
+    budget: Optional[Budget] = None,
+    rng: Optional[random.Random] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
+    """Place the label of each selected point, in order, at the position with minimal
+        number of overlaps with the points and the boxes placed so far.
+
+    The points and the placed boxes are kept in SpatialGrids, so the positions of a
+    label are only scored against those near its candidates.
+
+    Args:
+        points: A list of Point objects.
+        backend: Backend of the overlap kernel generating the candidates, "python" or
+            "numpy" (default numpy if it is installed).
+        stats: Stats to count the candidate evaluations and rectangle tests in
+            (default None).
+        budget: A Budget whose clock is read before every label; once its time limit
+            passes, the remaining labels are put at their cheapest position against
+            the points alone (default None).
+        rng: The random number generator to break ties with (default the global
+            random module).
+        width: Width of the boundary the boxes have to lie within (default 2000).
+        height: Height of the boundary (default 2000).
+
+    Raises:
+        ValueError: If a label does not fit within the boundary at any position.
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    rng = rng if rng is not None else random
+    backend = resolve_backend(backend)
+    selected_points = [point for point in points if point.selected]
+    boxes = []
+
+    # The candidates of all labels come from one batched kernel call
+    candidate_xs, candidate_ys = candidate_boxes(
+        [point.x for point in selected_points],
+        [point.y for point in selected_points],
+        backend=backend,
+    )
+    within_boundary = candidates_within_boundary(
+        candidate_xs,
+        candidate_ys,
+        width=width,
+        height=height,
+        backend=backend,
+    )
+    if backend == "numpy":
+        candidate_xs = candidate_xs.tolist()
+        candidate_ys = candidate_ys.tolist()
+        within_boundary = within_boundary.tolist()
+
+    # Only the points and boxes near the candidates of a label can overlap them
+    point_grid = SpatialGrid(box_width, box_height)
+    for index, point in enumerate(points):
+        point_grid.insert(index, point.x, point.y)
+    box_grid = SpatialGrid(box_width, box_height)
+
+    # Add a box with minimal numer of overlaps
+    for label in range(len(selected_points)):
+        row_xs, row_ys = candidate_xs[label], candidate_ys[label]
+        valid_positions = [
+            p for p in range(len(positions)) if within_boundary[label][p]
+        ]
+        if not valid_positions:
+            raise ValueError("A label does not fit within the boundary.")
+
+        x_min, x_max = min(row_xs), max(row_xs)
+        y_min, y_max = min(row_ys), max(row_ys)
+        near_points = [
+            points[index]
+            for index in point_grid.query(
+                x_min - point_radius,
+                y_min - point_radius,
+                x_max + box_width + point_radius,
+                y_max + box_height + point_radius,
+            )
+        ]
+
+        # Out of time: the cheapest position against the points alone
+        out_of_time = budget is not None and budget.expired(budget.check_interval)
+        near_boxes = (
+            []
+            if out_of_time
+            else [
+                boxes[index]
+                for index in box_grid.query(
+                    x_min - box_width,
+                    y_min - box_height,
+                    x_max + box_width,
+                    y_max + box_height,
+                )
+            ]
+        )
+
+        # Calculate the number of overlaps for each position in one call
+        counts = count_candidate_overlaps(
+            [row_xs],
+            [row_ys],
+            [point.x for point in near_points],
+            [point.y for point in near_points],
+            [box.x for box in near_boxes],
+            [box.y for box in near_boxes],
+            backend="python",
+        )[0]
+        list_tuples = [(p, counts[p]) for p in valid_positions]
+
+        if out_of_time:
+            p = min(valid_positions, key=lambda p: counts[p])
         else:
-            label_x = x - radius - label_distance - label_width
-            label_y = y - label_height / 2
-
-        if box_within_boundary(label_x, label_y):
-            label_boxes.append(
-                Rectangle(
-                    label_x,
-                    label_y,
-                    label_width,
-                    label_height,
-                    fill="none",
-                    stroke="black",
+            if stats is not None:
+                stats.count("candidate_evaluations", len(list_tuples))
+                stats.count(
+                    "overlap_tests",
+                    len(positions) * (len(near_points) + len(near_boxes)),
                 )
+
+            min_value = min(list_tuples, key=lambda x: x[1])[1]
+            selected_tuple = rng.choice([t for t in list_tuples if t[1] == min_value])
+            p = selected_tuple[0]
+
+        box = LabelBox(float(row_xs[p]), float(row_ys[p]), p)
+        box_grid.insert(len(boxes), box.x, box.y)
+        boxes.append(box)
+
+    return boxes
+
+
+def greedy_placement_on_graph(
+    graph: ConflictGraph,
+    stats: Optional[Stats] = None,
+    budget: Optional[Budget] = None,
+    rng: Optional[random.Random] = None,
+) -> List[LabelBox]:
+    """Run the same greedy placement as greedy_placement with conflict graph lookups.
+
+    Args:
+        graph: The ConflictGraph of the points.
+        stats: Stats to count the candidate evaluations in (default None).
+        budget: A Budget whose clock is read before every label; once its time limit
+            passes, the remaining labels are put at their cheapest position against
+            the points alone (default None).
+        rng: The random number generator to break ties with (default the global
+            random module).
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    rng = rng if rng is not None else random
+    placement = [-1] * graph.num_labels
+
+    for label in range(graph.num_labels):
+        if budget is not None and budget.expired(budget.check_interval):
+            placement[label] = graph.cheapest_position(label)
+            continue
+
+        list_tuples = [
+            (p, graph.cost(label, p, placement)) for p in graph.valid_positions(label)
+        ]
+        if stats is not None:
+            stats.count("candidate_evaluations", len(list_tuples))
+
+        min_value = min(list_tuples, key=lambda x: x[1])[1]
+        selected_tuple = rng.choice([t for t in list_tuples if t[1] == min_value])
+        placement[label] = selected_tuple[0]
+
+    return graph.label_boxes(placement)
+
+
+def priority_greedy_placement(
+    graph: ConflictGraph,
+    stats: Optional[Stats] = None,
+    budget: Optional[Budget] = None,
+    rng: Optional[random.Random] = None,
+) -> List[LabelBox]:
+    """Place the labels most-constrained first, keeping the cost of every candidate
+        up to date as labels are committed.
+
+    A label is more constrained the fewer conflict-free positions it has left, and among
+    equally constrained labels the one whose candidates have the most conflicts goes
+    first. Labels without any conflict-free position are left until last. Committing a
+    label only re-scores the labels whose candidates overlap the committed box; the heap
+    entries of those labels become stale and are skipped lazily.
+
+    Args:
+        graph: The ConflictGraph of the points.
+        stats: Stats to count the candidate evaluations and the stale heap entries in
+            (default None).
+        budget: A Budget whose clock is read before every heap entry; once its time
+            limit passes, the remaining labels are put at their cheapest position
+            against the points and the labels placed so far (default None).
+        rng: The random number generator to break ties with (default the global
+            random module).
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    rng = rng if rng is not None else random
+    num_positions = graph.num_positions
+    neighbours = graph.neighbours
+    costs = list(graph.point_costs)
+    placement = [-1] * graph.num_labels
+    versions = [0] * graph.num_labels
+    valid_positions = [
+        graph.valid_positions(label) for label in range(graph.num_labels)
+    ]
+    degrees = [
+        sum(len(neighbours[graph.node(label, p)]) for p in valid_positions[label])
+        for label in range(graph.num_labels)
+    ]
+
+    def priority(label: int) -> Tuple[int, int, int]:
+        free = sum(
+            1 for p in valid_positions[label] if costs[graph.node(label, p)] == 0
+        )
+        return (free if free > 0 else num_positions + 1, -degrees[label], label)
+
+    heap = [(priority(label), 0, label) for label in range(graph.num_labels)]
+    heapq.heapify(heap)
+
+    while heap:
+        if budget is not None and budget.expired(budget.check_interval):
+            for label in range(graph.num_labels):
+                if placement[label] < 0:
+                    placement[label] = min(
+                        valid_positions[label],
+                        key=lambda p: costs[graph.node(label, p)],
+                    )
+            break
+
+        _, version, label = heapq.heappop(heap)
+        if placement[label] >= 0 or version != versions[label]:
+            if stats is not None:
+                stats.count("stale_heap_entries")
+            continue
+
+        # Among the cheapest positions prefer the one blocking fewest unplaced labels
+        list_tuples = []
+        for p in valid_positions[label]:
+            node = graph.node(label, p)
+            blocking = sum(
+                1 for other in neighbours[node] if placement[other // num_positions] < 0
+            )
+            list_tuples.append((p, costs[node], blocking))
+        if stats is not None:
+            stats.count("candidate_evaluations", len(list_tuples))
+
+        min_value = min(list_tuples, key=lambda x: x[1:])[1:]
+        selected_tuple = rng.choice([t for t in list_tuples if t[1:] == min_value])
+        placement[label] = selected_tuple[0]
+
+        touched = set()
+        for other in neighbours[graph.node(label, placement[label])]:
+            other_label = other // num_positions
+            if placement[other_label] < 0:
+                costs[other] += 1
+                touched.add(other_label)
+
+        for other_label in touched:
+            versions[other_label] += 1
+            heapq.heappush(
+                heap, (priority(other_label), versions[other_label], other_label)
             )
-        else:
-            label_boxes.append(None)
 
-    return label_boxes
+    return graph.label_boxes(placement)
@@ -0,0 +1,329 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Union
+from automatic_label_placement import config_reader
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    generate_random_points,
+    points_from_arrays,
+)
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.overlap_kernel import positions
+
+
+# Bump when the layout of the cache files changes, so old files are never read
+format_version = 2
+magic = b"ALPINST" + bytes([format_version])
+
+# magic, number of points, number of labels, number of positions, number of edges,
+# width and height shared by all labels (NaN if they have sizes of their own)
+header = struct.Struct("<8s4Q2d")
+
+# The settings that change the points or the candidate tables of an instance
+instance_settings = [
+    "boundary_width",
+    "boundary_height",
+    "num_points_generated",
+    "num_points_selected",
+    "point_radius",
+    "box_width",
+    "box_height",
+    "box_point_distance",
+]
+
+default_cache_dir = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "automatic_label_placement"
+)
+
+
+class Adjacency:
+    """Read-only adjacency lists of a ConflictGraph stored as offsets into a single
+    array of neighbours."""
+
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, offsets, targets):
+        """
+        Args:
+            offsets: For every node the start of its neighbours in targets, followed by
+                the number of targets.
+            targets: The neighbours of all nodes, node by node.
+        """
+
+        self.offsets = offsets
+        self.targets = targets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node: int):
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+
+class CachedInstance:
+    """The points and the conflict graph of an instance, read from a cache file.
+
+    The coordinates and the candidate tables are views of the memory-mapped file, so
+    processes reading the same instance share its pages.
+    """
+
+    __slots__ = ("path", "points", "graph", "buffer")
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: The cache file to map.
+        """
+
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(buffer)
+        if len(view) < header.size:
+            raise ValueError(f"{path} is not an instance cache file.")
+        (
+            file_magic,
+            num_points,
+            num_labels,
+            num_positions,
+            num_edges,
+            label_width,
+            label_height,
+        ) = header.unpack_from(view)
+        if file_magic != magic or num_positions != len(positions):
+            raise ValueError(f"{path} is not an instance cache file.")
+
+        num_nodes = num_labels * num_positions
+        sections = []
+        offset = header.size
+        for typecode, length in section_layout(num_points, num_nodes, num_edges):
+            size = array(typecode).itemsize * length
+            sections.append(view[offset : offset + size].cast(typecode))
+            offset = aligned(offset + size)
+        if offset < len(view):
+            raise ValueError(f"{path} has trailing data.")
+
+        (
+            xs,
+            ys,
+            selected,
+            candidate_xs,
+            candidate_ys,
+            valid,
+            costs,
+            starts,
+            targets,
+        ) = sections
+
+        self.path = Path(path)
+        self.points = points_from_arrays(xs, ys, selected)
+        self.graph = ConflictGraph.from_tables(
+            num_labels,
+            candidate_xs,
+            candidate_ys,
+            valid,
+            costs,
+            Adjacency(starts, targets),
+            None if math.isnan(label_width) else (label_width, label_height),
+        )
+        self.buffer = buffer
+
+
+def aligned(offset: int) -> int:
+    """Round an offset in a cache file up to the next multiple of 8 bytes."""
+
+    return (offset + 7) & ~7
+
+
+def section_layout(num_points: int, num_nodes: int, num_edges: int) -> List[tuple]:
+    """Return the (typecode, length) of every array of a cache file, in file order.
+
+    The arrays are the point coordinates and selection flags, the candidate
+    coordinates, validity flags and point costs of every node, and the neighbours of
+    the nodes as offsets into one array of targets.
+    """
+
+    return [
+        ("d", num_points),
+        ("d", num_points),
+        ("B", num_points),
+        ("d", num_nodes),
+        ("d", num_nodes),
+        ("B", num_nodes),
+        ("i", num_nodes),
+        ("q", num_nodes + 1),
+        ("i", num_edges),
+    ]
+
+
+def instance_key(seed_value: int) -> str:
+    """Hash a seed value with the settings of the instance it generates.
+
+    Args:
+        seed_value: Seed value for random number generation.
+
+    Returns:
+        The hex digest of the seed value, the instance settings of the current config
+        and the cache format.
+    """
+
+    description = {
+        "format": format_version,
+        "positions": len(positions),
+        "seed": seed_value,
+        "settings": {name: getattr(config_reader, name) for name in instance_settings},
+    }
+
+    return hashlib.sha256(
+        json.dumps(description, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def write_instance(
+    file_path: Union[str, Path], points: List[Point], graph: ConflictGraph
+) -> None:
+    """Write the points and the conflict graph of an instance to a cache file.
+
+    The file is written next to its destination and renamed into place, so readers in
+    other processes never see a partial file.
+
+    Args:
+        file_path: The cache file to write.
+        points: A list of Point objects.
+        graph: The ConflictGraph of the points.
+    """
+
+    starts = array("q", [0])
+    targets = array("i")
+    for node_neighbours in graph.neighbours:
+        targets.extend(node_neighbours)
+        starts.append(len(targets))
+
+    sections = [
+        array("d", [point.x for point in points]),
+        array("d", [point.y for point in points]),
+        array("B", [point.selected for point in points]),
+        array("d", graph.xs),
+        array("d", graph.ys),
+        array("B", graph.valid),
+        # Candidates outside the boundary have no point cost
+        array("i", [-1 if cost is None else cost for cost in graph.point_costs]),
+        starts,
+        targets,
+    ]
+
+    label_width, label_height = (
+        graph.label_size if graph.label_size is not None else (math.nan, math.nan)
+    )
+
+    file_path = Path(file_path)
+    temporary_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    with open(temporary_path, "wb") as file:
+        file.write(
+            header.pack(
+                magic,
+                len(points),
+                graph.num_labels,
+                graph.num_positions,
+                len(targets),
+                label_width,
+                label_height,
+            )
+        )
+        for section in sections:
+            section.tofile(file)
+            file.write(bytes(aligned(file.tell()) - file.tell()))
+    os.replace(temporary_path, file_path)
+
+
+class InstanceCache:
+    """On-disk cache of the generated points and the conflict graphs of seeded instances.
+
+    Every instance is stored as one binary file named after instance_key, which is
+    mapped into memory when it is loaded. The modification time of a file is bumped on
+    every hit, and when the files exceed max_bytes the least recently used ones are
+    deleted.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = default_cache_dir,
+        max_bytes: int = 1 << 30,
+    ):
+        """
+        Args:
+            directory: The directory of the cache files (default
+                ~/.cache/automatic_label_placement).
+            max_bytes: Size limit of the cache files together (default 1 GiB).
+        """
+
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def path(self, seed_value: int) -> Path:
+        """Return the cache file of a seed value under the current config."""
+
+        return self.directory / f"{instance_key(seed_value)}.inst"
+
+    def load(self, seed_value: int) -> CachedInstance:
+        """Load the instance of a seed value, generating and storing it on a miss.
+
+        Args:
+            seed_value: Seed value for random number generation.
+
+        Returns:
+            The CachedInstance with the points and the conflict graph of the seed.
+        """
+
+        file_path = self.path(seed_value)
+        try:
+            instance = CachedInstance(file_path)
+            os.utime(file_path)
+            return instance
+        except (OSError, ValueError):
+            # A missing or unreadable file is regenerated
+            pass
+
+        points = generate_random_points(seed_value)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_instance(file_path, points, ConflictGraph(points))
+        self.evict(keep=file_path)
+
+        return CachedInstance(file_path)
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Delete the least recently used cache files until they fit in max_bytes.
+
+        Args:
+            keep: A file that is never deleted, such as the one just written.
+        """
+
+        entries = []
+        for file_path in self.directory.glob("*.inst"):
+            try:
+                entries.append((file_path.stat(), file_path))
+            except FileNotFoundError:
+                # Deleted by another process in the meantime
+                continue
+
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+        for stat, file_path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+            if total_bytes <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            file_path.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
+
+    def clear(self) -> None:
+        """Delete all cache files."""
+
+        for file_path in self.directory.glob("*.inst"):
+            file_path.unlink(missing_ok=True)
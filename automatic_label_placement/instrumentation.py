@@ -0,0 +1,130 @@
+import timeit
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+# The profilers are only imported when a run is profiled
+if TYPE_CHECKING:
+    import cProfile
+
+
+class Stats:
+    """Counters and phase timers collected from one run of an algorithm.
+
+    Instrumentation is opt-in: the algorithms take stats=None by default and then skip
+    all bookkeeping. Counters are only updated per call or per label, never per
+    rectangle test, except through counting(), which is bound once outside the loops.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        """
+        Args:
+            profile: Run the algorithm under cProfile (default False).
+            trace_memory: Trace memory allocations with tracemalloc and record the
+                peak (default False).
+        """
+
+        self.counters: Dict[str, int] = {}
+        self.phase_times: Dict[str, float] = {}
+        self.records: Dict[str, List[dict]] = {}
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profiler: Optional["cProfile.Profile"] = None
+        self.peak_memory: Optional[int] = None
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add n to the counter name."""
+
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, entry: dict) -> None:
+        """Append an entry, e.g. the statistics of one component, to the records name."""
+
+        self.records.setdefault(name, []).append(entry)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the wall time spent in the with block to the phase name."""
+
+        start_time = timeit.default_timer()
+        try:
+            yield
+        finally:
+            elapsed = timeit.default_timer() - start_time
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+
+    def counting(
+        self, query: Callable[..., Iterator], name: str
+    ) -> Callable[..., List]:
+        """Wrap a query function so the number of items it returns is added to name.
+
+        Args:
+            query: A function returning an iterable, e.g. SpatialGrid.query.
+            name: The counter to add to.
+
+        Returns:
+            A function with the same arguments that returns the items as a list.
+        """
+
+        def counted_query(*args) -> List:
+            items = list(query(*args))
+            self.count(name, len(items))
+            return items
+
+        return counted_query
+
+    @contextmanager
+    def profiling(self) -> Iterator[None]:
+        """Run the with block under cProfile and/or tracemalloc, as configured."""
+
+        import cProfile
+        import tracemalloc
+
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if self.trace_memory:
+            tracemalloc.start()
+
+        try:
+            yield
+        finally:
+            if self.trace_memory:
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if self.profiler is not None:
+                self.profiler.disable()
+
+    def profile_report(self, sort: str = "cumulative", limit: int = 20) -> str:
+        """Return the cProfile report of the run, or an empty string without profile."""
+
+        if self.profiler is None:
+            return ""
+
+        import io
+        import pstats
+
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def as_dict(self) -> dict:
+        """Return the counters, phase times, records and peak memory as a plain dict."""
+
+        return {
+            "counters": dict(self.counters),
+            "phase_times": dict(self.phase_times),
+            "records": {name: list(entries) for name, entries in self.records.items()},
+            "peak_memory": self.peak_memory,
+        }
+
+
+def phase(stats: Optional[Stats], name: str):
+    """Return stats.phase(name), or a no-op context manager when stats is None."""
+
+    return stats.phase(name) if stats is not None else nullcontext()
+
+
+def profiling(stats: Optional[Stats]):
+    """Return stats.profiling(), or a no-op context manager when stats is None."""
+
+    return stats.profiling() if stats is not None else nullcontext()
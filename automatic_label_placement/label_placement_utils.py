@@ -1,208 +1,523 @@
-# import random
-# from drawsvg import Drawing, Circle, Rectangle
-# from typing import List, Tuple
-# from .config_reader import *
-# from itertools import combinations
-#
-#
-# def generate_random_points(
-#     seed_value: int,
-#     num_points: int = num_points_generated,
-#     width: int = boundary_width,
-#     height: int = boundary_height,
-#     radius: int = point_radius,
-#     label_height: int = box_height,
-#     num_selected: int = num_points_selected,
-# ) -> List[Tuple[Circle, bool]]:
-#     """Generate random points with a number of points randomly selected.
-#     Args:
-#         seed_value: Seed value for random number generation.
-#         num_points: Total number of random points to generate (default 1000).
-#         width:  width of the boundary (default 2000).
-#         height: height of the boundary within which the points are generated (default 2000).
-#         radius: radius of each point (default 4).
-#         label_height: Height of the label boxes (default 23).
-#         num_selected: Number of points to select from the generated random points (default 200).
-#
-#     Returns:
-#         random_points: A list of tuples where the first element of a tuple is a Circle object and
-#         the second element is a boolean indicating if the point is selected.
-#     """
-#
-#     original_state = random.getstate()
-#     random.seed(seed_value)
-#
-#     random_points = []
-#     selected_points = random.sample(range(num_points), num_selected)
-#
-#     if 2 * radius >= label_height:
-#         y_start = radius
-#         y_end = height - radius
-#     else:
-#         y_start = label_height / 2
-#         y_end = height - label_height / 2
-#
-#     for i in range(num_points):
-#         x = random.uniform(radius, width - radius)
-#         y = random.uniform(y_start, y_end)
-#         point = Circle(x, y, radius, fill="black")
-#
-#         random_points.append((point, i in selected_points))
-#
-#     random.setstate(original_state)
-#
-#     return random_points
-#
-#
-# def reset_colors(d: Drawing) -> None:
-#     """Reset the colors of Circle and Rectangle objects to black.
-#
-#     Args:
-#         d: A Drawing object.
-#     """
-#
-#     for element in d.elements:
-#         if isinstance(element, Circle):
-#             element.args["fill"] = "black"
-#         elif isinstance(element, Rectangle):
-#             element.args["stroke"] = "black"
-#
-#
-# def box_within_boundary(
-#     label_x: float,
-#     label_y: float,
-#     label_width: int = box_width,
-#     label_height: int = box_height,
-#     width: int = boundary_width,
-#     height: int = boundary_height,
-# ) -> bool:
-#     """Check if a box is within the boundary.
-#
-#     Args:
-#         label_x: X-coordinate of the box.
-#         label_y: Y-coordinate of the box.
-#         label_width: Width of the label boxes (default 88).
-#         label_height: Height of the label boxes (default 23).
-#         width:  width of the boundary (default 2000).
-#         height: height of the boundary within which the points are generated (default 2000).
-#
-#     Returns:
-#         True if the box is within the boundary, False otherwise.
-#     """
-#
-#     return 0 <= label_x <= width - label_width and 0 <= label_y <= height - label_height
-#
-#
-# def calculate_overlaps(
-#     points: List[Tuple[Circle, bool]],
-#     boxes: List[Rectangle],
-#     radius: int = point_radius,
-#     label_width: int = box_width,
-#     label_height: int = box_height,
-# ) -> int:
-#     """Calculate the number of overlaps between label boxes and between label boxes and points and
-#         color any overlaps red.
-#
-#     Args:
-#         points: A list of tuples where the first element of a tuple is a Circle object and
-#             the second element is a boolean indicating if the point is selected.
-#         boxes: A list of label boxes.
-#         radius: The radius of the points (default 4).
-#         label_width: The width of the label (default 88).
-#         label_height: The height of the label (default 23).
-#
-#     Returns:
-#         Number of overlaps between label boxes and between label boxes and points.
-#     """
-#
-#     num_label_overlaps = 0
-#     num_label_point_overlaps = 0
-#
-#     for box1, box2 in combinations(boxes, 2):
-#         bx1, by1 = box1.args["x"], box1.args["y"]
-#         bx2, by2 = box2.args["x"], box2.args["y"]
-#
-#         if (
-#             bx1 < bx2 + label_width
-#             and bx1 + label_width > bx2
-#             and by1 < by2 + label_height
-#             and by1 + label_height > by2
-#         ):
-#             num_label_overlaps += 1
-#             box1.args["stroke"] = "red"
-#             box2.args["stroke"] = "red"
-#
-#     for point, is_selected in points:
-#         px, py = point.args["cx"], point.args["cy"]
-#
-#         for box in boxes:
-#             bx, by = box.args["x"], box.args["y"]
-#
-#             if (
-#                 bx < px + radius
-#                 and bx + label_width > px - radius
-#                 and by < py + radius
-#                 and by + label_height > py - radius
-#             ):
-#                 num_label_point_overlaps += 1
-#                 box.args["stroke"] = "red"
-#                 point.args["fill"] = "red"
-#
-#     return num_label_overlaps + num_label_point_overlaps
-#
-#
-# def create_drawing(
-#     boundary_width: int = boundary_width,
-#     boundary_height: int = boundary_height,
-#     pixel_size: int = pixel_size,
-# ):
-#     """Creates a Drawing object with a boundary rectangle and sets the render size.
-#
-#     Args:
-#         boundary_width: Width of the boundary rectangle.
-#         boundary_height: Height of the boundary rectangle.
-#         pixel_size (int): Size of the rendering pixels.
-#
-#     Returns:
-#         Drawing: A Drawing object.
-#     """
-#
-#     d = Drawing(boundary_width, boundary_height)
-#     boundary = Rectangle(
-#         0, 0, width=boundary_width, height=boundary_height, fill="none", stroke="black"
-#     )
-#     d.append(boundary)
-#     d.set_render_size(pixel_size, pixel_size)
-#
-#     return d
-
-
 import random
-from automatic_label_placement.config_reader import *
-from typing import List
 import math
-from itertools import combinations
+from typing import TYPE_CHECKING, List, Optional, Sequence, Set, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.streaming_render import write_svg, write_raster_preview
+from automatic_label_placement.point_generator import point_y_range
+from automatic_label_placement.overlap_kernel import (
+    positions,
+    candidate_boxes,
+    candidates_within_boundary,
+)
+
+# drawsvg is only imported once something is rendered
+if TYPE_CHECKING:
+    from drawsvg import Drawing
 
 
 class Coordinates:
+    __slots__ = ("x", "y")
+
     def __init__(self, x: float, y: float):
         self.x = x
         self.y = y
 
 
 class Point(Coordinates):
+    __slots__ = ("selected", "conflict")
     radius = point_radius
 
-    def __init__(self, x: float, y: float):
+    def __init__(self, x: float, y: float, selected: bool = False):
         super().__init__(x, y)
+        self.selected = selected
+        self.conflict = False
 
 
 class LabelBox(Coordinates):
+    __slots__ = ("position", "conflict")
     width = box_width
     height = box_height
 
-    def __init__(self, x: float, y: float):
+    def __init__(self, x: float, y: float, position: Optional[int] = None):
         super().__init__(x, y)
+        self.position = position
+        self.conflict = False
+
+
+def generate_random_points(
+    seed_value: int,
+    num_points: int = num_points_generated,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    radius: int = point_radius,
+    label_height: int = box_height,
+    num_selected: int = num_points_selected,
+) -> List[Point]:
+    """Generate random points with a number of points randomly selected.
+    Args:
+        seed_value: Seed value for random number generation.
+        num_points: Total number of random points to generate (default 1000).
+        width:  width of the boundary (default 2000).
+        height: height of the boundary within which the points are generated (default 2000).
+        radius: radius of each point (default 4).
+        label_height: Height of the label boxes (default 23).
+        num_selected: Number of points to select from the generated random points (default 200).
+
+    Returns:
+        random_points: A list of Point objects whose selected attribute indicates if the
+        point is selected.
+    """
+
+    # A private generator draws the same sequence as random.seed(seed_value)
+    rng = random.Random(seed_value)
+
+    random_points = []
+    selected_points = set(rng.sample(range(num_points), num_selected))
+    y_start, y_end = point_y_range(height, radius, label_height)
+
+    for i in range(num_points):
+        x = rng.uniform(radius, width - radius)
+        y = rng.uniform(y_start, y_end)
+
+        random_points.append(Point(x, y, i in selected_points))
+
+    return random_points
+
+
+def points_from_arrays(
+    xs: Sequence[float], ys: Sequence[float], selected: Sequence[bool]
+) -> List[Point]:
+    """Build Point objects from coordinate arrays and a selection mask.
+
+    Args:
+        xs: X-coordinates of the points.
+        ys: Y-coordinates of the points.
+        selected: For each point, whether it gets a label.
+
+    Returns:
+        A list of Point objects.
+    """
+
+    # NumPy arrays, arrays and memoryviews are converted in bulk
+    xs, ys, selected = (
+        column.tolist() if hasattr(column, "tolist") else column
+        for column in (xs, ys, selected)
+    )
+
+    return [Point(x, y, bool(flag)) for x, y, flag in zip(xs, ys, selected)]
+
+
+def label_boxes_from_positions(
+    points: List[Point],
+    label_positions: Sequence[int],
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    label_distance: int = box_point_distance,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
+    """Build the label boxes of a placement given as one position code per label.
+
+    Args:
+        points: A list of Point objects.
+        label_positions: The index in positions of every label, in the order of the
+            selected points, e.g. PlacementResult.positions of an earlier run.
+        radius: radius of each point (default 4).
+        label_width: Width of the label boxes (default 88).
+        label_height: Height of the label boxes (default 23).
+        label_distance: Distance between the label boxes and the points (default 1).
+        width: Width of the boundary the boxes have to lie within (default 2000).
+        height: Height of the boundary (default 2000).
+
+    Returns:
+        label_boxes: A list of label boxes, in the order of the selected points.
+    """
+
+    selected_points = [point for point in points if point.selected]
+    if len(label_positions) != len(selected_points):
+        raise ValueError(
+            f"Expected a position for each of the {len(selected_points)} labels, "
+            f"got {len(label_positions)}."
+        )
+
+    candidate_xs, candidate_ys = candidate_boxes(
+        [point.x for point in selected_points],
+        [point.y for point in selected_points],
+        radius,
+        label_width,
+        label_height,
+        label_distance,
+        backend="python",
+    )
+    within_boundary = candidates_within_boundary(
+        candidate_xs,
+        candidate_ys,
+        label_width,
+        label_height,
+        width,
+        height,
+        backend="python",
+    )
+
+    label_boxes = []
+    for label, position in enumerate(label_positions):
+        if not 0 <= position < len(positions):
+            raise ValueError(f"Label {label} has no valid position code: {position}.")
+        if not within_boundary[label][position]:
+            raise ValueError(
+                f"Label {label} at position {position} is outside the boundary."
+            )
+        label_boxes.append(
+            LabelBox(
+                candidate_xs[label][position], candidate_ys[label][position], position
+            )
+        )
+
+    return label_boxes
+
+
+def reset_conflicts(points: List[Point], boxes: List[LabelBox]) -> None:
+    """Clear the conflict flags of points and label boxes.
+
+    Args:
+        points: A list of Point objects.
+        boxes: A list of label boxes.
+    """
+
+    for point in points:
+        point.conflict = False
+    for box in boxes:
+        box.conflict = False
+
+
+def box_within_boundary(
+    label_x: float,
+    label_y: float,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> bool:
+    """Check if a box is within the boundary.
+
+    Args:
+        label_x: X-coordinate of the box.
+        label_y: Y-coordinate of the box.
+        label_width: Width of the label boxes (default 88).
+        label_height: Height of the label boxes (default 23).
+        width:  width of the boundary (default 2000).
+        height: height of the boundary within which the points are generated (default 2000).
+
+    Returns:
+        True if the box is within the boundary, False otherwise.
+    """
+
+    return 0 <= label_x <= width - label_width and 0 <= label_y <= height - label_height
+
+
+def calculate_overlaps(
+    points: List[Point],
+    boxes: List[LabelBox],
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    stats: Optional[Stats] = None,
+) -> int:
+    """Calculate the number of overlaps between label boxes and between label boxes and points and
+        flag any overlapping points and boxes as conflicts.
+
+    Args:
+        points: A list of Point objects.
+        boxes: A list of label boxes.
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        stats: Stats to count the calls and rectangle tests in (default None).
+
+    Returns:
+        Number of overlaps between label boxes and between label boxes and points.
+    """
+
+    num_label_overlaps = 0
+    num_label_point_overlaps = 0
+
+    # Boxes are bucketed by their anchor, so only nearby boxes are tested
+    grid = SpatialGrid(label_width, label_height)
+    for index, box in enumerate(boxes):
+        grid.insert(index, box.x, box.y)
+
+    query = grid.query
+    if stats is not None:
+        stats.count("calculate_overlaps_calls")
+        query = stats.counting(grid.query, "overlap_tests")
+
+    for index1, box1 in enumerate(boxes):
+        bx1, by1 = box1.x, box1.y
+
+        for index2 in query(
+            bx1 - label_width, by1 - label_height, bx1 + label_width, by1 + label_height
+        ):
+            # Each pair of boxes is only counted once
+            if index2 <= index1:
+                continue
+
+            box2 = boxes[index2]
+            bx2, by2 = box2.x, box2.y
+
+            if (
+                bx1 < bx2 + label_width
+                and bx1 + label_width > bx2
+                and by1 < by2 + label_height
+                and by1 + label_height > by2
+            ):
+                num_label_overlaps += 1
+                box1.conflict = True
+                box2.conflict = True
+
+    for point in points:
+        px, py = point.x, point.y
+
+        for index in query(
+            px - radius - label_width,
+            py - radius - label_height,
+            px + radius,
+            py + radius,
+        ):
+            box = boxes[index]
+            bx, by = box.x, box.y
+
+            if (
+                bx < px + radius
+                and bx + label_width > px - radius
+                and by < py + radius
+                and by + label_height > py - radius
+            ):
+                num_label_point_overlaps += 1
+                box.conflict = True
+                point.conflict = True
+
+    return num_label_overlaps + num_label_point_overlaps
+
+
+def create_drawing(
+    boundary_width: int = boundary_width,
+    boundary_height: int = boundary_height,
+    pixel_size: int = pixel_size,
+):
+    """Creates a Drawing object with a boundary rectangle and sets the render size.
+
+    Args:
+        boundary_width: Width of the boundary rectangle.
+        boundary_height: Height of the boundary rectangle.
+        pixel_size (int): Size of the rendering pixels.
+
+    Returns:
+        Drawing: A Drawing object.
+    """
+
+    from drawsvg import Drawing, Rectangle
+
+    d = Drawing(boundary_width, boundary_height)
+    boundary = Rectangle(
+        0, 0, width=boundary_width, height=boundary_height, fill="none", stroke="black"
+    )
+    d.append(boundary)
+    d.set_render_size(pixel_size, pixel_size)
+
+    return d
+
+
+def render_placement(
+    points: List[Point],
+    boxes: List[LabelBox],
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+) -> "Drawing":
+    """Build a drawing of the points and label boxes, with any conflicts colored red.
+
+    Args:
+        points: A list of Point objects.
+        boxes: The label boxes of the selected points, in the order of the points.
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+
+    Returns:
+        Drawing: A Drawing object.
+    """
+
+    from drawsvg import Circle, Rectangle
+
+    d = create_drawing()
+    label_boxes = iter(boxes)
+
+    # A selected Circle object always goes after its Rectangle object
+    for point in points:
+        if point.selected:
+            box = next(label_boxes)
+            d.append(
+                Rectangle(
+                    box.x,
+                    box.y,
+                    label_width,
+                    label_height,
+                    fill="none",
+                    stroke="red" if box.conflict else "black",
+                )
+            )
+        d.append(
+            Circle(point.x, point.y, radius, fill="red" if point.conflict else "black")
+        )
+
+    return d
+
+
+class PlacementResult:
+    """The outcome of a label placement, independent of any rendering.
+
+    Labels are indexed in the order of the selected points.
+    """
+
+    __slots__ = (
+        "positions",
+        "coordinates",
+        "num_overlaps",
+        "conflicts",
+        "point_conflicts",
+        "stats",
+        "converged",
+    )
+
+    def __init__(
+        self,
+        positions: List[int],
+        coordinates: List[Tuple[float, float]],
+        num_overlaps: int,
+        conflicts: Set[int],
+        point_conflicts: Set[int],
+        stats: Optional[Stats] = None,
+        converged: bool = True,
+    ):
+        """
+        Args:
+            positions: The position index of every label.
+            coordinates: The (x, y) coordinates of every label box.
+            num_overlaps: The number of overlaps of the placement.
+            conflicts: The indexes of the labels taking part in an overlap.
+            point_conflicts: The indexes of the points overlapped by a label.
+            stats: The Stats of the run, if it was instrumented.
+            converged: False if the search was stopped by its Budget before it
+                converged, in which case the placement is the best found so far.
+        """
+
+        self.positions = positions
+        self.coordinates = coordinates
+        self.num_overlaps = num_overlaps
+        self.conflicts = conflicts
+        self.point_conflicts = point_conflicts
+        self.stats = stats
+        self.converged = converged
+
+    def label_boxes(self) -> List[LabelBox]:
+        """Return the label boxes of the placement, with their conflict flags set."""
+
+        boxes = []
+        for index, ((x, y), position) in enumerate(
+            zip(self.coordinates, self.positions)
+        ):
+            box = LabelBox(x, y, position)
+            box.conflict = index in self.conflicts
+            boxes.append(box)
+
+        return boxes
+
+    def render(self, points: List[Point]) -> "Drawing":
+        """Build a drawing of the placement of the labels of points.
+
+        Args:
+            points: The points the placement was computed for.
+
+        Returns:
+            Drawing: A Drawing object.
+        """
+
+        for index, point in enumerate(points):
+            point.conflict = index in self.point_conflicts
+
+        return render_placement(points, self.label_boxes())
+
+    def save_svg(self, file_path: str, points: List[Point]) -> None:
+        """Stream the placement of the labels of points to an svg file.
+
+        Args:
+            file_path: The svg file to write.
+            points: The points the placement was computed for.
+        """
+
+        write_svg(
+            file_path, points, self.coordinates, self.conflicts, self.point_conflicts
+        )
+
+    def save_preview(self, file_path: str, points: List[Point]) -> None:
+        """Write a PNG overview of the placement of the labels of points.
+
+        Args:
+            file_path: The PNG file to write.
+            points: The points the placement was computed for.
+        """
+
+        write_raster_preview(
+            file_path, points, self.coordinates, self.conflicts, self.point_conflicts
+        )
+
+    def as_dict(self) -> dict:
+        """Return the result as a JSON serialisable dict."""
+
+        return {
+            "positions": list(self.positions),
+            "coordinates": [list(xy) for xy in self.coordinates],
+            "num_overlaps": self.num_overlaps,
+            "conflicts": sorted(self.conflicts),
+            "point_conflicts": sorted(self.point_conflicts),
+            "stats": self.stats.as_dict() if self.stats is not None else None,
+            "converged": self.converged,
+        }
+
+
+def evaluate_placement(
+    points: List[Point],
+    boxes: List[LabelBox],
+    stats: Optional[Stats] = None,
+    converged: bool = True,
+) -> PlacementResult:
+    """Count the overlaps of a placement and collect it in a PlacementResult.
+
+    Args:
+        points: A list of Point objects.
+        boxes: The label boxes of the selected points, in the order of the points.
+        stats: The Stats of the run, attached to the result (default None).
+        converged: Whether the search converged within its budget (default True).
+
+    Returns:
+        The PlacementResult of the placement.
+    """
+
+    reset_conflicts(points, boxes)
+    num_overlaps = calculate_overlaps(points, boxes)
+
+    return PlacementResult(
+        [box.position for box in boxes],
+        [(box.x, box.y) for box in boxes],
+        num_overlaps,
+        {index for index, box in enumerate(boxes) if box.conflict},
+        {index for index, point in enumerate(points) if point.conflict},
+        stats,
+        converged,
+    )
 
 
 class PointBoxGenerator:
@@ -218,6 +533,8 @@ class PointBoxGenerator:
         self.points = points if points is not None else []
         self.selected_points = selected_points if selected_points is not None else []
         self.label_boxes = label_boxes if label_boxes is not None else []
+        # The boxes draw from the generator of the points once they are generated
+        self.rng = random
 
     def generate_points(
         self,
@@ -225,70 +542,52 @@ class PointBoxGenerator:
         num_points=num_points_generated,
         num_points_selected=num_points_selected,
     ):
-        original_state = random.getstate()
-        random.seed(seed_value)
-
-        if 2 * Point.radius >= LabelBox.height:
-            y_start = Point.radius
-            y_end = self.area_height - Point.radius
-        else:
-            y_start = LabelBox.height / 2
-            y_end = self.area_height - LabelBox.height / 2
+        rng = self.rng = random.Random(seed_value)
+        y_start, y_end = point_y_range(self.area_height, Point.radius, LabelBox.height)
 
         for _ in range(num_points):
-            x = random.uniform(Point.radius, self.area_width - Point.radius)
-            y = random.uniform(y_start, y_end)
+            x = rng.uniform(Point.radius, self.area_width - Point.radius)
+            y = rng.uniform(y_start, y_end)
             point = Point(x, y)
             self.points.append(point)
 
-        self.selected_points = random.sample(self.points, num_points_selected)
-
-        random.setstate(original_state)
+        self.selected_points = rng.sample(self.points, num_points_selected)
+        for point in self.selected_points:
+            point.selected = True
 
     def add_a_label_box(
         self, selected_point: Point, label_point_distance=box_point_distance
     ) -> LabelBox:
-        pre_dir = None
-        directions = ["right", "above", "below", "left"]
+        candidate_xs, candidate_ys = candidate_boxes(
+            [selected_point.x],
+            [selected_point.y],
+            Point.radius,
+            LabelBox.width,
+            LabelBox.height,
+            label_point_distance,
+            backend="python",
+        )
+        within_boundary = candidates_within_boundary(
+            candidate_xs,
+            candidate_ys,
+            LabelBox.width,
+            LabelBox.height,
+            self.area_width,
+            self.area_height,
+            backend="python",
+        )[0]
+
+        # Try the positions in random order until the box is within the boundary
+        directions = list(range(len(positions)))
         while True:
-            if pre_dir is not None:
-                directions.remove(pre_dir)
-
-            direction = random.choice(directions)
-
-            if direction == "right":
-                x = selected_point.x + Point.radius + label_point_distance
-                y = selected_point.y - (LabelBox.height / 2)
-            elif direction == "above":
-                x = selected_point.x - (LabelBox.width / 2)
-                y = selected_point.y + Point.radius + label_point_distance
-            elif direction == "below":
-                x = selected_point.x - (LabelBox.width / 2)
-                y = (
-                    selected_point.y
-                    - Point.radius
-                    - label_point_distance
-                    - LabelBox.height
-                )
-            else:  # Left
-                x = (
-                    selected_point.x
-                    - Point.radius
-                    - label_point_distance
-                    - LabelBox.width
-                )
-                y = selected_point.y - (LabelBox.height / 2)
-
-            # Check if a box is within the boundary.
-            if (
-                0 <= x <= self.area_width - LabelBox.width
-                and 0 <= y <= self.area_height - LabelBox.height
-            ):
+            direction = self.rng.choice(directions)
+            if within_boundary[direction]:
                 break
-            pre_dir = direction
+            directions.remove(direction)
 
-        label_box_point = Coordinates(x, y)
-        return LabelBox(label_box_point.x, label_box_point.y)
+        return LabelBox(
+            candidate_xs[0][direction], candidate_ys[0][direction], direction
+        )
 
     def add_label_boxes(self):
         for point in self.selected_points:
@@ -319,20 +618,21 @@ class PointBoxGenerator:
         print(f"Total Label Boxes: {len(self.label_boxes)}")
 
 
-# Create an instance of PointGenerator
-generator = PointBoxGenerator()
+if __name__ == "__main__":
+    # Create an instance of PointGenerator
+    generator = PointBoxGenerator()
 
-# Generate random points
-generator.generate_points(seeds[0])
+    # Generate random points
+    generator.generate_points(seeds[0])
 
-# Add label boxes to a random selection of points
-generator.add_label_boxes()
+    # Add label boxes to a random selection of points
+    generator.add_label_boxes()
 
-# Print the coordinates of the label boxes
-generator.print_label_boxes()
+    # Print the coordinates of the label boxes
+    generator.print_label_boxes()
 
-all_distances = generator.box_distances(label_box=generator.label_boxes[0])
+    all_distances = generator.box_distances(label_box=generator.label_boxes[0])
 
-# Print the distances
-for key, distance in all_distances.items():
-    print(f"{key}: {distance}")
+    # Print the distances
+    for key, distance in all_distances.items():
+        print(f"{key}: {distance}")
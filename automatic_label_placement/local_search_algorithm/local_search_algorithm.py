@@ -1,73 +1,241 @@
 from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+    PlacementResult,
     generate_random_points,
-    reset_colors,
-    calculate_overlaps,
-    create_drawing
+    evaluate_placement,
+    label_boxes_from_positions,
 )
 from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    Worklist,
     generate_label_boxes,
+    random_placement,
+    build_overlap_tracker,
     move_red_boxes,
+    move_red_labels,
 )
-from drawsvg import Drawing, Rectangle
-import webbrowser
-import os
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.instrumentation import Stats, phase, profiling
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.convergence import Convergence
+from typing import TYPE_CHECKING, List, Optional, Sequence
 import random
+import os
 from automatic_label_placement.config_reader import *
 
 
-def local_search_algorithm(seed_value: int) -> None:
-    """Run the local search algorithm for label placement.
+if TYPE_CHECKING:
+    from automatic_label_placement.instance_cache import InstanceCache
+
+
+def local_search_solve(
+    points: List[Point],
+    backend: Optional[str] = None,
+    use_conflict_graph: bool = False,
+    rng: Optional[random.Random] = None,
+    stats: Optional[Stats] = None,
+    graph: Optional[ConflictGraph] = None,
+    budget: Optional[Budget] = None,
+    convergence: Optional[Convergence] = None,
+    initial_positions: Optional[Sequence[int]] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
+    """Place the labels of the selected points with the local search algorithm.
+
+    Every move keeps or lowers the number of overlaps, so when a budget stops the
+    search, even within an iteration, the current placement is the best found so far.
+    An iteration is one pass over the conflicting labels on the worklist, which holds
+    the labels whose neighbourhood changed since they were last examined. The search
+    stops once the worklist is empty, it revisits a placement or it stalls, as decided
+    by its Convergence. The initial placement is always completed.
 
     Args:
-        seed_value: Seed value for random number generation.
+        points: A list of Point objects.
+        backend: Backend generating the candidates of red boxes, "python" or "numpy"
+            (default numpy if it is installed).
+        use_conflict_graph: Precompute a ConflictGraph and run the search on graph
+            lookups instead of geometry (default False).
+        rng: The random number generator of the search (default the global random
+            module).
+        stats: Stats to record the counters and the initial_placement and optimise
+            phases in (default None).
+        graph: A precomputed ConflictGraph of the points, such as a cached one, to
+            use instead of building it (default None).
+        budget: A Budget limiting the search; once it is used up the search stops
+            with the best placement found so far (default None, run until converged).
+        convergence: The Convergence deciding when the search stops (default None, a
+            Convergence with the configured num_converge and min_improvement).
+        initial_positions: The position of every label to start from, such as the
+            positions of an exported placement (default None, random positions).
+        width: Width of the boundary the boxes have to lie within, when no graph is
+            given (default 2000).
+        height: Height of the boundary, when no graph is given (default 2000).
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
     """
 
-    # Prepare the svg graph
-    d = create_drawing()
+    with phase(stats, "initial_placement"):
+        if use_conflict_graph:
+            if graph is None:
+                graph = ConflictGraph(points, width=width, height=height)
+
+        # A graph knows which positions lie within its boundary
+        if initial_positions is not None:
+            boxes = label_boxes_from_positions(
+                points, initial_positions, width=width, height=height
+            )
+        elif use_conflict_graph:
+            boxes = graph.label_boxes(random_placement(graph, rng))
+        else:
+            boxes = generate_label_boxes(points, rng=rng, width=width, height=height)
+        worklist = Worklist(len(boxes))
 
-    points = generate_random_points(seed_value)
-    boxes = generate_label_boxes(points)
-    calculate_overlaps(points, boxes)
+        # The conflicts are counted per label and only drawn once the search is done
+        if use_conflict_graph:
+            state = PlacementState(graph, [box.position for box in boxes])
+        else:
+            tracker = build_overlap_tracker(points, boxes, stats)
 
-    # A selected Circle object always goes after a Rectangle object
-    for point, is_selected in points:
-        if is_selected:
-            d.append(boxes.pop(0))
-        d.append(point)
+        if convergence is None:
+            convergence = Convergence(stats=stats)
+        convergence.start(box.position for box in boxes)
 
     # Re-adjust the position of red boxes
-    min_num_overlaps = float("inf")
-    converge = 0
-    while True:
-        move_red_boxes(d)
-        reset_colors(d)
-
-        points = []
-        boxes = []
-
-        for j in range(1, len(d.elements)):
-            element = d.elements[j]
-            # A selected Circle object always goes after a Rectangle object
-            if isinstance(element, Rectangle):
-                boxes.append(element)
-                points.append((d.elements[j + 1], True))
+    with phase(stats, "optimise"):
+        while budget is None or budget.next_iteration():
+            if use_conflict_graph:
+                num_overlaps = move_red_labels(
+                    state,
+                    rng,
+                    stats,
+                    budget=budget,
+                    worklist=worklist,
+                    convergence=convergence,
+                )
             else:
-                points.append((d.elements[j], False))
+                num_overlaps = move_red_boxes(
+                    points,
+                    boxes,
+                    backend=backend,
+                    rng=rng,
+                    stats=stats,
+                    budget=budget,
+                    tracker=tracker,
+                    worklist=worklist,
+                    convergence=convergence,
+                    width=width,
+                    height=height,
+                )
 
-        num_overlaps = calculate_overlaps(points, boxes)
+            if stats is not None:
+                stats.count("iterations")
 
-        if min_num_overlaps == num_overlaps:
-            converge += 1
-            if converge == 4:
-                print(f"Numer of overlaps from local search algorithm: {num_overlaps}")
-                d.save_svg("local_search_algorithm.svg")
-                webbrowser.open(
-                    f"file://{os.path.abspath('local_search_algorithm.svg')}"
-                )
+            if not convergence.update(num_overlaps, len(worklist)):
                 break
+
+        if use_conflict_graph:
+            boxes = graph.label_boxes(state.placement)
+
+    return boxes
+
+
+def local_search_algorithm(
+    seed_value: int,
+    backend: Optional[str] = None,
+    use_conflict_graph: bool = False,
+    num_restarts: int = 1,
+    stats: Optional[Stats] = None,
+    output_file: Optional[str] = "local_search_algorithm.svg",
+    open_browser: bool = True,
+    cache: Optional["InstanceCache"] = None,
+    budget: Optional[Budget] = None,
+) -> PlacementResult:
+    """Run the local search algorithm for label placement.
+
+    Args:
+        seed_value: Seed value for random number generation.
+        backend: Backend generating the candidates of red boxes, "python" or "numpy"
+            (default numpy if it is installed).
+        use_conflict_graph: Precompute a ConflictGraph and run the search on graph
+            lookups instead of geometry (default False).
+        num_restarts: Run this many restarts in parallel with
+            multi_start_local_search, seeded from seed_value, and keep the best
+            (default 1). Multi-start runs on the ConflictGraph, so it needs
+            use_conflict_graph and takes no backend.
+        stats: Stats to record the run in, including the generate and render phases
+            (default None, no instrumentation).
+        output_file: The svg file to write the drawing to, or None to skip rendering
+            (default local_search_algorithm.svg).
+        open_browser: Whether to open the svg file in a web browser (default True).
+        cache: An InstanceCache to load the points and their ConflictGraph from
+            instead of generating them (default None).
+        budget: A Budget limiting the search; the result is the best placement found
+            within it and records whether the search converged (default None).
+
+    Returns:
+        The PlacementResult of the run, with the stats attached.
+    """
+
+    if num_restarts > 1 and (backend is not None or not use_conflict_graph):
+        raise ValueError(
+            "Multi-start runs on the conflict graph: pass use_conflict_graph=True "
+            "and no backend."
+        )
+
+    with profiling(stats):
+        with phase(stats, "generate"):
+            if cache is not None:
+                instance = cache.load(seed_value)
+                points, graph = instance.points, instance.graph
+            else:
+                points, graph = generate_random_points(seed_value), None
+        # The search draws from its own stream, so the caller's random state is kept
+        rng = random.Random(seed_value)
+
+        if num_restarts > 1:
+            # Only multi-start needs the process pool machinery
+            from automatic_label_placement.local_search_algorithm.multi_start_local_search import (
+                multi_start_local_search,
+            )
+
+            with phase(stats, "optimise"):
+                boxes = multi_start_local_search(
+                    points,
+                    num_restarts,
+                    master_seed=seed_value,
+                    instance_file=instance.path if cache is not None else None,
+                    budget=budget,
+                    stats=stats,
+                )
         else:
-            min_num_overlaps = num_overlaps
-            converge = 0
+            boxes = local_search_solve(
+                points,
+                backend,
+                use_conflict_graph,
+                rng,
+                stats=stats,
+                graph=graph,
+                budget=budget,
+            )
+
+        result = evaluate_placement(
+            points, boxes, stats, converged=budget is None or not budget.exhausted
+        )
+        print(f"Numer of overlaps from local search algorithm: {result.num_overlaps}")
+
+        # The svg graph is only built once the placement is final
+        if output_file is not None:
+            with phase(stats, "render"):
+                result.save_svg(output_file, points)
+
+    if output_file is not None and open_browser:
+        import webbrowser
+
+        webbrowser.open(f"file://{os.path.abspath(output_file)}")
+
+    return result
 
 
 if __name__ == "__main__":
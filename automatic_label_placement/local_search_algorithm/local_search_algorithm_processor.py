@@ -1,186 +1,420 @@
 import random
-from drawsvg import Drawing, Circle, Rectangle
-from typing import List, Tuple, Optional
+from typing import Container, Iterable, List, Optional
 from automatic_label_placement.config_reader import *
 from automatic_label_placement.label_placement_utils import (
-    reset_colors,
-    box_within_boundary,
-    calculate_overlaps,
+    Point,
+    LabelBox,
+)
+from automatic_label_placement.overlap_tracker import OverlapTracker
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.convergence import Convergence
+from automatic_label_placement.overlap_kernel import (
+    positions,
+    resolve_backend,
+    candidate_boxes,
+    candidate_offsets,
+    candidates_within_boundary,
 )
 
 
 def generate_label_boxes(
-    random_points: List[Tuple[Circle, bool]],
+    random_points: List[Point],
     radius: int = point_radius,
     label_width: int = box_width,
     label_height: int = box_height,
     label_distance: int = box_point_distance,
-) -> List[Rectangle]:
+    rng: Optional[random.Random] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
     """Generate label boxes for the selected points and the position of a box to the respective point
         is randomly generated.
 
     Args:
-        random_points: A list of tuples where the first element of a tuple is a Circle object and
-            the second element is a boolean indicating if the point is selected.
-        width:  width of the boundary (default 2000).
-        height: height of the boundary within which the points are generated (default 2000).
+        random_points: A list of Point objects.
         radius: radius of each point (default 4).
         label_width: Width of the label boxes (default 88).
         label_height: Height of the label boxes (default 23).
         label_distance: Distance between the label boxes and the points (default 1).
+        rng: The random number generator to draw positions from (default the global
+            random module).
+        width: Width of the boundary the boxes have to lie within (default 2000).
+        height: Height of the boundary (default 2000).
 
     Returns:
-        label_boxes: A list of label boxes.
+        label_boxes: A list of label boxes, in the order of the selected points.
     """
 
+    rng = rng if rng is not None else random
+    selected_points = [point for point in random_points if point.selected]
+
+    # All candidate boxes are computed at once from the table of position offsets
+    candidate_xs, candidate_ys = candidate_boxes(
+        [point.x for point in selected_points],
+        [point.y for point in selected_points],
+        radius,
+        label_width,
+        label_height,
+        label_distance,
+        backend="python",
+    )
+    within_boundary = candidates_within_boundary(
+        candidate_xs,
+        candidate_ys,
+        label_width,
+        label_height,
+        width,
+        height,
+        backend="python",
+    )
+
     label_boxes = []
-    positions = ["right", "above", "below", "left"]
-
-    for random_point, is_selected in random_points:
-        x, y = random_point.args["cx"], random_point.args["cy"]
-
-        if is_selected:
-            position = random.choice(positions)
-
-            while True:
-                if position == "right":
-                    label_x = x + radius + label_distance
-                    label_y = y - label_height / 2
-                elif position == "above":
-                    label_x = x - label_width / 2
-                    label_y = y + radius + label_distance
-                elif position == "below":
-                    label_x = x - label_width / 2
-                    label_y = y - radius - label_distance - label_height
-                else:  # Left
-                    label_x = x - radius - label_distance - label_width
-                    label_y = y - label_height / 2
-
-                if box_within_boundary(label_x, label_y):
-                    break
-
-                position = random.choice(positions)
-
-            label_box = Rectangle(
-                label_x, label_y, label_width, label_height, fill="none", stroke="black"
-            )
-            label_boxes.append(label_box)
+    for row_xs, row_ys, row_within_boundary in zip(
+        candidate_xs, candidate_ys, within_boundary
+    ):
+        position = random_position(row_within_boundary, rng)
+        label_boxes.append(LabelBox(row_xs[position], row_ys[position], position))
 
     return label_boxes
 
 
-def find_red_boxes(d: Drawing) -> Tuple[List[int], List[int]]:
-    """Find all the indexes of red boxes and their corresponding points in the given list of elements.
+def random_position(
+    within_boundary: List[bool], rng: Optional[random.Random] = None
+) -> int:
+    """Draw a random position among those whose box lies within the boundary.
 
     Args:
-        d: A Drawing object.
+        within_boundary: Whether the box of the label lies within the boundary, for
+            each position.
+        rng: The random number generator to draw from (default the global random
+            module).
 
     Returns:
-        A tuple with two lists:
-            - red_box_indexes: A list of indexes of red boxes.
-            - corresponding_point_indexes: A list of corresponding point indexes.
+        The index of the position.
     """
 
-    red_box_indexes = [
-        index
-        for index, element in enumerate(d.elements)
-        if isinstance(element, Rectangle) and element.args.get("stroke") == "red"
-    ]
-
-    corresponding_point_indexes = [index + 1 for index in red_box_indexes]
+    rng = rng if rng is not None else random
+    if not any(within_boundary):
+        raise ValueError("A label does not fit within the boundary.")
 
-    return red_box_indexes, corresponding_point_indexes
+    position_indexes = range(len(within_boundary))
+    position = rng.choice(position_indexes)
+    while not within_boundary[position]:
+        position = rng.choice(position_indexes)
+    return position
 
 
-def process_position(
-    d: Drawing,
-    i: int,
-    label_x: float,
-    label_y: float,
-) -> Optional[int]:
-    """Process the position of a label within specified boundaries, update element positions, reset colors,
-        and calculate overlaps.
+def random_placement(
+    graph: ConflictGraph, rng: Optional[random.Random] = None
+) -> List[int]:
+    """Draw a random valid position for every label of a conflict graph, the same
+    positions generate_label_boxes draws for the points of the graph.
 
     Args:
-        d: A Drawing object.
-        i: The index of the element in d.elements.
-        label_x: The x-coordinate of the label.
-        label_y: The y-coordinate of the label.
+        graph: The ConflictGraph of the points.
+        rng: The random number generator to draw from (default the global random
+            module).
 
     Returns:
-        Optional[int]: The total number of label overlaps and label-point overlaps, or
-            None if the label is outside the boundaries.
+        The position of every label.
+    """
+
+    rng = rng if rng is not None else random
+    num_positions = graph.num_positions
+    return [
+        random_position(
+            graph.valid[label * num_positions : (label + 1) * num_positions], rng
+        )
+        for label in range(graph.num_labels)
+    ]
+
+
+class Worklist:
+    """The labels to examine in the next pass of the local search.
+
+    A label is queued when the overlaps of one of its candidate positions may have
+    changed since it was last examined. Its flag in queued stays set until it is
+    examined, so it is queued at most once, and labels queued during a pass are
+    examined in the next one.
     """
 
-    if box_within_boundary(label_x, label_y):
-        d.elements[i - 1].args["x"] = label_x
-        d.elements[i - 1].args["y"] = label_y
+    __slots__ = ("labels", "queued")
 
-        reset_colors(d)
-        points = []
-        boxes = []
+    def __init__(self, num_labels: int, labels: Optional[Iterable[int]] = None):
+        """
+        Args:
+            num_labels: The number of labels.
+            labels: The labels to queue first (default all labels).
+        """
 
-        for j in range(1, len(d.elements)):
-            element = d.elements[j]
-            # A selected Circle object always goes after a Rectangle object
-            if isinstance(element, Rectangle):
-                boxes.append(element)
-                points.append((d.elements[j + 1], True))
-            else:
-                points.append((d.elements[j], False))
+        self.labels: List[int] = []
+        self.queued = bytearray(num_labels)
+        for label in labels if labels is not None else range(num_labels):
+            self.push(label)
 
-        return calculate_overlaps(points, boxes)
-    else:
-        return None
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def push(self, label: int) -> None:
+        """Queue a label unless it is already waiting."""
+
+        if not self.queued[label]:
+            self.queued[label] = 1
+            self.labels.append(label)
+
+    def take(self) -> List[int]:
+        """Return the queued labels in increasing order and start a new pass.
+
+        The labels stay flagged until examine is called for them, so a label taken
+        but not yet examined is not queued again.
+        """
+
+        labels = sorted(self.labels)
+        self.labels = []
+        return labels
+
+    def examine(self, label: int) -> None:
+        """Clear the flag of a taken label when it is examined."""
+
+        self.queued[label] = 0
+
+    def requeue(self, labels: List[int]) -> None:
+        """Put back taken labels that were not examined, such as when a budget ran out."""
+
+        self.labels.extend(labels)
+
+
+def build_overlap_tracker(
+    points: List[Point], boxes: List[LabelBox], stats: Optional[Stats] = None
+) -> OverlapTracker:
+    """Build an overlap tracker for the points and label boxes.
+
+    Args:
+        points: A list of Point objects.
+        boxes: A list of label boxes.
+        stats: Stats to count the rectangle tests in (default None).
+
+    Returns:
+        An OverlapTracker over all points and label boxes.
+    """
+
+    return OverlapTracker(
+        [(point.x, point.y) for point in points],
+        [(box.x, box.y) for box in boxes],
+        stats=stats,
+    )
 
 
 def move_red_boxes(
-    d: Drawing,
+    points: List[Point],
+    boxes: List[LabelBox],
     label_height: int = box_height,
     label_width: int = box_width,
     radius: int = point_radius,
     label_distance: int = box_point_distance,
-) -> None:
-    """Move red boxes around corresponding points to a position with minimal number
-        of overlaps.
+    backend: Optional[str] = None,
+    rng: Optional[random.Random] = None,
+    stats: Optional[Stats] = None,
+    budget: Optional[Budget] = None,
+    tracker: Optional[OverlapTracker] = None,
+    worklist: Optional[Worklist] = None,
+    convergence: Optional[Convergence] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> int:
+    """Move the red boxes on the worklist around corresponding points to a position
+        with minimal number of overlaps.
+
+    A box is red while its counter in tracker.label_overlaps is positive. Moving a box
+    queues the boxes that have a candidate position near its old or new position.
 
     Args:
-        d: A Drawing object.
+        points: A list of Point objects.
+        boxes: The label boxes of the selected points, in the order of the points.
         label_height: The height of the label (default 23).
         label_width: The width of the label (default 88).
         radius: The radius of the points (default 4).
         label_distance: The distance between labels and points (default 1).
+        backend: Backend of the overlap kernel generating the candidates of the
+            pass, "python" or "numpy" (default numpy if it is installed). Positions
+            are always scored with the neighbourhood of the box in the OverlapTracker.
+        rng: The random number generator to break ties with (default the global
+            random module).
+        stats: Stats to count the candidate evaluations and accepted moves in
+            (default None).
+        budget: A Budget polled between moves; the remaining labels stay on the
+            worklist once its time limit passes (default None).
+        tracker: The OverlapTracker of the points and boxes, kept up to date between
+            passes (default None, build one).
+        worklist: The Worklist of the pass (default None, examine every box once).
+        convergence: A Convergence whose signature follows the moves (default None).
+        width: Width of the boundary the boxes have to lie within (default 2000).
+        height: Height of the boundary (default 2000).
+
+    Returns:
+        The total number of overlaps after the red boxes have been moved.
     """
 
-    corresponding_point_indexes = find_red_boxes(d)[1]
-    positions = ["right", "above", "below", "left"]
-
-    for i in corresponding_point_indexes:
-        x = d.elements[i].args["cx"]
-        y = d.elements[i].args["cy"]
-        label_positions = []
-
-        for p in positions:
-            if p == "right":
-                label_x = x + radius + label_distance
-                label_y = y - label_height / 2
-            elif p == "above":
-                label_x = x - label_width / 2
-                label_y = y + radius + label_distance
-            elif p == "below":
-                label_x = x - label_width / 2
-                label_y = y - radius - label_distance - label_height
-            else:
-                label_x = x - radius - label_distance - label_width
-                label_y = y - label_height / 2
-
-            result = process_position(d, i, label_x, label_y)
-            if result is not None:
-                label_positions.append((p, result, (label_x, label_y)))
+    rng = rng if rng is not None else random
+    backend = resolve_backend(backend)
+    selected_points = [point for point in points if point.selected]
+    if tracker is None:
+        tracker = build_overlap_tracker(points, boxes, stats)
+    if worklist is None:
+        worklist = Worklist(len(boxes))
+    label_overlaps = tracker.label_overlaps
+
+    # A move can only change the costs of the boxes within the spread of the positions
+    offset_xs, offset_ys = candidate_offsets(
+        radius, label_width, label_height, label_distance
+    )
+    margin_x = max(offset_xs) - min(offset_xs)
+    margin_y = max(offset_ys) - min(offset_ys)
+
+    # The candidates of every label of the pass come from one batched kernel call
+    labels = worklist.take()
+    candidate_xs, candidate_ys = candidate_boxes(
+        [selected_points[k].x for k in labels],
+        [selected_points[k].y for k in labels],
+        radius,
+        label_width,
+        label_height,
+        label_distance,
+        backend,
+    )
+    within_boundary = candidates_within_boundary(
+        candidate_xs,
+        candidate_ys,
+        label_width,
+        label_height,
+        width,
+        height,
+        backend=backend,
+    )
+    if backend == "numpy":
+        candidate_xs = candidate_xs.tolist()
+        candidate_ys = candidate_ys.tolist()
+        within_boundary = within_boundary.tolist()
+
+    for index, k in enumerate(labels):
+        if budget is not None and budget.expired():
+            worklist.requeue(labels[index:])
+            break
+
+        worklist.examine(k)
+        if label_overlaps[k] == 0:
+            continue
+
+        # Only the neighbourhood of the box is needed to score a position
+        row_xs, row_ys = candidate_xs[index], candidate_ys[index]
+        row_within_boundary = within_boundary[index]
+        label_positions = [
+            (p, tracker.cost(k, row_xs[p], row_ys[p]), (row_xs[p], row_ys[p]))
+            for p in range(len(positions))
+            if row_within_boundary[p]
+        ]
 
         min_value = min(label_positions, key=lambda x: x[1])[1]
         min_positions = [pos for pos in label_positions if pos[1] == min_value]
-        selected_position = random.choice(min_positions)
-        process_position(
-            d, i, float(selected_position[2][0]), float(selected_position[2][1])
-        )
+        selected_position = rng.choice(min_positions)
+        p, _, (label_x, label_y) = selected_position
+
+        box = boxes[k]
+        if stats is not None:
+            stats.count("candidate_evaluations", len(label_positions))
+            stats.count("accepted_moves", int(p != box.position))
+        # A label with a tie may take another of its cheapest positions next pass
+        if len(min_positions) > 1:
+            worklist.push(k)
+        if p == box.position:
+            continue
+
+        for x, y in ((box.x, box.y), (label_x, label_y)):
+            for other in tracker.boxes_near(x, y, margin_x, margin_y):
+                if other != k:
+                    worklist.push(other)
+
+        if convergence is not None:
+            convergence.moved(k, box.position, p)
+        tracker.move(k, label_x, label_y)
+        box.x, box.y, box.position = label_x, label_y, p
+
+    return tracker.total
+
+
+def move_red_labels(
+    state: PlacementState,
+    rng: Optional[random.Random] = None,
+    stats: Optional[Stats] = None,
+    movable: Optional[Container[int]] = None,
+    budget: Optional[Budget] = None,
+    worklist: Optional[Worklist] = None,
+    convergence: Optional[Convergence] = None,
+) -> int:
+    """Move the conflicting labels on the worklist to a position with minimal number of
+        overlaps, using conflict graph lookups only.
+
+    A label conflicts while the count of its placed candidate in the state is positive.
+    Moving a label queues the labels with a candidate overlapping its old or new one.
+
+    Args:
+        state: The PlacementState of the labels, updated in place.
+        rng: The random number generator to break ties with (default the global
+            random module).
+        stats: Stats to count the candidate evaluations and accepted moves in
+            (default None).
+        movable: The labels that may be moved; the others keep their position
+            (default all labels).
+        budget: A Budget polled between moves; the remaining labels stay on the
+            worklist once its time limit passes (default None).
+        worklist: The Worklist of the pass (default None, examine every label once).
+        convergence: A Convergence whose signature follows the moves (default None).
+
+    Returns:
+        The total number of overlaps after the labels have been moved.
+    """
+
+    rng = rng if rng is not None else random
+    graph, placement = state.graph, state.placement
+    num_positions = graph.num_positions
+    if worklist is None:
+        worklist = Worklist(len(placement))
+
+    labels = worklist.take()
+    for index, k in enumerate(labels):
+        if budget is not None and budget.expired():
+            worklist.requeue(labels[index:])
+            break
+
+        worklist.examine(k)
+        current = placement[k]
+        if movable is not None and k not in movable:
+            continue
+        if current < 0 or state.cost(k, current) == 0:
+            continue
+
+        label_positions = [(p, state.cost(k, p)) for p in graph.valid_positions(k)]
+
+        min_value = min(label_positions, key=lambda x: x[1])[1]
+        min_positions = [pos for pos in label_positions if pos[1] == min_value]
+        p = rng.choice(min_positions)[0]
+
+        if stats is not None:
+            stats.count("candidate_evaluations", len(label_positions))
+            stats.count("accepted_moves", int(p != current))
+        # A label with a tie may take another of its cheapest positions next pass
+        if len(min_positions) > 1:
+            worklist.push(k)
+        if p == current:
+            continue
+
+        for position in (current, p):
+            for other in graph.neighbours[graph.node(k, position)]:
+                worklist.push(other // num_positions)
+        if convergence is not None:
+            convergence.moved(k, current, p)
+        state.move(k, p)
+
+    return state.total
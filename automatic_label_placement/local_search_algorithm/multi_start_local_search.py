@@ -0,0 +1,221 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+    label_boxes_from_positions,
+)
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.convergence import Convergence
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    Worklist,
+    generate_label_boxes,
+    move_red_labels,
+)
+
+
+# Set in every worker process by _init_worker
+_points: List[Point] = []
+_graph: Optional[ConflictGraph] = None
+
+
+class Restart:
+    """State of one restart of the local search, passed between the workers and the
+    coordinating process at every checkpoint."""
+
+    __slots__ = (
+        "index",
+        "rng_state",
+        "placement",
+        "worklist",
+        "convergence",
+        "stats",
+        "num_overlaps",
+        "converged",
+        "abandoned",
+    )
+
+    def __init__(self, index: int, seed_value: int, collect_stats: bool = False):
+        """
+        Args:
+            index: The index of the restart.
+            seed_value: Seed of the random stream of the restart.
+            collect_stats: Count the moves and iterations of the restart in its own
+                Stats (default False).
+        """
+
+        self.index = index
+        self.rng_state = random.Random(seed_value).getstate()
+        self.placement: Optional[List[int]] = None
+        self.worklist: Optional[Worklist] = None
+        self.stats = Stats() if collect_stats else None
+        self.convergence = Convergence(stats=self.stats)
+        self.num_overlaps = float("inf")
+        self.converged = False
+        self.abandoned = False
+
+
+def _init_worker(points: List[Point], instance_file: Optional[str] = None) -> None:
+    """Build the conflict graph once per worker process, or map it from a cache file."""
+
+    global _points, _graph
+    _points = points
+    if instance_file is not None:
+        from automatic_label_placement.instance_cache import CachedInstance
+
+        _graph = CachedInstance(instance_file).graph
+    else:
+        _graph = ConflictGraph(points)
+
+
+def _advance_restart(restart: Restart, num_iterations: int) -> Restart:
+    """Run up to num_iterations local search iterations of a restart.
+
+    Args:
+        restart: The restart to advance.
+        num_iterations: Number of iterations to run before the next checkpoint.
+
+    Returns:
+        The advanced restart.
+    """
+
+    rng = random.Random()
+    rng.setstate(restart.rng_state)
+
+    if restart.placement is None:
+        boxes = generate_label_boxes(_points, rng=rng)
+        restart.placement = [box.position for box in boxes]
+        restart.worklist = Worklist(len(boxes))
+        restart.convergence.start(restart.placement)
+
+    state = PlacementState(_graph, restart.placement)
+    restart.num_overlaps = state.total
+    for _ in range(num_iterations):
+        restart.num_overlaps = move_red_labels(
+            state,
+            rng,
+            restart.stats,
+            worklist=restart.worklist,
+            convergence=restart.convergence,
+        )
+        if restart.stats is not None:
+            restart.stats.count("iterations")
+
+        if not restart.convergence.update(restart.num_overlaps, len(restart.worklist)):
+            restart.converged = True
+            break
+
+    restart.placement = state.placement
+    restart.rng_state = rng.getstate()
+    return restart
+
+
+def multi_start_local_search(
+    points: List[Point],
+    num_restarts: int = 8,
+    master_seed: int = 0,
+    max_workers: Optional[int] = None,
+    check_interval: int = 2,
+    abandon_ratio: float = 1.1,
+    instance_file: Optional[str] = None,
+    budget: Optional[Budget] = None,
+    stats: Optional[Stats] = None,
+) -> List[LabelBox]:
+    """Run independent restarts of the local search in parallel and keep the best one.
+
+    Every restart draws from its own random.Random stream seeded from the master seed
+    and runs on the ConflictGraph. The restarts are advanced in rounds of
+    check_interval iterations; after each round the best overlap count over all
+    restarts is shared and restarts with more than abandon_ratio times as many
+    overlaps are abandoned. The number of overlaps of a restart never increases, so
+    the shared best only gets tighter. Decisions are only taken between rounds, so
+    the result depends on the master seed but not on the number of workers.
+
+    Args:
+        points: A list of Point objects.
+        num_restarts: Number of restarts (default 8).
+        master_seed: Seed the restart seeds are drawn from (default 0).
+        max_workers: Number of worker processes (default the number of CPUs).
+        check_interval: Iterations between two checkpoints (default 2).
+        abandon_ratio: Restarts with more than this times the best number of overlaps
+            are abandoned at a checkpoint (default 1.1).
+        instance_file: An InstanceCache file of the points the workers map their
+            ConflictGraph from instead of building it (default None).
+        budget: A Budget checked before every round, which counts as check_interval
+            iterations; the first round always runs, and a round is never interrupted
+            (default None).
+        stats: Stats to add the counters of all restarts to, with a record per
+            restart under "restarts" (default None).
+
+    Returns:
+        boxes: The label boxes of the best restart, in the order of the points; ties
+            go to the restart with the lowest index.
+    """
+
+    master_rng = random.Random(master_seed)
+    restarts = [
+        Restart(index, master_rng.getrandbits(64), stats is not None)
+        for index in range(num_restarts)
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(points, instance_file),
+    ) as executor:
+        num_rounds = 0
+        while True:
+            active = [r for r in restarts if not r.converged and not r.abandoned]
+            if not active:
+                break
+
+            # The first round always runs, so every restart has a placement
+            if (
+                budget is not None
+                and not budget.next_iteration(check_interval)
+                and num_rounds > 0
+            ):
+                break
+            num_rounds += 1
+
+            advanced = executor.map(
+                _advance_restart, active, [check_interval] * len(active)
+            )
+            for restart in advanced:
+                restarts[restart.index] = restart
+
+            best_num_overlaps = min(r.num_overlaps for r in restarts if not r.abandoned)
+            for restart in restarts:
+                if (
+                    not restart.converged
+                    and restart.num_overlaps > abandon_ratio * best_num_overlaps
+                ):
+                    restart.abandoned = True
+
+    best = min(
+        (r for r in restarts if not r.abandoned),
+        key=lambda r: (r.num_overlaps, r.index),
+    )
+
+    if stats is not None:
+        stats.count("rounds", num_rounds)
+        for restart in restarts:
+            for name, n in restart.stats.counters.items():
+                stats.count(name, n)
+            stats.record(
+                "restarts",
+                {
+                    "restart": restart.index,
+                    "num_overlaps": restart.num_overlaps,
+                    "iterations": restart.convergence.iterations,
+                    "stop": restart.convergence.reason,
+                    "abandoned": restart.abandoned,
+                },
+            )
+
+    # Only the boxes of the chosen positions are needed, not the whole graph
+    return label_boxes_from_positions(points, best.placement)
@@ -0,0 +1,324 @@
+import importlib.util
+from typing import List, Optional, Sequence, Tuple, Union
+from automatic_label_placement.config_reader import *
+
+# NumPy is optional and only imported once the numpy backend is used
+np = None
+
+backends = ("python", "numpy")
+default_backend = "numpy" if importlib.util.find_spec("numpy") else "python"
+
+# Every candidate position around a point as (name, fx, gx, fy, gy): the box of the
+# label of a point at (x, y) has its corner at
+# x + fx * (radius + label_distance) + gx * label_width and
+# y + fy * (radius + label_distance) + gy * label_height
+position_table = [
+    ("right", 1, 0, 0, -0.5),
+    ("above", 0, -0.5, 1, 0),
+    ("below", 0, -0.5, -1, -1),
+    ("left", -1, -1, 0, -0.5),
+    ("above right", 1, 0, 1, 0),
+    ("below right", 1, 0, -1, -1),
+    ("above left", -1, -1, 1, 0),
+    ("below left", -1, -1, -1, -1),
+]
+
+if not 1 <= num_label_positions <= len(position_table):
+    raise ValueError(
+        f"num_label_positions must lie between 1 and {len(position_table)}."
+    )
+
+# Order of the candidate positions around a point, the first num_label_positions rows
+# of position_table
+positions = [row[0] for row in position_table[:num_label_positions]]
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Validate a backend name, falling back to the default backend when None.
+
+    Args:
+        backend: "python", "numpy" or None.
+
+    Returns:
+        The name of the backend to use.
+    """
+
+    if backend is None:
+        backend = default_backend
+    if backend not in backends:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {backends}.")
+    if backend == "numpy":
+        load_numpy()
+    return backend
+
+
+def load_numpy():
+    """Import NumPy on first use and return the module."""
+
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "The numpy backend requires NumPy to be installed."
+            ) from None
+        np = numpy
+
+    return np
+
+
+def candidate_boxes(
+    xs: Sequence[float],
+    ys: Sequence[float],
+    radius: int = point_radius,
+    label_width: Union[float, Sequence[float]] = box_width,
+    label_height: Union[float, Sequence[float]] = box_height,
+    label_distance: int = box_point_distance,
+    backend: Optional[str] = None,
+):
+    """Compute the K candidate label boxes for each of S points in one pass.
+
+    The boxes are the corners of the points shifted by the rows of position_table, so
+    all labels share one table of offsets, or one per size for labels of their own
+    size.
+
+    Args:
+        xs: X-coordinates of the S points.
+        ys: Y-coordinates of the S points.
+        radius: radius of each point (default 4).
+        label_width: Width of the label boxes, or of the label of every point
+            (default 88).
+        label_height: Height of the label boxes, or of the label of every point
+            (default 23).
+        label_distance: Distance between the label boxes and the points (default 1).
+        backend: "python", "numpy" or None for the default backend.
+
+    Returns:
+        A tuple (candidate_xs, candidate_ys) of S x K arrays (nested lists with the
+        python backend) where column p holds the box for positions[p].
+    """
+
+    backend = resolve_backend(backend)
+    reach = radius + label_distance
+    table = position_table[: len(positions)]
+
+    if backend == "numpy":
+        _, *columns = zip(*table)
+        fx, gx, fy, gy = (np.array(column, dtype=float) for column in columns)
+        widths = np.asarray(label_width, dtype=float)[..., None]
+        heights = np.asarray(label_height, dtype=float)[..., None]
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        return (
+            xs[:, None] + (fx * reach + gx * widths),
+            ys[:, None] + (fy * reach + gy * heights),
+        )
+
+    if isinstance(label_width, (int, float)) and isinstance(label_height, (int, float)):
+        dx, dy = candidate_offsets(radius, label_width, label_height, label_distance)
+        candidate_xs = [[x + d for d in dx] for x in xs]
+        candidate_ys = [[y + d for d in dy] for y in ys]
+        return candidate_xs, candidate_ys
+
+    widths = per_label(label_width, len(xs))
+    heights = per_label(label_height, len(ys))
+    candidate_xs = [
+        [x + fx * reach + gx * w for _, fx, gx, _, _ in table]
+        for x, w in zip(xs, widths)
+    ]
+    candidate_ys = [
+        [y + fy * reach + gy * h for _, _, _, fy, gy in table]
+        for y, h in zip(ys, heights)
+    ]
+    return candidate_xs, candidate_ys
+
+
+def candidate_offsets(
+    radius: int = point_radius,
+    label_width: float = box_width,
+    label_height: float = box_height,
+    label_distance: int = box_point_distance,
+) -> Tuple[List[float], List[float]]:
+    """Return the offsets of the candidate boxes of a label from its point.
+
+    Args:
+        radius: radius of each point (default 4).
+        label_width: Width of the label box (default 88).
+        label_height: Height of the label box (default 23).
+        label_distance: Distance between the label boxes and the points (default 1).
+
+    Returns:
+        A tuple (dx, dy) with the offset of the box for every one of positions.
+    """
+
+    reach = radius + label_distance
+    table = position_table[: len(positions)]
+
+    return (
+        [fx * reach + gx * label_width for _, fx, gx, _, _ in table],
+        [fy * reach + gy * label_height for _, _, _, fy, gy in table],
+    )
+
+
+def per_label(size: Union[float, Sequence[float]], num_labels: int) -> Sequence[float]:
+    """Return a size for every label from a shared size or a sequence of sizes."""
+
+    if isinstance(size, (int, float)):
+        return [size] * num_labels
+    if len(size) != num_labels:
+        raise ValueError("Label sizes must be given for every label.")
+    return size
+
+
+def candidates_within_boundary(
+    candidate_xs,
+    candidate_ys,
+    label_width: Union[float, Sequence[float]] = box_width,
+    label_height: Union[float, Sequence[float]] = box_height,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    backend: Optional[str] = None,
+):
+    """Check for each candidate box whether it lies within the boundary.
+
+    Args:
+        candidate_xs: S x K x-coordinates of the candidate boxes.
+        candidate_ys: S x K y-coordinates of the candidate boxes.
+        label_width: Width of the label boxes, or of the label of every row
+            (default 88).
+        label_height: Height of the label boxes, or of the label of every row
+            (default 23).
+        width: width of the boundary (default 2000).
+        height: height of the boundary (default 2000).
+        backend: "python", "numpy" or None for the default backend.
+
+    Returns:
+        An S x K boolean mask.
+    """
+
+    backend = resolve_backend(backend)
+
+    if backend == "numpy":
+        candidate_xs = np.asarray(candidate_xs)
+        candidate_ys = np.asarray(candidate_ys)
+        widths = np.asarray(label_width, dtype=float)[..., None]
+        heights = np.asarray(label_height, dtype=float)[..., None]
+        return (
+            (0 <= candidate_xs)
+            & (candidate_xs <= width - widths)
+            & (0 <= candidate_ys)
+            & (candidate_ys <= height - heights)
+        )
+
+    widths = per_label(label_width, len(candidate_xs))
+    heights = per_label(label_height, len(candidate_ys))
+    return [
+        [0 <= x <= width - w and 0 <= y <= height - h for x, y in zip(row_xs, row_ys)]
+        for row_xs, row_ys, w, h in zip(candidate_xs, candidate_ys, widths, heights)
+    ]
+
+
+def count_candidate_overlaps(
+    candidate_xs,
+    candidate_ys,
+    point_xs: Sequence[float],
+    point_ys: Sequence[float],
+    box_xs: Sequence[float],
+    box_ys: Sequence[float],
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    skip_boxes: Optional[Sequence[int]] = None,
+    backend: Optional[str] = None,
+    chunk_size: int = 256,
+):
+    """Count, for every candidate box, its overlaps with the points and the committed boxes.
+
+    Args:
+        candidate_xs: S x K x-coordinates of the candidate boxes.
+        candidate_ys: S x K y-coordinates of the candidate boxes.
+        point_xs: X-coordinates of the points.
+        point_ys: Y-coordinates of the points.
+        box_xs: X-coordinates of the committed label boxes.
+        box_ys: Y-coordinates of the committed label boxes.
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        skip_boxes: For each of the S rows, the index of a committed box to ignore (the
+            current box of the label being re-placed), or -1 to ignore none.
+        backend: "python", "numpy" or None for the default backend.
+        chunk_size: Number of rows scored per vectorized step, bounding the memory of the
+            numpy backend.
+
+    Returns:
+        An S x K matrix of overlap counts.
+    """
+
+    backend = resolve_backend(backend)
+
+    if backend == "numpy":
+        candidate_xs = np.asarray(candidate_xs, dtype=float)
+        candidate_ys = np.asarray(candidate_ys, dtype=float)
+        point_xs = np.asarray(point_xs, dtype=float)
+        point_ys = np.asarray(point_ys, dtype=float)
+        box_xs = np.asarray(box_xs, dtype=float)
+        box_ys = np.asarray(box_ys, dtype=float)
+        counts = np.zeros(candidate_xs.shape, dtype=np.int64)
+
+        for start in range(0, len(candidate_xs), chunk_size):
+            stop = start + chunk_size
+            cx = candidate_xs[start:stop, :, None]
+            cy = candidate_ys[start:stop, :, None]
+
+            label_overlaps = (
+                (cx < box_xs + label_width)
+                & (cx + label_width > box_xs)
+                & (cy < box_ys + label_height)
+                & (cy + label_height > box_ys)
+            )
+            if skip_boxes is not None:
+                rows = np.arange(len(cx))
+                skip = np.asarray(skip_boxes[start:stop])
+                valid = skip >= 0
+                label_overlaps[rows[valid], :, skip[valid]] = False
+
+            point_overlaps = (
+                (cx < point_xs + radius)
+                & (cx + label_width > point_xs - radius)
+                & (cy < point_ys + radius)
+                & (cy + label_height > point_ys - radius)
+            )
+            counts[start:stop] = label_overlaps.sum(axis=2) + point_overlaps.sum(axis=2)
+
+        return counts
+
+    counts = []
+    for s, (row_xs, row_ys) in enumerate(zip(candidate_xs, candidate_ys)):
+        skip = skip_boxes[s] if skip_boxes is not None else -1
+        row_counts = []
+
+        for x, y in zip(row_xs, row_ys):
+            num_overlaps = 0
+            for b, (bx, by) in enumerate(zip(box_xs, box_ys)):
+                if (
+                    b != skip
+                    and x < bx + label_width
+                    and x + label_width > bx
+                    and y < by + label_height
+                    and y + label_height > by
+                ):
+                    num_overlaps += 1
+            for px, py in zip(point_xs, point_ys):
+                if (
+                    x < px + radius
+                    and x + label_width > px - radius
+                    and y < py + radius
+                    and y + label_height > py - radius
+                ):
+                    num_overlaps += 1
+            row_counts.append(num_overlaps)
+
+        counts.append(row_counts)
+
+    return counts
@@ -0,0 +1,207 @@
+from array import array
+from typing import List, Optional, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.instrumentation import Stats
+
+
+class OverlapTracker:
+    """Keep a running overlap count that is updated locally when a single box moves.
+
+    Moving one box only changes the overlaps that box takes part in, so the change of the
+    total is found by looking at the boxes and points in its neighbourhood only. The
+    number of overlaps of every box is kept in label_overlaps, so a box is a conflict
+    exactly when its counter is positive.
+    """
+
+    def __init__(
+        self,
+        point_coordinates: List[Tuple[float, float]],
+        box_coordinates: List[Tuple[float, float]],
+        radius: int = point_radius,
+        label_width: int = box_width,
+        label_height: int = box_height,
+        stats: Optional[Stats] = None,
+    ):
+        """
+        Args:
+            point_coordinates: A list of (x, y) centres of all points.
+            box_coordinates: A list of (x, y) coordinates of the label boxes.
+            radius: The radius of the points (default 4).
+            label_width: The width of the label (default 88).
+            label_height: The height of the label (default 23).
+            stats: Stats to count the rectangle tests in (default None).
+        """
+
+        self.radius = radius
+        self.label_width = label_width
+        self.label_height = label_height
+        self.point_coordinates = list(point_coordinates)
+        self.box_coordinates = list(box_coordinates)
+
+        self.point_grid = SpatialGrid(label_width, label_height)
+        for index, (x, y) in enumerate(self.point_coordinates):
+            self.point_grid.insert(index, x, y)
+
+        self.box_grid = SpatialGrid(label_width, label_height)
+        for index, (x, y) in enumerate(self.box_coordinates):
+            self.box_grid.insert(index, x, y)
+
+        self.point_query = self.point_grid.query
+        self.box_query = self.box_grid.query
+        if stats is not None:
+            self.point_query = stats.counting(self.point_grid.query, "overlap_tests")
+            self.box_query = stats.counting(self.box_grid.query, "overlap_tests")
+
+        point_overlaps = [
+            self.count_point_overlaps(x, y) for x, y in self.box_coordinates
+        ]
+        self.label_overlaps = array(
+            "i",
+            (
+                self.count_box_overlaps(index, x, y) + point_overlaps[index]
+                for index, (x, y) in enumerate(self.box_coordinates)
+            ),
+        )
+
+        # Every label overlap is seen from both of its boxes
+        num_label_point_overlaps = sum(point_overlaps)
+        num_label_overlaps = (sum(self.label_overlaps) - num_label_point_overlaps) // 2
+        self.total = num_label_overlaps + num_label_point_overlaps
+
+    def overlapping_boxes(self, index: int, x: float, y: float) -> List[int]:
+        """Return the boxes overlapping box `index` if it were placed at (x, y).
+
+        Args:
+            index: The index of the box in box_coordinates.
+            x: The x-coordinate of the box.
+            y: The y-coordinate of the box.
+
+        Returns:
+            The indexes of the other boxes overlapping the box.
+        """
+
+        label_width, label_height = self.label_width, self.label_height
+        box_coordinates = self.box_coordinates
+        overlapping = []
+
+        for other in self.box_query(
+            x - label_width, y - label_height, x + label_width, y + label_height
+        ):
+            if other == index:
+                continue
+
+            bx, by = box_coordinates[other]
+            if (
+                x < bx + label_width
+                and x + label_width > bx
+                and y < by + label_height
+                and y + label_height > by
+            ):
+                overlapping.append(other)
+
+        return overlapping
+
+    def count_box_overlaps(self, index: int, x: float, y: float) -> int:
+        """Count the boxes overlapping box `index` if it were placed at (x, y)."""
+
+        return len(self.overlapping_boxes(index, x, y))
+
+    def boxes_near(
+        self, x: float, y: float, margin_x: float, margin_y: float
+    ) -> List[int]:
+        """Return the boxes anchored closer to (x, y) than a box size plus a margin.
+
+        With the margins set to the spread of the candidate positions of a label, these
+        are the boxes with a candidate position that can overlap a box at (x, y).
+
+        Args:
+            x: The x-coordinate of the box.
+            y: The y-coordinate of the box.
+            margin_x: The horizontal margin.
+            margin_y: The vertical margin.
+
+        Returns:
+            The indexes of the boxes.
+        """
+
+        reach_x = self.label_width + margin_x
+        reach_y = self.label_height + margin_y
+        box_coordinates = self.box_coordinates
+
+        return [
+            index
+            for index in self.box_grid.query(
+                x - reach_x, y - reach_y, x + reach_x, y + reach_y
+            )
+            if abs(box_coordinates[index][0] - x) < reach_x
+            and abs(box_coordinates[index][1] - y) < reach_y
+        ]
+
+    def count_point_overlaps(self, x: float, y: float) -> int:
+        """Count the points overlapping a box placed at (x, y).
+
+        Args:
+            x: The x-coordinate of the box.
+            y: The y-coordinate of the box.
+
+        Returns:
+            Number of points overlapping the box.
+        """
+
+        radius = self.radius
+        label_width, label_height = self.label_width, self.label_height
+        point_coordinates = self.point_coordinates
+        num_overlaps = 0
+
+        for index in self.point_query(
+            x - radius, y - radius, x + label_width + radius, y + label_height + radius
+        ):
+            px, py = point_coordinates[index]
+            if (
+                x < px + radius
+                and x + label_width > px - radius
+                and y < py + radius
+                and y + label_height > py - radius
+            ):
+                num_overlaps += 1
+
+        return num_overlaps
+
+    def cost(self, index: int, x: float, y: float) -> int:
+        """Number of overlaps box `index` would take part in if it were placed at (x, y)."""
+
+        return self.count_box_overlaps(index, x, y) + self.count_point_overlaps(x, y)
+
+    def delta(self, index: int, x: float, y: float) -> int:
+        """Change of the total number of overlaps if box `index` moved to (x, y)."""
+
+        old_x, old_y = self.box_coordinates[index]
+        return self.cost(index, x, y) - self.cost(index, old_x, old_y)
+
+    def move(self, index: int, x: float, y: float) -> int:
+        """Move box `index` to (x, y) and update the running total and the overlap
+        counters of the boxes it leaves and joins.
+
+        Returns:
+            The total number of overlaps after the move.
+        """
+
+        label_overlaps = self.label_overlaps
+        old_x, old_y = self.box_coordinates[index]
+        old_boxes = self.overlapping_boxes(index, old_x, old_y)
+        new_boxes = self.overlapping_boxes(index, x, y)
+
+        for other in old_boxes:
+            label_overlaps[other] -= 1
+        for other in new_boxes:
+            label_overlaps[other] += 1
+
+        new_cost = len(new_boxes) + self.count_point_overlaps(x, y)
+        self.total += new_cost - label_overlaps[index]
+        label_overlaps[index] = new_cost
+
+        self.box_grid.move(index, old_x, old_y, x, y)
+        self.box_coordinates[index] = (x, y)
+
+        return self.total
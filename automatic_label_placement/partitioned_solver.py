@@ -0,0 +1,319 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import Point, LabelBox
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.overlap_kernel import candidate_boxes
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.instrumentation import Stats, phase
+from automatic_label_placement.convergence import Convergence
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    Worklist,
+    move_red_labels,
+)
+from automatic_label_placement.solver import algorithms
+
+
+def halo_margins(
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    label_distance: int = box_point_distance,
+) -> Tuple[float, float]:
+    """Return the horizontal and vertical distance within which two points can interact.
+
+    A label box reaches at most radius + label_distance + label_width from its point
+    horizontally and radius + label_distance + label_height vertically, so the labels
+    of two points further apart than twice that can never overlap each other or the
+    other point.
+
+    Args:
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        label_distance: The distance between labels and points (default 1).
+
+    Returns:
+        A tuple (halo_x, halo_y).
+    """
+
+    return (
+        2 * (radius + label_distance + label_width),
+        2 * (radius + label_distance + label_height),
+    )
+
+
+def points_near(
+    grid: SpatialGrid,
+    points: List[Point],
+    x_min: float,
+    y_min: float,
+    x_max: float,
+    y_max: float,
+) -> List[int]:
+    """Return the indexes, in increasing order, of the points inside a rectangle.
+
+    Args:
+        grid: A SpatialGrid of the point indexes.
+        points: The points of the grid.
+        x_min, y_min, x_max, y_max: The rectangle.
+
+    Returns:
+        The indexes of the points with x_min <= x < x_max and y_min <= y < y_max.
+    """
+
+    return sorted(
+        index
+        for index in grid.query(x_min, y_min, x_max, y_max)
+        if x_min <= points[index].x < x_max and y_min <= points[index].y < y_max
+    )
+
+
+def _solve_tile(task: tuple) -> List[int]:
+    """Solve the labels of one tile in a worker process.
+
+    Args:
+        task: A tuple (coordinates, rng_seed, algorithm, options), where coordinates
+            holds (x, y, selected) for the points of the tile and its halo; only the
+            points owned by the tile are selected.
+
+    Returns:
+        The position of every label of the tile, in the order of its points.
+    """
+
+    coordinates, rng_seed, algorithm, options = task
+    points = [Point(x, y, selected) for x, y, selected in coordinates]
+
+    boxes = algorithms[algorithm](points, **dict(options, rng=random.Random(rng_seed)))
+    return [box.position for box in boxes]
+
+
+def repair_seams(
+    points: List[Point],
+    placement: List[int],
+    seam_points: List[int],
+    halo_x: float,
+    halo_y: float,
+    rng: Optional[random.Random] = None,
+    stats: Optional[Stats] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> None:
+    """Move the conflicting labels near the tile seams to a cheaper position.
+
+    The labels of the seam points were solved without knowing the labels across the
+    seam. They are moved with the local search on a ConflictGraph of the seam points and
+    every point within the halo around them; the labels of those surrounding points keep
+    their position.
+
+    Args:
+        points: A list of Point objects.
+        placement: The position of every label, updated in place.
+        seam_points: The indexes of the selected points whose label may be moved.
+        halo_x: The horizontal interaction distance, see halo_margins.
+        halo_y: The vertical interaction distance, see halo_margins.
+        rng: The random number generator to break ties with (default the global
+            random module).
+        stats: Stats to count the moves in (default None).
+        width: Width of the boundary the boxes have to lie within (default 2000).
+        height: Height of the boundary (default 2000).
+    """
+
+    if not seam_points:
+        return
+
+    grid = SpatialGrid(halo_x, halo_y)
+    for index, point in enumerate(points):
+        grid.insert(index, point.x, point.y)
+
+    band = set()
+    for index in seam_points:
+        point = points[index]
+        band.update(
+            points_near(
+                grid,
+                points,
+                point.x - halo_x,
+                point.y - halo_y,
+                point.x + halo_x,
+                point.y + halo_y,
+            )
+        )
+    band = sorted(band)
+
+    label_of = {}
+    for index, point in enumerate(points):
+        if point.selected:
+            label_of[index] = len(label_of)
+
+    band_points = [points[index] for index in band]
+    band_labels = [label_of[index] for index in band if points[index].selected]
+    seam_set = set(seam_points)
+    movable = {
+        label
+        for label, index in enumerate(i for i in band if points[i].selected)
+        if index in seam_set
+    }
+
+    graph = ConflictGraph(band_points, width=width, height=height)
+    state = PlacementState(graph, [placement[label] for label in band_labels])
+    worklist = Worklist(len(band_labels), sorted(movable))
+
+    convergence = Convergence()
+    convergence.start(state.placement)
+    while True:
+        num_overlaps = move_red_labels(
+            state, rng, stats, movable, worklist=worklist, convergence=convergence
+        )
+        if not convergence.update(num_overlaps, len(worklist)):
+            break
+
+    for label, position in zip(band_labels, state.placement):
+        placement[label] = position
+
+
+def partitioned_solve(
+    points: List[Point],
+    algorithm: str = "greedy",
+    tile_width: Optional[float] = None,
+    tile_height: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    seed_value: int = 0,
+    stats: Optional[Stats] = None,
+    rng: Optional[random.Random] = None,
+    **options,
+) -> List[LabelBox]:
+    """Solve a large instance tile by tile in parallel and repair the seams.
+
+    Every selected point belongs to the tile containing it. A tile is solved with the
+    points within the halo around it as obstacles, so its labels already avoid the
+    points across the seam. The labels near a seam are then moved by repair_seams to
+    resolve the overlaps between labels of neighbouring tiles. Every tile gets its own
+    random stream seeded from rng, or from seed_value without one, so the result does
+    not depend on the number of workers. The tiles build their own instances, so a
+    graph cannot be passed on.
+
+    Args:
+        points: A list of Point objects.
+        algorithm: The algorithm that solves each tile, a key of solver.algorithms
+            (default greedy).
+        tile_width: Width of the tiles (default eight times the largest halo margin).
+        tile_height: Height of the tiles (default tile_width).
+        max_workers: Number of worker processes (default the number of CPUs).
+        seed_value: Seed of the random streams of the tiles when no rng is given
+            (default 0).
+        stats: Stats to record the partition, optimise and seam_repair phases in
+            (default None).
+        rng: The random number generator to draw the seeds of the tiles from and to
+            break ties in the seam repair with (default a random.Random seeded with
+            seed_value).
+        **options: Keyword arguments passed on to the solve function of the algorithm;
+            the seam repair keeps the boxes within its width and height.
+
+    Raises:
+        ValueError: If the algorithm is unknown, a graph is passed or the tiles are
+            too small.
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    if algorithm not in algorithms:
+        raise ValueError(
+            f"Unknown algorithm {algorithm!r}, expected one of {list(algorithms)}."
+        )
+    if options.get("graph") is not None:
+        raise ValueError("A graph cannot be combined with partition.")
+
+    halo_x, halo_y = halo_margins()
+    tile_width = tile_width if tile_width is not None else 8 * max(halo_x, halo_y)
+    tile_height = tile_height if tile_height is not None else tile_width
+    if tile_width <= 2 * halo_x or tile_height <= 2 * halo_y:
+        raise ValueError("The tiles must be larger than twice the halo margins.")
+
+    with phase(stats, "partition"):
+        tile_grid = SpatialGrid(tile_width, tile_height)
+        for index, point in enumerate(points):
+            tile_grid.insert(index, point.x, point.y)
+
+        label_of = {}
+        for index, point in enumerate(points):
+            if point.selected:
+                label_of[index] = len(label_of)
+
+        rng = rng if rng is not None else random.Random(seed_value)
+        tasks = []
+        tile_labels: List[List[int]] = []
+        seam_points = []
+        for tile in sorted(tile_grid.cells):
+            owned = [index for index in tile_grid.cells[tile] if points[index].selected]
+            if not owned:
+                continue
+
+            left, top = tile[0] * tile_width, tile[1] * tile_height
+            right, bottom = left + tile_width, top + tile_height
+            owned_set = set(owned)
+            members = points_near(
+                tile_grid,
+                points,
+                left - halo_x,
+                top - halo_y,
+                right + halo_x,
+                bottom + halo_y,
+            )
+
+            tasks.append(
+                (
+                    [(points[i].x, points[i].y, i in owned_set) for i in members],
+                    rng.getrandbits(64),
+                    algorithm,
+                    options,
+                )
+            )
+            tile_labels.append([label_of[i] for i in members if i in owned_set])
+
+            # Labels this close to the edge of their tile may meet labels across it
+            seam_points.extend(
+                i
+                for i in owned
+                if points[i].x - left < halo_x
+                or right - points[i].x <= halo_x
+                or points[i].y - top < halo_y
+                or bottom - points[i].y <= halo_y
+            )
+
+    placement = [-1] * len(label_of)
+    with phase(stats, "optimise"):
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for labels, positions in zip(tile_labels, executor.map(_solve_tile, tasks)):
+                for label, position in zip(labels, positions):
+                    placement[label] = position
+
+    with phase(stats, "seam_repair"):
+        repair_seams(
+            points,
+            placement,
+            sorted(seam_points),
+            halo_x,
+            halo_y,
+            rng,
+            stats,
+            options.get("width", boundary_width),
+            options.get("height", boundary_height),
+        )
+
+    if stats is not None:
+        stats.count("tiles", len(tasks))
+        stats.count("seam_labels", len(seam_points))
+
+    selected_points = [point for point in points if point.selected]
+    candidate_xs, candidate_ys = candidate_boxes(
+        [point.x for point in selected_points],
+        [point.y for point in selected_points],
+        backend="python",
+    )
+    return [
+        LabelBox(candidate_xs[label][position], candidate_ys[label][position], position)
+        for label, position in enumerate(placement)
+    ]
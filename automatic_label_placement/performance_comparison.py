@@ -1,64 +1,301 @@
-# import subprocess
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
 import timeit
-from automatic_label_placement.config_reader import seeds
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import (
+    LabelBox,
+    points_from_arrays,
+    evaluate_placement,
+)
+from automatic_label_placement.point_generator import generate_point_arrays
+from automatic_label_placement.streaming_render import write_svg
 from automatic_label_placement.local_search_algorithm.local_search_algorithm import (
-    local_search_algorithm,
+    local_search_solve,
+)
+from automatic_label_placement.greedy_algorithm.greedy_algorithm import greedy_solve
+from automatic_label_placement.simulated_annealing_algorithm.simulated_annealing_algorithm import (
+    simulated_annealing_solve,
 )
-from automatic_label_placement.greedy_algorithm.greedy_algorithm import greedy_algorithm
 
 
-def measure_execution_time(func):
-    """Decorator to measure the execution time of a function."""
+# Each benchmarked algorithm is a solve function and the options it runs with. The
+# tracker and kernel variants are the geometric paths the drivers run by default, on
+# the default backend (numpy if it is installed) and on the python one.
+algorithms: Dict[str, Tuple[Callable[..., List[LabelBox]], dict]] = {
+    "local_search": (local_search_solve, {"use_conflict_graph": True}),
+    "local_search_tracker": (local_search_solve, {}),
+    "local_search_tracker_python": (local_search_solve, {"backend": "python"}),
+    "greedy": (greedy_solve, {"use_conflict_graph": True}),
+    "greedy_kernel": (greedy_solve, {}),
+    "greedy_kernel_python": (greedy_solve, {"backend": "python"}),
+    "greedy_priority": (greedy_solve, {"priority_queue": True}),
+    "simulated_annealing": (simulated_annealing_solve, {}),
+}
 
-    def wrapper(*args, **kwargs):
-        """Wrapper function that measures the execution time of the decorated function."""
+# Numbers of points from the configured size up to 1M; the boundary grows with them
+# and the configured fraction of them gets a label, so both densities stay constant
+size_sweep = [num_points_generated, 10_000, 100_000, 1_000_000]
+
+# Fractions of the points that get a label, at the configured size
+label_density_sweep = [0.05, 0.1, 0.2, 0.4]
 
-        start_time = timeit.default_timer()
-        result = func(*args, **kwargs)
-        end_time = timeit.default_timer()
-        execution_time = end_time - start_time
-        print(f"Execution time of {func.__name__}: {execution_time:.2f} seconds")
-        return result
 
-    return wrapper
+def scaled_boundary(num_points: int) -> Tuple[int, int]:
+    """Scale the configured boundary so num_points have the configured point density.
+
+    Args:
+        num_points: Number of points to generate.
+
+    Returns:
+        The width and height of the boundary, with the aspect ratio of the configured
+        one.
+    """
 
+    scale = math.sqrt(num_points / num_points_generated)
+    return round(boundary_width * scale), round(boundary_height * scale)
 
-@measure_execution_time
-def run_local_search_algorithm(seed_value: int) -> None:
-    """Run the local search algorithm to measure the performance.
+
+def benchmark_case(
+    algorithm: str,
+    num_points: int,
+    num_selected: int,
+    seed_value: int,
+    repeats: int = 3,
+    warmup: int = 1,
+    render: bool = True,
+) -> dict:
+    """Benchmark one algorithm on one generated instance.
+
+    The points are generated as arrays with generate_point_arrays, within the boundary
+    scaled_boundary gives for their number, which the solve function gets as well. Generating the points, solving and
+    rendering are timed separately; solving includes building the ConflictGraph of
+    the algorithms running on one, and rendering streams the svg to os.devnull with
+    write_svg. Every trial draws from a new random.Random seeded
+    with seed_value, so every trial finds the same placement.
 
     Args:
-        seed_value: The seed value for random number generation.
+        algorithm: A key of algorithms.
+        num_points: Number of points to generate.
+        num_selected: Number of points that get a label.
+        seed_value: Seed value for random number generation.
+        repeats: Number of timed trials (default 3).
+        warmup: Number of untimed trials run first (default 1).
+        render: Whether to time rendering the final placement (default True).
+
+    Returns:
+        A dict with the case parameters, the timings in seconds and the number of
+        overlaps.
     """
 
-    local_search_algorithm(seed_value=seed_value)
+    solve, options = algorithms[algorithm]
+    width, height = scaled_boundary(num_points)
+
+    start_time = timeit.default_timer()
+    xs, ys, selected = generate_point_arrays(
+        seed_value, num_points, width, height, num_selected=num_selected
+    )
+    points = points_from_arrays(xs, ys, selected)
+    generate_time = timeit.default_timer() - start_time
+
+    def solve_instance() -> List[LabelBox]:
+        rng = random.Random(seed_value)
+        return solve(points, rng=rng, width=width, height=height, **options)
+
+    for _ in range(warmup):
+        solve_instance()
+
+    solve_times = []
+    for _ in range(repeats):
+        start_time = timeit.default_timer()
+        boxes = solve_instance()
+        solve_times.append(timeit.default_timer() - start_time)
+
+    result = evaluate_placement(points, boxes)
+
+    render_time = None
+    if render:
+        start_time = timeit.default_timer()
+        write_svg(
+            os.devnull,
+            points,
+            result.coordinates,
+            result.conflicts,
+            result.point_conflicts,
+            width=width,
+            height=height,
+        )
+        render_time = timeit.default_timer() - start_time
 
+    return {
+        "algorithm": algorithm,
+        "options": dict(options),
+        "num_points": num_points,
+        "num_selected": num_selected,
+        "boundary_width": width,
+        "boundary_height": height,
+        "seed": seed_value,
+        "generate_time": generate_time,
+        "solve_times": solve_times,
+        "solve_time_min": min(solve_times),
+        "solve_time_median": statistics.median(solve_times),
+        "render_time": render_time,
+        "num_overlaps": result.num_overlaps,
+    }
 
-@measure_execution_time
-def run_greedy_algorithm(seed_value: int) -> None:
-    """Run the greedy algorithm to measure the performance.
+
+def run_benchmarks(
+    algorithm_names: Sequence[str] = tuple(algorithms),
+    sizes: Sequence[int] = tuple(size_sweep),
+    label_densities: Sequence[float] = tuple(label_density_sweep),
+    seed_values: Sequence[int] = tuple(seeds),
+    repeats: int = 3,
+    warmup: int = 1,
+    max_solve_time: Optional[float] = 60.0,
+    render: bool = True,
+) -> dict:
+    """Run the size and label density sweeps for every algorithm.
+
+    The size sweep keeps the point density and the label density constant, and the
+    label density sweep varies the fraction of labelled points at the configured
+    size. Sizes are run from small to large. Once a trial of an algorithm takes longer
+    than max_solve_time, the larger sizes of that algorithm are recorded as skipped.
 
     Args:
-        seed_value: The seed value for random number generation.
+        algorithm_names: The algorithms to benchmark (default all).
+        sizes: Numbers of points of the size sweep.
+        label_densities: Fractions of the points that get a label.
+        seed_values: Seed values, each giving one instance per case.
+        repeats: Number of timed trials per case (default 3).
+        warmup: Number of untimed trials per case (default 1).
+        max_solve_time: Seconds after which larger sizes are skipped, or None to run
+            every size (default 60).
+        render: Whether to time rendering (default True).
+
+    Returns:
+        A dict with metadata about the run and a list of case results.
     """
 
-    greedy_algorithm(seed_value=seed)
+    cases = []
 
+    for algorithm in algorithm_names:
+        too_slow = False
+        for num_points in sorted(sizes):
+            num_selected = num_points * num_points_selected // num_points_generated
+            for seed_value in seed_values:
+                if too_slow:
+                    cases.append(
+                        {
+                            "algorithm": algorithm,
+                            "sweep": "size",
+                            "num_points": num_points,
+                            "num_selected": num_selected,
+                            "seed": seed_value,
+                            "skipped": True,
+                        }
+                    )
+                    continue
 
-if __name__ == "__main__":
-    for seed in seeds:
-        print(f"Compare Both Algorithms with Seed {seed}")
+                result = benchmark_case(
+                    algorithm,
+                    num_points,
+                    num_selected,
+                    seed_value,
+                    repeats,
+                    warmup,
+                    render,
+                )
+                result["sweep"] = "size"
+                cases.append(result)
+                print(
+                    f"{algorithm} {num_points}/{num_selected} seed {seed_value}: "
+                    f"{result['num_overlaps']} overlaps, "
+                    f"{result['solve_time_median']:.3f} s"
+                )
 
-        # Run the local search algorithm
-        print("Running the Local Search Algorithm...")
-        print("Local Search Algorithm Output:")
-        run_local_search_algorithm(seed_value=seed)
+                if max_solve_time is not None and (
+                    result["solve_time_median"] > max_solve_time
+                ):
+                    too_slow = True
 
-        print("-" * 48)
+        for density in label_densities:
+            num_selected = int(num_points_generated * density)
+            for seed_value in seed_values:
+                result = benchmark_case(
+                    algorithm,
+                    num_points_generated,
+                    num_selected,
+                    seed_value,
+                    repeats,
+                    warmup,
+                    render,
+                )
+                result["sweep"] = "label_density"
+                result["label_density"] = density
+                cases.append(result)
 
-        # Run the greedy algorithm
-        print("Running the Greedy Algorithm...")
-        print("Greedy Algorithm Output:")
-        run_greedy_algorithm(seed_value=seed)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "boundary_width": boundary_width,
+            "boundary_height": boundary_height,
+            "point_radius": point_radius,
+            "box_width": box_width,
+            "box_height": box_height,
+            "box_point_distance": box_point_distance,
+        },
+        "repeats": repeats,
+        "warmup": warmup,
+        "cases": cases,
+    }
 
-        print("=" * 48)
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the benchmark suite and write the results to a JSON file."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=list(algorithms), default=list(algorithms)
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=None,
+        help="Leave out sizes with more points than this.",
+    )
+    parser.add_argument("--max-solve-time", type=float, default=60.0)
+    parser.add_argument("--no-render", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [
+        num_points
+        for num_points in size_sweep
+        if args.max_points is None or num_points <= args.max_points
+    ]
+    results = run_benchmarks(
+        args.algorithms,
+        sizes,
+        repeats=args.repeats,
+        warmup=args.warmup,
+        max_solve_time=args.max_solve_time,
+        render=not args.no_render,
+    )
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
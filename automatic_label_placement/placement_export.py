@@ -0,0 +1,315 @@
+import csv
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Iterable, Union
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import PlacementResult
+from automatic_label_placement.overlap_kernel import positions
+from automatic_label_placement.instance_cache import aligned
+
+
+# Bump when the layout of the placement files changes, so old files are never read
+format_version = 1
+magic = b"ALPPLC" + bytes([0, format_version])
+
+# magic, number of labels, number of positions, number of overlaps, number of
+# conflicting labels, number of conflicting points
+header = struct.Struct("<8s5Q")
+
+# The columns of the csv export
+csv_columns = ["label", "point", "position", "name", "x", "y", "conflict"]
+
+
+class PlacementFile:
+    """A placement read from a binary placement file.
+
+    The position codes and the conflict sets are views of the memory-mapped file, so
+    reading a placement costs no more than the pages that are touched.
+    """
+
+    __slots__ = (
+        "path",
+        "positions",
+        "conflicts",
+        "point_conflicts",
+        "num_overlaps",
+        "buffer",
+    )
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: The placement file to map.
+        """
+
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(buffer)
+        if len(view) < header.size:
+            raise ValueError(f"{path} is not a placement file.")
+        (
+            file_magic,
+            num_labels,
+            num_positions,
+            num_overlaps,
+            num_conflicts,
+            num_point_conflicts,
+        ) = header.unpack_from(view)
+        if file_magic != magic:
+            raise ValueError(f"{path} is not a placement file.")
+        if num_positions != len(positions):
+            raise ValueError(
+                f"{path} was written for {num_positions} label positions, "
+                f"not {len(positions)}."
+            )
+
+        sections = []
+        offset = header.size
+        for typecode, length in (
+            ("b", num_labels),
+            ("I", num_conflicts),
+            ("I", num_point_conflicts),
+        ):
+            size = array(typecode).itemsize * length
+            sections.append(view[offset : offset + size].cast(typecode))
+            offset = aligned(offset + size)
+        if offset != len(view):
+            raise ValueError(f"{path} is truncated or has trailing data.")
+
+        self.path = Path(path)
+        self.positions, self.conflicts, self.point_conflicts = sections
+        self.num_overlaps = num_overlaps
+        self.buffer = buffer
+
+
+def write_placement(file_path: Union[str, Path], result: PlacementResult) -> None:
+    """Write the position code of every label and the conflict sets to a binary file.
+
+    Every label takes one byte, its index in positions, followed by the sorted
+    indexes of the conflicting labels and points as unsigned 32-bit integers. The file
+    is written next to its destination and renamed into place.
+
+    Args:
+        file_path: The placement file to write.
+        result: The PlacementResult to export.
+    """
+
+    sections = [
+        array("b", result.positions),
+        array("I", sorted(result.conflicts)),
+        array("I", sorted(result.point_conflicts)),
+    ]
+
+    file_path = Path(file_path)
+    temporary_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    with open(temporary_path, "wb") as file:
+        file.write(
+            header.pack(
+                magic,
+                len(result.positions),
+                len(positions),
+                result.num_overlaps,
+                len(result.conflicts),
+                len(result.point_conflicts),
+            )
+        )
+        for section in sections:
+            section.tofile(file)
+            file.write(bytes(aligned(file.tell()) - file.tell()))
+    os.replace(temporary_path, file_path)
+
+
+def labelled_points(points: Iterable, result: PlacementResult) -> Iterable[tuple]:
+    """Yield (label, point index, point, position, (x, y), conflict) for every label.
+
+    Args:
+        points: Objects with x, y and selected attributes, e.g. Point objects.
+        result: The PlacementResult of the points.
+    """
+
+    label = 0
+    for index, point in enumerate(points):
+        if point.selected:
+            yield (
+                label,
+                index,
+                point,
+                result.positions[label],
+                result.coordinates[label],
+                label in result.conflicts,
+            )
+            label += 1
+
+
+def write_csv(
+    file_path: Union[str, Path],
+    points: Iterable,
+    result: PlacementResult,
+    buffer_size: int = 1 << 20,
+) -> None:
+    """Write one row per label with its position code and box to a csv file.
+
+    The rows are written while walking over the points, so the document is never
+    built in memory. The columns are csv_columns; x and y are the corner of the box
+    with the lowest coordinates.
+
+    Args:
+        file_path: The csv file to write.
+        points: Objects with x, y and selected attributes, e.g. Point objects.
+        result: The PlacementResult of the points.
+        buffer_size: Size of the write buffer in bytes (default 1 MiB).
+    """
+
+    with open(file_path, "w", newline="", buffering=buffer_size) as file:
+        writer = csv.writer(file)
+        writer.writerow(csv_columns)
+        for label, index, _, position, (x, y), conflict in labelled_points(
+            points, result
+        ):
+            writer.writerow(
+                [label, index, position, positions[position], x, y, int(conflict)]
+            )
+
+
+def write_geojson(
+    file_path: Union[str, Path],
+    points: Iterable,
+    result: PlacementResult,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    buffer_size: int = 1 << 20,
+) -> None:
+    """Write a GeoJSON FeatureCollection with a polygon for the box of every label.
+
+    Features are written one at a time while walking over the points, so the document
+    is never built in memory. Coordinates are those of the boundary, with y growing
+    downwards as in the svg drawing. The properties of a feature hold the label and
+    point indexes, the position code and name, the point coordinates and whether the
+    label conflicts.
+
+    Args:
+        file_path: The GeoJSON file to write.
+        points: Objects with x, y and selected attributes, e.g. Point objects.
+        result: The PlacementResult of the points.
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        buffer_size: Size of the write buffer in bytes (default 1 MiB).
+    """
+
+    with open(file_path, "w", buffering=buffer_size) as file:
+        write = file.write
+        write('{"type": "FeatureCollection", "features": [\n')
+
+        separator = ""
+        for label, index, point, position, (x, y), conflict in labelled_points(
+            points, result
+        ):
+            right, bottom = x + label_width, y + label_height
+            feature = {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[x, y], [right, y], [right, bottom], [x, bottom], [x, y]]
+                    ],
+                },
+                "properties": {
+                    "label": label,
+                    "point": index,
+                    "position": position,
+                    "name": positions[position],
+                    "point_x": point.x,
+                    "point_y": point.y,
+                    "conflict": conflict,
+                },
+            }
+            write(separator + json.dumps(feature))
+            separator = ",\n"
+
+        write("\n]}\n")
+
+
+def read_csv_positions(file_path: Union[str, Path]) -> array:
+    """Read the position codes of the labels back from a csv export.
+
+    Args:
+        file_path: A csv file written by write_csv.
+
+    Raises:
+        ValueError: If the file is empty or has no position column.
+
+    Returns:
+        An array("b") with the position of every label, in the order of the labels.
+    """
+
+    label_positions = array("b")
+    with open(file_path, newline="") as file:
+        reader = csv.reader(file)
+        columns = next(reader, None)
+        if columns is None:
+            raise ValueError(f"{file_path} is empty.")
+        if "position" not in columns:
+            raise ValueError(f"{file_path} has no position column.")
+
+        column = columns.index("position")
+        for row in reader:
+            if row:
+                label_positions.append(int(row[column]))
+
+    return label_positions
+
+
+def read_geojson_positions(file_path: Union[str, Path]) -> array:
+    """Read the position codes of the labels back from a GeoJSON export.
+
+    Args:
+        file_path: A GeoJSON file written by write_geojson.
+
+    Raises:
+        ValueError: If a feature has no position property.
+
+    Returns:
+        An array("b") with the position of every label, in the order of the labels.
+    """
+
+    with open(file_path) as file:
+        features = json.load(file)["features"]
+
+    try:
+        labelled = sorted(
+            (feature["properties"]["label"], feature["properties"]["position"])
+            for feature in features
+        )
+    except KeyError:
+        raise ValueError(f"{file_path} has a feature without a position.") from None
+
+    return array("b", (position for _, position in labelled))
+
+
+def load_positions(file_path: Union[str, Path]) -> array:
+    """Read the position codes of an exported placement, to seed the next run.
+
+    Args:
+        file_path: A binary placement file, a csv file if it ends in .csv or a
+            GeoJSON file if it ends in .geojson or .json.
+
+    Returns:
+        The position of every label, to pass as initial_positions to the local
+        search or simulated annealing.
+    """
+
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".csv":
+        return read_csv_positions(file_path)
+    if suffix in (".geojson", ".json"):
+        return read_geojson_positions(file_path)
+
+    # Copied out of the mapping, so the file can be replaced by the next export
+    label_positions = array("b")
+    label_positions.frombytes(PlacementFile(file_path).positions)
+    return label_positions
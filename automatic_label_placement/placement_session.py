@@ -0,0 +1,398 @@
+import random
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+    PlacementResult,
+    evaluate_placement,
+)
+from automatic_label_placement.overlap_kernel import (
+    candidate_boxes,
+    candidates_within_boundary,
+)
+from automatic_label_placement.spatial_index import SpatialGrid
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.partitioned_solver import halo_margins
+
+
+class PlacementSession:
+    """A label placement that is kept up to date while points are added, removed and
+    moved.
+
+    The session keeps the points and the placed label boxes in spatial grids and a
+    running total of the overlaps. An edit only re-optimises the labels of the points
+    within halo_margins of the edited point: they are put on a worklist, and a label on
+    the worklist moves to its cheapest position if that lowers its number of overlaps,
+    which puts the labels overlapping its old and new box back on the worklist. Every
+    move lowers the total, so the cascade ends, and the work of an edit depends on the
+    density around it rather than on the number of points.
+
+    Points are identified by ids that stay valid until the point is removed: the
+    indexes of the initial points, then increasing ids for added points.
+    """
+
+    def __init__(
+        self,
+        points: List[Point],
+        boxes: Optional[List[LabelBox]] = None,
+        rng: Optional[random.Random] = None,
+        stats: Optional[Stats] = None,
+        radius: int = point_radius,
+        label_width: int = box_width,
+        label_height: int = box_height,
+        label_distance: int = box_point_distance,
+    ):
+        """
+        Args:
+            points: A list of Point objects; the selected ones get a label.
+            boxes: The label boxes of the selected points, in the order of the points,
+                e.g. from solve (default None, place the labels greedily and optimise
+                them in the session).
+            rng: The random number generator to break ties with (default the global
+                random module).
+            stats: Stats to count the candidate evaluations and accepted moves in
+                (default None).
+            radius: The radius of the points (default 4).
+            label_width: The width of the label (default 88).
+            label_height: The height of the label (default 23).
+            label_distance: The distance between labels and points (default 1).
+        """
+
+        self.rng = rng if rng is not None else random
+        self.stats = stats
+        self.radius = radius
+        self.label_width = label_width
+        self.label_height = label_height
+        self.label_distance = label_distance
+        self.halo_x, self.halo_y = halo_margins(
+            radius, label_width, label_height, label_distance
+        )
+
+        self.points: Dict[int, Point] = {}
+        self.boxes: Dict[int, LabelBox] = {}
+        self.point_grid = SpatialGrid(label_width, label_height)
+        self.box_grid = SpatialGrid(label_width, label_height)
+        self.num_overlaps = 0
+        self.next_id = len(points)
+
+        for point_id, point in enumerate(points):
+            self.points[point_id] = Point(point.x, point.y, point.selected)
+            self.point_grid.insert(point_id, point.x, point.y)
+
+        labels = [point_id for point_id, point in enumerate(points) if point.selected]
+        if boxes is not None:
+            for point_id, box in zip(labels, boxes):
+                self.num_overlaps += self.box_cost(point_id, box.x, box.y)
+                self.place(point_id, LabelBox(box.x, box.y, box.position))
+        else:
+            for point_id in labels:
+                self.place_cheapest(point_id)
+            self.optimise(labels)
+
+    def candidates(self, point_id: int) -> List[Tuple[int, float, float]]:
+        """Return the (position, x, y) of the candidate boxes of a point within the
+        boundary."""
+
+        point = self.points[point_id]
+        candidate_xs, candidate_ys = candidate_boxes(
+            [point.x],
+            [point.y],
+            self.radius,
+            self.label_width,
+            self.label_height,
+            self.label_distance,
+            backend="python",
+        )
+        within_boundary = candidates_within_boundary(
+            candidate_xs,
+            candidate_ys,
+            self.label_width,
+            self.label_height,
+            backend="python",
+        )[0]
+
+        return [
+            (p, candidate_xs[0][p], candidate_ys[0][p])
+            for p in range(len(within_boundary))
+            if within_boundary[p]
+        ]
+
+    def boxes_overlapping_box(
+        self, x: float, y: float, skip: Optional[int] = None
+    ) -> List[int]:
+        """Return the labels whose placed box overlaps a box at (x, y), except skip."""
+
+        label_width, label_height = self.label_width, self.label_height
+        boxes = self.boxes
+        overlapping = []
+
+        for other in self.box_grid.query(
+            x - label_width, y - label_height, x + label_width, y + label_height
+        ):
+            if other == skip:
+                continue
+
+            box = boxes[other]
+            if (
+                x < box.x + label_width
+                and x + label_width > box.x
+                and y < box.y + label_height
+                and y + label_height > box.y
+            ):
+                overlapping.append(other)
+
+        return overlapping
+
+    def boxes_overlapping_point(self, point: Point) -> List[int]:
+        """Return the labels whose placed box overlaps a point."""
+
+        radius = self.radius
+        label_width, label_height = self.label_width, self.label_height
+        boxes = self.boxes
+        overlapping = []
+
+        for label in self.box_grid.query(
+            point.x - radius - label_width,
+            point.y - radius - label_height,
+            point.x + radius,
+            point.y + radius,
+        ):
+            box = boxes[label]
+            if (
+                box.x < point.x + radius
+                and box.x + label_width > point.x - radius
+                and box.y < point.y + radius
+                and box.y + label_height > point.y - radius
+            ):
+                overlapping.append(label)
+
+        return overlapping
+
+    def count_point_overlaps(self, x: float, y: float) -> int:
+        """Count the points overlapping a box placed at (x, y)."""
+
+        radius = self.radius
+        label_width, label_height = self.label_width, self.label_height
+        points = self.points
+        num_overlaps = 0
+
+        for point_id in self.point_grid.query(
+            x - radius, y - radius, x + label_width + radius, y + label_height + radius
+        ):
+            point = points[point_id]
+            if (
+                x < point.x + radius
+                and x + label_width > point.x - radius
+                and y < point.y + radius
+                and y + label_height > point.y - radius
+            ):
+                num_overlaps += 1
+
+        return num_overlaps
+
+    def box_cost(self, label: int, x: float, y: float) -> int:
+        """Number of overlaps the label of point `label` would take part in at (x, y)."""
+
+        return len(self.boxes_overlapping_box(x, y, skip=label)) + (
+            self.count_point_overlaps(x, y)
+        )
+
+    def place(self, label: int, box: LabelBox) -> None:
+        """Put the box of a label into the grid; the caller updates num_overlaps."""
+
+        self.boxes[label] = box
+        self.box_grid.insert(label, box.x, box.y)
+
+    def unplace(self, label: int) -> LabelBox:
+        """Take the box of a label out of the grid and its overlaps out of the total."""
+
+        box = self.boxes[label]
+        self.num_overlaps -= self.box_cost(label, box.x, box.y)
+        self.box_grid.remove(label, box.x, box.y)
+        del self.boxes[label]
+
+        return box
+
+    def place_cheapest(self, label: int) -> None:
+        """Place the label of a point at its cheapest position, ties broken by rng."""
+
+        candidates = [
+            (p, x, y, self.box_cost(label, x, y)) for p, x, y in self.candidates(label)
+        ]
+        if not candidates:
+            raise ValueError(
+                f"The label of point {label} does not fit within the boundary."
+            )
+        if self.stats is not None:
+            self.stats.count("candidate_evaluations", len(candidates))
+
+        min_value = min(candidate[3] for candidate in candidates)
+        p, x, y, cost = self.rng.choice(
+            [candidate for candidate in candidates if candidate[3] == min_value]
+        )
+        self.num_overlaps += cost
+        self.place(label, LabelBox(x, y, p))
+
+    def optimise(self, labels: Iterable[int]) -> None:
+        """Move labels, and then the labels they disturb, to cheaper positions until
+        none of them can lower its number of overlaps.
+
+        Args:
+            labels: The labels to start from.
+        """
+
+        worklist = deque(labels)
+        queued = set(worklist)
+
+        while worklist:
+            label = worklist.popleft()
+            queued.discard(label)
+            box = self.boxes.get(label)
+            if box is None:
+                continue
+
+            current_cost = self.box_cost(label, box.x, box.y)
+            if current_cost == 0:
+                continue
+
+            candidates = [
+                (p, x, y, self.box_cost(label, x, y))
+                for p, x, y in self.candidates(label)
+                if p != box.position
+            ]
+            if self.stats is not None:
+                self.stats.count("candidate_evaluations", len(candidates) + 1)
+            if not candidates:
+                continue
+
+            min_value = min(candidate[3] for candidate in candidates)
+            if min_value >= current_cost:
+                continue
+
+            p, x, y, cost = self.rng.choice(
+                [candidate for candidate in candidates if candidate[3] == min_value]
+            )
+            disturbed = self.boxes_overlapping_box(box.x, box.y, skip=label)
+            disturbed += self.boxes_overlapping_box(x, y, skip=label)
+
+            self.num_overlaps += cost - current_cost
+            self.box_grid.move(label, box.x, box.y, x, y)
+            box.x, box.y, box.position = x, y, p
+            if self.stats is not None:
+                self.stats.count("accepted_moves")
+
+            for other in disturbed:
+                if other not in queued:
+                    queued.add(other)
+                    worklist.append(other)
+
+    def labels_near(self, x: float, y: float) -> List[int]:
+        """Return the labels of the points within halo_margins of (x, y)."""
+
+        points = self.points
+        return sorted(
+            point_id
+            for point_id in self.point_grid.query(
+                x - self.halo_x, y - self.halo_y, x + self.halo_x, y + self.halo_y
+            )
+            if point_id in self.boxes
+            and abs(points[point_id].x - x) <= self.halo_x
+            and abs(points[point_id].y - y) <= self.halo_y
+        )
+
+    def insert_point(self, point_id: int, point: Point) -> None:
+        """Add a point, and its label if it is selected, without re-optimising."""
+
+        self.points[point_id] = point
+        self.point_grid.insert(point_id, point.x, point.y)
+        self.num_overlaps += len(self.boxes_overlapping_point(point))
+
+        if point.selected:
+            try:
+                self.place_cheapest(point_id)
+            except ValueError:
+                self.delete_point(point_id)
+                raise
+
+    def delete_point(self, point_id: int) -> Point:
+        """Remove a point and its label without re-optimising."""
+
+        if point_id in self.boxes:
+            self.unplace(point_id)
+
+        point = self.points.pop(point_id)
+        self.point_grid.remove(point_id, point.x, point.y)
+        self.num_overlaps -= len(self.boxes_overlapping_point(point))
+
+        return point
+
+    def add_point(self, x: float, y: float, selected: bool = False) -> int:
+        """Add a point, with a label if it is selected, and re-optimise the labels
+        around it.
+
+        Args:
+            x: The x-coordinate of the point.
+            y: The y-coordinate of the point.
+            selected: Whether the point gets a label (default False).
+
+        Returns:
+            The id of the new point.
+        """
+
+        point_id = self.next_id
+        self.insert_point(point_id, Point(x, y, selected))
+        self.next_id += 1
+        self.optimise(self.labels_near(x, y))
+
+        return point_id
+
+    def remove_point(self, point_id: int) -> None:
+        """Remove a point and its label and re-optimise the labels around it.
+
+        Args:
+            point_id: The id of the point.
+        """
+
+        point = self.delete_point(point_id)
+        self.optimise(self.labels_near(point.x, point.y))
+
+    def move_point(self, point_id: int, x: float, y: float) -> None:
+        """Move a point, with its label, and re-optimise the labels around its old
+        and new coordinates.
+
+        Args:
+            point_id: The id of the point.
+            x: The new x-coordinate of the point.
+            y: The new y-coordinate of the point.
+        """
+
+        point = self.delete_point(point_id)
+        try:
+            self.insert_point(point_id, Point(x, y, point.selected))
+        except ValueError:
+            self.insert_point(point_id, point)
+            raise
+
+        self.optimise(self.labels_near(point.x, point.y) + self.labels_near(x, y))
+
+    def result(self) -> PlacementResult:
+        """Evaluate the placement of all points, in the order of their ids.
+
+        This walks all points, so it is meant for rendering rather than for every edit.
+
+        Returns:
+            The PlacementResult of the placement, for the points of point_list.
+        """
+
+        return evaluate_placement(
+            self.point_list(),
+            [self.boxes[point_id] for point_id in sorted(self.boxes)],
+            self.stats,
+        )
+
+    def point_list(self) -> List[Point]:
+        """Return the points in the order of their ids."""
+
+        return [self.points[point_id] for point_id in sorted(self.points)]
@@ -0,0 +1,163 @@
+import random
+from array import array
+from typing import Iterator, Optional, Tuple
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.overlap_kernel import resolve_backend, load_numpy
+
+
+def point_y_range(
+    height: int = boundary_height,
+    radius: int = point_radius,
+    label_height: int = box_height,
+) -> Tuple[float, float]:
+    """Return the range of y-coordinates points are generated in.
+
+    Points keep a margin of half a label height from the top and bottom of the
+    boundary, or of their radius if that is larger, so their left and right labels fit.
+
+    Args:
+        height: height of the boundary (default 2000).
+        radius: radius of each point (default 4).
+        label_height: Height of the label boxes (default 23).
+
+    Returns:
+        A tuple (y_start, y_end).
+    """
+
+    if 2 * radius >= label_height:
+        return radius, height - radius
+    return label_height / 2, height - label_height / 2
+
+
+def generate_point_chunks(
+    seed_value: int,
+    num_points: int = num_points_generated,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    radius: int = point_radius,
+    label_height: int = box_height,
+    num_selected: int = num_points_selected,
+    chunk_size: int = 1 << 20,
+    backend: Optional[str] = None,
+) -> Iterator[tuple]:
+    """Generate random points chunk by chunk as coordinate arrays and a selection mask.
+
+    The x-coordinates, y-coordinates and the selection are drawn from three private
+    random streams derived from seed_value, so the global random state is untouched.
+    Exactly num_selected points are selected, uniformly among all subsets: each chunk
+    draws how many of the remaining selections fall in it, hypergeometrically with
+    NumPy and point by point with the python backend. Only one chunk is held in memory
+    at a time. The coordinates do not depend on chunk_size; the selection does.
+
+    Args:
+        seed_value: Seed value for random number generation.
+        num_points: Total number of random points to generate (default 1000).
+        width: width of the boundary (default 2000).
+        height: height of the boundary (default 2000).
+        radius: radius of each point (default 4).
+        label_height: Height of the label boxes (default 23).
+        num_selected: Number of points to select (default 200).
+        chunk_size: Maximal number of points per chunk (default 2**20).
+        backend: "python" for array("d") coordinates and a bytearray mask, "numpy" for
+            float64 arrays and a boolean mask (default numpy if it is installed).
+
+    Returns:
+        An iterator over (xs, ys, selected) chunks, in the order of the points.
+    """
+
+    if not 0 <= num_selected <= num_points:
+        raise ValueError("num_selected must lie between 0 and num_points.")
+
+    backend = resolve_backend(backend)
+    y_start, y_end = point_y_range(height, radius, label_height)
+    num_remaining, num_unselected = num_points, num_points - num_selected
+
+    if backend == "numpy":
+        np = load_numpy()
+        x_rng, y_rng, selection_rng = (
+            np.random.default_rng(seed)
+            for seed in np.random.SeedSequence(seed_value).spawn(3)
+        )
+
+        for start in range(0, num_points, chunk_size):
+            size = min(chunk_size, num_points - start)
+            xs = x_rng.uniform(radius, width - radius, size)
+            ys = y_rng.uniform(y_start, y_end, size)
+
+            num_chunk_selected = (
+                selection_rng.hypergeometric(
+                    num_remaining - num_unselected, num_unselected, size
+                )
+                if size < num_remaining
+                else num_remaining - num_unselected
+            )
+            selected = np.zeros(size, dtype=bool)
+            selected[
+                selection_rng.choice(size, num_chunk_selected, replace=False)
+            ] = True
+
+            num_remaining -= size
+            num_unselected -= size - num_chunk_selected
+            yield xs, ys, selected
+
+        return
+
+    master_rng = random.Random(seed_value)
+    x_rng, y_rng, selection_rng = (
+        random.Random(master_rng.getrandbits(64)) for _ in range(3)
+    )
+
+    for start in range(0, num_points, chunk_size):
+        size = min(chunk_size, num_points - start)
+        xs = array("d", (x_rng.uniform(radius, width - radius) for _ in range(size)))
+        ys = array("d", (y_rng.uniform(y_start, y_end) for _ in range(size)))
+
+        # Selection sampling: select with the share of selections still to make
+        selected = bytearray(size)
+        for i in range(size):
+            num_to_select = num_remaining - num_unselected
+            if selection_rng.random() * num_remaining < num_to_select:
+                selected[i] = 1
+            else:
+                num_unselected -= 1
+            num_remaining -= 1
+
+        yield xs, ys, selected
+
+
+def generate_point_arrays(
+    seed_value: int,
+    num_points: int = num_points_generated,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    radius: int = point_radius,
+    label_height: int = box_height,
+    num_selected: int = num_points_selected,
+    backend: Optional[str] = None,
+) -> tuple:
+    """Generate random points as contiguous coordinate arrays and a selection mask.
+
+    The same points as generate_point_chunks in a single chunk; see there for the
+    arguments.
+
+    Returns:
+        A tuple (xs, ys, selected) of arrays of length num_points.
+    """
+
+    for chunk in generate_point_chunks(
+        seed_value,
+        num_points,
+        width,
+        height,
+        radius,
+        label_height,
+        num_selected,
+        max(num_points, 1),
+        backend,
+    ):
+        return chunk
+
+    if resolve_backend(backend) == "numpy":
+        np = load_numpy()
+        return np.empty(0), np.empty(0), np.zeros(0, dtype=bool)
+    return array("d"), array("d"), bytearray()
@@ -0,0 +1,351 @@
+import csv
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import Point, points_from_arrays
+from automatic_label_placement.overlap_kernel import resolve_backend, load_numpy
+from automatic_label_placement.instance_cache import aligned
+from automatic_label_placement.point_generator import point_y_range
+
+
+# Bump when the layout of the point files changes, so old files are never read
+format_version = 1
+magic = b"ALPPTS" + bytes([0, format_version])
+
+# magic, number of points
+header = struct.Struct("<8sQ")
+
+
+class PointFile:
+    """A point set read from a binary point file.
+
+    The file holds the x-coordinates and the y-coordinates as float64 and the
+    selection flags as bytes, in three sections aligned to 8 bytes. They are views of
+    the memory-mapped file, so only the pages that are read are loaded.
+    """
+
+    __slots__ = ("path", "num_points", "xs", "ys", "selected", "buffer")
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: The point file to map.
+        """
+
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(buffer)
+        if len(view) < header.size:
+            raise ValueError(f"{path} is not a point file.")
+        file_magic, num_points = header.unpack_from(view)
+        if file_magic != magic:
+            raise ValueError(f"{path} is not a point file.")
+
+        sections = []
+        offset = header.size
+        for typecode in ("d", "d", "B"):
+            size = array(typecode).itemsize * num_points
+            sections.append(view[offset : offset + size].cast(typecode))
+            offset = aligned(offset + size)
+        if offset != len(view):
+            raise ValueError(f"{path} is truncated or has trailing data.")
+
+        self.path = Path(path)
+        self.num_points = num_points
+        self.xs, self.ys, self.selected = sections
+        self.buffer = buffer
+
+    def chunks(
+        self, chunk_size: int = 1 << 20, backend: Optional[str] = None
+    ) -> Iterator[tuple]:
+        """Yield the points chunk by chunk, without copying them out of the file.
+
+        Args:
+            chunk_size: Maximal number of points per chunk (default 2**20).
+            backend: "python" for memoryviews, "numpy" for read-only arrays viewing
+                the file (default numpy if it is installed).
+
+        Returns:
+            An iterator over (xs, ys, selected) chunks, in the order of the points.
+        """
+
+        backend = resolve_backend(backend)
+        for start in range(0, self.num_points, chunk_size):
+            end = min(start + chunk_size, self.num_points)
+            xs, ys = self.xs[start:end], self.ys[start:end]
+            selected = self.selected[start:end]
+
+            if backend == "numpy":
+                np = load_numpy()
+                xs = np.frombuffer(xs, dtype=np.float64)
+                ys = np.frombuffer(ys, dtype=np.float64)
+                selected = np.frombuffer(selected, dtype=np.uint8).view(bool)
+            yield xs, ys, selected
+
+
+def write_point_file(file_path: Union[str, Path], chunks: Iterable[tuple]) -> None:
+    """Write a point set to a binary point file, chunk by chunk.
+
+    The y-coordinates and the flags are spooled to temporary files while the
+    x-coordinates are written, so only one chunk is held in memory. The file is
+    written next to its destination and renamed into place.
+
+    Args:
+        file_path: The point file to write.
+        chunks: (xs, ys, selected) chunks, e.g. from generate_point_chunks or
+            read_csv_chunks.
+    """
+
+    file_path = Path(file_path)
+    temporary_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    num_points = 0
+
+    with tempfile.TemporaryFile() as ys_file, tempfile.TemporaryFile() as flag_file:
+        with open(temporary_path, "wb") as file:
+            file.write(header.pack(magic, 0))
+            for xs, ys, selected in chunks:
+                array("d", xs).tofile(file)
+                array("d", ys).tofile(ys_file)
+                array("B", (1 if flag else 0 for flag in selected)).tofile(flag_file)
+                num_points += len(xs)
+
+            for section in (ys_file, flag_file):
+                file.write(bytes(aligned(file.tell()) - file.tell()))
+                section.seek(0)
+                shutil.copyfileobj(section, file)
+            file.write(bytes(aligned(file.tell()) - file.tell()))
+
+            file.seek(0)
+            file.write(header.pack(magic, num_points))
+    os.replace(temporary_path, file_path)
+
+
+def read_csv_chunks(
+    file_path: Union[str, Path],
+    chunk_size: int = 1 << 20,
+    x_column: str = "x",
+    y_column: str = "y",
+    selected_column: Optional[str] = "selected",
+    backend: Optional[str] = None,
+) -> Iterator[tuple]:
+    """Read the points of a csv file with a header row chunk by chunk.
+
+    With NumPy every chunk of lines is parsed by np.loadtxt; the python backend
+    parses the rows straight into arrays. No Point object is created either way. Both
+    accept quoted fields, and chunks of blank lines are skipped.
+
+    Args:
+        file_path: The csv file to read.
+        chunk_size: Maximal number of points per chunk (default 2**20).
+        x_column: The column of the x-coordinates (default "x").
+        y_column: The column of the y-coordinates (default "y").
+        selected_column: The column of the flags, 1 for points that get a label and
+            0 for the others, or None to label every point (default "selected").
+        backend: "python" for array("d") coordinates and a bytearray mask, "numpy" for
+            float64 arrays and a boolean mask (default numpy if it is installed).
+
+    Returns:
+        An iterator over (xs, ys, selected) chunks, in the order of the rows.
+    """
+
+    backend = resolve_backend(backend)
+
+    with open(file_path, newline="") as file:
+        columns = next(csv.reader([file.readline()]))
+        try:
+            indexes = [columns.index(x_column), columns.index(y_column)]
+            if selected_column is not None:
+                indexes.append(columns.index(selected_column))
+        except ValueError:
+            raise ValueError(f"{file_path} lacks one of the point columns.") from None
+
+        while True:
+            lines = list(islice(file, chunk_size))
+            if not lines:
+                return
+            if not any(line.strip() for line in lines):
+                continue
+
+            if backend == "numpy":
+                np = load_numpy()
+                table = np.loadtxt(
+                    lines,
+                    delimiter=",",
+                    quotechar='"',
+                    usecols=indexes,
+                    ndmin=2,
+                    dtype=np.float64,
+                )
+                xs, ys = table[:, 0].copy(), table[:, 1].copy()
+                selected = (
+                    table[:, 2] != 0
+                    if selected_column is not None
+                    else np.ones(len(table), dtype=bool)
+                )
+            else:
+                xs, ys, selected = array("d"), array("d"), bytearray()
+                for row in csv.reader(lines):
+                    if not row:
+                        continue
+                    xs.append(float(row[indexes[0]]))
+                    ys.append(float(row[indexes[1]]))
+                    selected.append(
+                        float(row[indexes[2]]) != 0
+                        if selected_column is not None
+                        else 1
+                    )
+            yield xs, ys, selected
+
+
+def check_within_boundary(
+    xs,
+    ys,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    start: int = 0,
+    radius: int = point_radius,
+    label_height: int = box_height,
+) -> None:
+    """Check that points lie within the area generated points are drawn from, with
+        vectorized comparisons if the coordinates are NumPy arrays.
+
+    Points keep their radius from the left and right of the boundary and the margins
+    of point_y_range from the top and bottom, so their labels fit within it.
+
+    Args:
+        xs: X-coordinates of the points.
+        ys: Y-coordinates of the points.
+        width: width of the boundary (default 2000).
+        height: height of the boundary (default 2000).
+        start: The index of the first point, for the error message (default 0).
+        radius: radius of each point (default 4).
+        label_height: Height of the label boxes (default 23).
+
+    Raises:
+        ValueError: If a coordinate is outside that area or not a number.
+    """
+
+    x_start, x_end = radius, width - radius
+    y_start, y_end = point_y_range(height, radius, label_height)
+
+    if hasattr(xs, "dtype"):
+        np = load_numpy()
+        outside = np.flatnonzero(
+            ~((xs >= x_start) & (xs <= x_end) & (ys >= y_start) & (ys <= y_end))
+        )
+        if len(outside) == 0:
+            return
+        index = int(outside[0])
+    else:
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            if not (x_start <= x <= x_end and y_start <= y <= y_end):
+                break
+        else:
+            return
+
+    raise ValueError(
+        f"Point {start + index} at ({xs[index]}, {ys[index]}) is outside "
+        f"[{x_start}, {x_end}] x [{y_start}, {y_end}], where the labels of points fit "
+        f"within the {width} x {height} boundary."
+    )
+
+
+def load_point_chunks(
+    file_path: Union[str, Path],
+    chunk_size: int = 1 << 20,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    backend: Optional[str] = None,
+) -> Iterator[tuple]:
+    """Read a point set chunk by chunk and check it against the boundary.
+
+    Args:
+        file_path: A csv file if it ends in .csv, see read_csv_chunks, else a binary
+            point file, see PointFile.
+        chunk_size: Maximal number of points per chunk (default 2**20).
+        width: width of the boundary (default 2000).
+        height: height of the boundary (default 2000).
+        backend: The array backend of the chunks (default numpy if it is installed).
+
+    Returns:
+        An iterator over (xs, ys, selected) chunks, in the order of the points.
+    """
+
+    if Path(file_path).suffix.lower() == ".csv":
+        chunks = read_csv_chunks(file_path, chunk_size, backend=backend)
+    else:
+        chunks = PointFile(file_path).chunks(chunk_size, backend)
+
+    start = 0
+    for xs, ys, selected in chunks:
+        check_within_boundary(xs, ys, width, height, start)
+        start += len(xs)
+        yield xs, ys, selected
+
+
+def load_point_arrays(
+    file_path: Union[str, Path],
+    width: int = boundary_width,
+    height: int = boundary_height,
+    backend: Optional[str] = None,
+) -> tuple:
+    """Read a point set as contiguous coordinate arrays and a selection mask.
+
+    The same points as load_point_chunks in a single chunk; see there for the
+    arguments. The arrays of a binary point file are views of the mapped file; csv
+    files are still parsed in chunks, which are then concatenated.
+
+    Returns:
+        A tuple (xs, ys, selected) of arrays with one entry per point.
+    """
+
+    backend = resolve_backend(backend)
+    chunk_size = 1 << 20 if Path(file_path).suffix.lower() == ".csv" else sys.maxsize
+    chunks = list(load_point_chunks(file_path, chunk_size, width, height, backend))
+    if len(chunks) == 1:
+        return chunks[0]
+
+    if backend == "numpy":
+        np = load_numpy()
+        if not chunks:
+            return np.empty(0), np.empty(0), np.zeros(0, dtype=bool)
+        return tuple(np.concatenate(columns) for columns in zip(*chunks))
+
+    xs, ys, selected = array("d"), array("d"), bytearray()
+    for chunk_xs, chunk_ys, chunk_selected in chunks:
+        xs.extend(chunk_xs)
+        ys.extend(chunk_ys)
+        selected.extend(chunk_selected)
+    return xs, ys, selected
+
+
+def load_points(
+    file_path: Union[str, Path],
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[Point]:
+    """Read a point set into the Point objects the solvers take.
+
+    Every point becomes a Python object, so this is meant for point sets that fit in
+    memory as such; read larger ones as arrays with load_point_arrays or chunk by
+    chunk with load_point_chunks.
+
+    Args:
+        file_path: A csv or binary point file, see load_point_chunks.
+        width: width of the boundary (default 2000).
+        height: height of the boundary (default 2000).
+
+    Returns:
+        A list of Point objects.
+    """
+
+    return points_from_arrays(*load_point_arrays(file_path, width, height))
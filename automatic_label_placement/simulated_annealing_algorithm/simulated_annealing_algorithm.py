@@ -0,0 +1,174 @@
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    LabelBox,
+    PlacementResult,
+    generate_random_points,
+    evaluate_placement,
+    label_boxes_from_positions,
+)
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.instrumentation import Stats, phase, profiling
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.greedy_algorithm.greedy_algorithm_processor import (
+    greedy_placement_on_graph,
+)
+from automatic_label_placement.simulated_annealing_algorithm.simulated_annealing_algorithm_processor import (
+    geometric_cooling,
+    anneal,
+)
+from typing import TYPE_CHECKING, List, Optional, Sequence
+import os
+import random
+from automatic_label_placement.config_reader import *
+
+
+if TYPE_CHECKING:
+    from automatic_label_placement.instance_cache import InstanceCache
+
+
+def simulated_annealing_solve(
+    points: List[Point],
+    initial_temperature: float = initial_temperature,
+    final_temperature: float = final_temperature,
+    cooling_rate: float = cooling_rate,
+    moves_per_label: int = moves_per_label,
+    stats: Optional[Stats] = None,
+    graph: Optional[ConflictGraph] = None,
+    budget: Optional[Budget] = None,
+    initial_positions: Optional[Sequence[int]] = None,
+    rng: Optional[random.Random] = None,
+    width: int = boundary_width,
+    height: int = boundary_height,
+) -> List[LabelBox]:
+    """Place the labels of the selected points with simulated annealing.
+
+    The search starts from the greedy placement, or from initial_positions, and runs
+    on a ConflictGraph.
+
+    Args:
+        points: A list of Point objects.
+        initial_temperature: The first temperature of the cooling schedule (default 1.0).
+        final_temperature: The schedule stops below this temperature (default 0.05).
+        cooling_rate: Factor applied to the temperature after each step (default 0.9).
+        moves_per_label: Number of moves tried per label at each temperature
+            (default 5).
+        stats: Stats to record the counters and the initial_placement and optimise
+            phases in (default None).
+        graph: A precomputed ConflictGraph of the points, such as a cached one, to
+            use instead of building it (default None).
+        budget: A Budget limiting the greedy initial placement and the annealing,
+            whose iterations are temperature steps; once it is used up the best
+            placement found so far is returned (default None).
+        initial_positions: The position of every label to start from instead of the
+            greedy placement, such as the positions of an exported placement (default
+            None).
+        rng: The random number generator of the greedy placement and the annealing
+            (default the global random module).
+        width: Width of the boundary the boxes have to lie within, when no graph is
+            given (default 2000).
+        height: Height of the boundary, when no graph is given (default 2000).
+
+    Returns:
+        boxes: The label boxes of the selected points, in the order of the points.
+    """
+
+    with phase(stats, "initial_placement"):
+        if graph is None:
+            graph = ConflictGraph(points, width=width, height=height)
+        if initial_positions is not None:
+            initial_boxes = label_boxes_from_positions(
+                points, initial_positions, width=width, height=height
+            )
+        else:
+            initial_boxes = greedy_placement_on_graph(graph, stats, budget, rng)
+
+    with phase(stats, "optimise"):
+        state = PlacementState(graph, [box.position for box in initial_boxes])
+        schedule = geometric_cooling(
+            initial_temperature, final_temperature, cooling_rate
+        )
+        placement = anneal(state, schedule, moves_per_label, stats, budget, rng)
+
+    return graph.label_boxes(placement)
+
+
+def simulated_annealing_algorithm(
+    seed_value: int,
+    initial_temperature: float = initial_temperature,
+    final_temperature: float = final_temperature,
+    cooling_rate: float = cooling_rate,
+    moves_per_label: int = moves_per_label,
+    stats: Optional[Stats] = None,
+    output_file: Optional[str] = "simulated_annealing_algorithm.svg",
+    open_browser: bool = True,
+    cache: Optional["InstanceCache"] = None,
+    budget: Optional[Budget] = None,
+) -> PlacementResult:
+    """Run the simulated annealing algorithm for label placement.
+
+    Args:
+        seed_value: Seed value for random number generation.
+        initial_temperature: The first temperature of the cooling schedule (default 1.0).
+        final_temperature: The schedule stops below this temperature (default 0.05).
+        cooling_rate: Factor applied to the temperature after each step (default 0.9).
+        moves_per_label: Number of moves tried per label at each temperature
+            (default 5).
+        stats: Stats to record the run in, including the generate and render phases
+            (default None, no instrumentation).
+        output_file: The svg file to write the drawing to, or None to skip rendering
+            (default simulated_annealing_algorithm.svg).
+        open_browser: Whether to open the svg file in a web browser (default True).
+        cache: An InstanceCache to load the points and their ConflictGraph from
+            instead of generating them (default None).
+        budget: A Budget limiting the search; the result is the best placement found
+            within it and records whether the search converged (default None).
+
+    Returns:
+        The PlacementResult of the run, with the stats attached.
+    """
+
+    with profiling(stats):
+        with phase(stats, "generate"):
+            if cache is not None:
+                instance = cache.load(seed_value)
+                points, graph = instance.points, instance.graph
+            else:
+                points, graph = generate_random_points(seed_value), None
+        # The search draws from its own stream, so the caller's random state is kept
+        rng = random.Random(seed_value)
+
+        boxes = simulated_annealing_solve(
+            points,
+            initial_temperature,
+            final_temperature,
+            cooling_rate,
+            moves_per_label,
+            stats,
+            graph,
+            budget,
+            rng=rng,
+        )
+
+        result = evaluate_placement(
+            points, boxes, stats, converged=budget is None or not budget.exhausted
+        )
+        print(
+            "Numer of overlaps from simulated annealing algorithm: "
+            f"{result.num_overlaps}"
+        )
+
+        # The svg graph is only built once the placement is final
+        if output_file is not None:
+            with phase(stats, "render"):
+                result.save_svg(output_file, points)
+
+    if output_file is not None and open_browser:
+        import webbrowser
+
+        webbrowser.open(f"file://{os.path.abspath(output_file)}")
+
+    return result
+
+
+if __name__ == "__main__":
+    simulated_annealing_algorithm(seed_value=seeds[0])
@@ -0,0 +1,114 @@
+import math
+import random
+from typing import Iterator, List, Optional
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.conflict_graph import PlacementState
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.budget import Budget
+
+
+def geometric_cooling(
+    initial_temperature: float = initial_temperature,
+    final_temperature: float = final_temperature,
+    cooling_rate: float = cooling_rate,
+) -> Iterator[float]:
+    """Yield the temperatures of a geometric cooling schedule.
+
+    Args:
+        initial_temperature: The first temperature (default 1.0).
+        final_temperature: The schedule stops below this temperature (default 0.05).
+        cooling_rate: Factor applied to the temperature after each step (default 0.9).
+
+    Returns:
+        An iterator over the temperatures.
+    """
+
+    if not 0 < cooling_rate < 1:
+        raise ValueError("The cooling rate must lie strictly between 0 and 1.")
+
+    temperature = initial_temperature
+    while temperature >= final_temperature:
+        yield temperature
+        temperature *= cooling_rate
+
+
+def anneal(
+    state: PlacementState,
+    schedule: Iterator[float],
+    moves_per_label: int = moves_per_label,
+    stats: Optional[Stats] = None,
+    budget: Optional[Budget] = None,
+    rng: Optional[random.Random] = None,
+) -> List[int]:
+    """Improve a placement with simulated annealing over single-label moves.
+
+    A move puts a random label at another of its valid positions. It is accepted if it
+    does not increase the number of overlaps, or otherwise with probability
+    exp(-delta / temperature). The change is read from the state in constant time.
+
+    Args:
+        state: The PlacementState to improve, updated in place.
+        schedule: The temperatures to anneal at, e.g. from geometric_cooling.
+        moves_per_label: Number of moves tried per label at each temperature
+            (default 5).
+        stats: Stats to count the temperature steps, candidate evaluations and
+            accepted moves in (default None).
+        budget: A Budget whose iterations are temperature steps, polled between
+            moves too; the annealing stops once it is used up (default None).
+        rng: The random number generator to draw the moves and the acceptances from
+            (default the global random module).
+
+    Returns:
+        best_placement: The placement with the fewest overlaps seen.
+    """
+
+    rng = rng if rng is not None else random
+    graph = state.graph
+    movable = [
+        (label, graph.valid_positions(label))
+        for label in range(graph.num_labels)
+        if len(graph.valid_positions(label)) > 1
+    ]
+    best_placement = list(state.placement)
+    best_total = state.total
+
+    if not movable:
+        return best_placement
+
+    num_moves = moves_per_label * graph.num_labels
+    num_steps = num_skipped = num_accepted = 0
+    for temperature in schedule:
+        if budget is not None and not budget.next_iteration():
+            break
+
+        num_steps += 1
+        for move in range(num_moves):
+            if budget is not None and budget.expired():
+                # The rest of the step counts as skipped moves
+                num_skipped += num_moves - move
+                break
+
+            label, valid_positions = rng.choice(movable)
+            position = rng.choice(valid_positions)
+            if position == state.placement[label]:
+                num_skipped += 1
+                continue
+
+            delta = state.delta(label, position)
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                state.move(label, position)
+                num_accepted += 1
+
+                if state.total < best_total:
+                    best_total = state.total
+                    best_placement = list(state.placement)
+
+        if best_total == 0:
+            break
+
+    if stats is not None:
+        stats.count("iterations", num_steps)
+        stats.count("candidate_evaluations", num_steps * num_moves - num_skipped)
+        stats.count("accepted_moves", num_accepted)
+
+    return best_placement
@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.budget import Budget
+
+if TYPE_CHECKING:
+    from automatic_label_placement.label_placement_utils import (
+        Point,
+        LabelBox,
+        PlacementResult,
+    )
+
+
+# The solve function of every algorithm, by name, once load_algorithms has run. The
+# algorithm modules take their defaults from the config, so importing this module
+# neither imports them nor parses the config.
+_algorithms: Optional[Dict[str, Callable[..., List["LabelBox"]]]] = None
+
+
+def load_algorithms() -> Dict[str, Callable[..., List["LabelBox"]]]:
+    """Import the algorithms on first use and return their solve functions, by name."""
+
+    global _algorithms
+    if _algorithms is None:
+        from automatic_label_placement.greedy_algorithm.greedy_algorithm import (
+            greedy_solve,
+        )
+        from automatic_label_placement.local_search_algorithm.local_search_algorithm import (
+            local_search_solve,
+        )
+        from automatic_label_placement.simulated_annealing_algorithm.simulated_annealing_algorithm import (
+            simulated_annealing_solve,
+        )
+
+        _algorithms = {
+            "greedy": greedy_solve,
+            "local_search": local_search_solve,
+            "simulated_annealing": simulated_annealing_solve,
+        }
+
+    return _algorithms
+
+
+def __getattr__(name: str):
+    """Load the algorithms on the first lookup of solver.algorithms."""
+
+    if name == "algorithms":
+        return load_algorithms()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def solve(
+    points: List["Point"],
+    algorithm: str = "greedy",
+    stats: Optional[Stats] = None,
+    decompose: bool = False,
+    budget: Optional[Budget] = None,
+    partition: bool = False,
+    **options,
+) -> "PlacementResult":
+    """Place the labels of the selected points without rendering or writing files.
+
+    Args:
+        points: A list of Point objects.
+        algorithm: "greedy", "local_search" or "simulated_annealing" (default greedy).
+        stats: Stats to record the run in (default None).
+        decompose: Solve the connected components of the labels independently with
+            component_solve (default False).
+        budget: A Budget limiting the search; the result is the best placement found
+            within it and records whether the search converged (default None). It
+            cannot be combined with decompose or partition.
+        partition: Solve tiles of the area in parallel and repair the seams with
+            partitioned_solve, for instances too large to solve at once (default
+            False). It cannot be combined with decompose.
+        **options: Keyword arguments passed on to the solve function of the algorithm,
+            e.g. backend, use_conflict_graph or rng; with decompose or partition the
+            components or tiles draw their seeds from rng. A graph has to have the
+            configured label size and cannot be combined with decompose or partition.
+
+    Returns:
+        The PlacementResult of the placement; render it with PlacementResult.render.
+    """
+
+    from automatic_label_placement.label_placement_utils import evaluate_placement
+
+    algorithms = load_algorithms()
+    if algorithm not in algorithms:
+        raise ValueError(
+            f"Unknown algorithm {algorithm!r}, expected one of {list(algorithms)}."
+        )
+
+    # The placement is scored with the configured label size
+    from automatic_label_placement.config_reader import box_width, box_height
+
+    graph = options.get("graph")
+    if graph is not None and graph.label_size != (box_width, box_height):
+        raise ValueError(
+            "The graph has labels of other sizes than the configured "
+            f"{box_width} x {box_height}, which the result is scored with."
+        )
+
+    if decompose and partition:
+        raise ValueError("decompose cannot be combined with partition.")
+    for name, enabled in (("decompose", decompose), ("partition", partition)):
+        if enabled and budget is not None:
+            raise ValueError(f"A budget cannot be combined with {name}.")
+        if enabled and options.get("initial_positions") is not None:
+            raise ValueError(f"Initial positions cannot be combined with {name}.")
+        if enabled and graph is not None:
+            raise ValueError(f"A graph cannot be combined with {name}.")
+
+    if partition:
+        # Imported here, as partitioned_solver looks its algorithms up in this module
+        from automatic_label_placement.partitioned_solver import partitioned_solve
+
+        boxes = partitioned_solve(points, algorithm, stats=stats, **options)
+    elif decompose:
+        # Imported here, as the component solver looks its algorithms up in this module
+        from automatic_label_placement.component_solver import component_solve
+
+        boxes = component_solve(points, algorithm, stats=stats, **options)
+    else:
+        boxes = algorithms[algorithm](points, stats=stats, budget=budget, **options)
+    return evaluate_placement(
+        points, boxes, stats, converged=budget is None or not budget.exhausted
+    )
@@ -0,0 +1,62 @@
+from typing import Dict, Hashable, Iterator, List, Tuple
+from automatic_label_placement.config_reader import *
+
+
+class SpatialGrid:
+    """Uniform grid that buckets items by the cell containing their anchor coordinates.
+
+    The cells default to the size of a label box, so every box overlapping a given box
+    has its anchor in one of the 3 x 3 cells around the anchor of that box.
+    """
+
+    def __init__(self, cell_width: float = box_width, cell_height: float = box_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells: Dict[Tuple[int, int], List[Hashable]] = {}
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """Return the cell that contains the coordinates (x, y)."""
+
+        return int(x // self.cell_width), int(y // self.cell_height)
+
+    def insert(self, item: Hashable, x: float, y: float) -> None:
+        """Add an item anchored at (x, y) to the grid."""
+
+        self.cells.setdefault(self.cell_of(x, y), []).append(item)
+
+    def remove(self, item: Hashable, x: float, y: float) -> None:
+        """Remove an item anchored at (x, y) from the grid."""
+
+        cell = self.cell_of(x, y)
+        bucket = self.cells[cell]
+        bucket.remove(item)
+        if not bucket:
+            del self.cells[cell]
+
+    def move(
+        self, item: Hashable, old_x: float, old_y: float, new_x: float, new_y: float
+    ) -> None:
+        """Move an item from the anchor (old_x, old_y) to (new_x, new_y)."""
+
+        if self.cell_of(old_x, old_y) != self.cell_of(new_x, new_y):
+            self.remove(item, old_x, old_y)
+            self.insert(item, new_x, new_y)
+
+    def query(
+        self, x_min: float, y_min: float, x_max: float, y_max: float
+    ) -> Iterator[Hashable]:
+        """Yield every item whose cell intersects the given range of anchor coordinates.
+
+        The result is a superset of the items anchored inside the range, so callers still
+        run their exact intersection test on each item.
+        """
+
+        col_min, row_min = self.cell_of(x_min, y_min)
+        col_max, row_max = self.cell_of(x_max, y_max)
+        cells = self.cells
+
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    yield from bucket
@@ -0,0 +1,274 @@
+import struct
+import zlib
+from typing import Container, Dict, Iterable, Iterator, Tuple
+from automatic_label_placement.config_reader import *
+
+
+# RGB pixel values
+black = b"\x00\x00\x00"
+red = b"\xff\x00\x00"
+white = b"\xff\xff\xff"
+
+
+def write_svg(
+    file_path: str,
+    points: Iterable,
+    coordinates: Iterable[Tuple[float, float]],
+    conflicts: Container[int] = frozenset(),
+    point_conflicts: Container[int] = frozenset(),
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    pixel_size: int = pixel_size,
+    buffer_size: int = 1 << 20,
+) -> None:
+    """Write the points and label boxes to an svg file while walking over them.
+
+    Unlike render_placement no element objects are built, so memory does not grow with
+    the number of points. The output matches the drawing of render_placement.
+
+    Args:
+        file_path: The svg file to write.
+        points: Objects with x, y and selected attributes, e.g. Point objects.
+        coordinates: The (x, y) coordinates of the label boxes, in the order of the
+            selected points.
+        conflicts: The indexes of the labels to color red.
+        point_conflicts: The indexes of the points to color red.
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        width: Width of the boundary (default 2000).
+        height: Height of the boundary (default 2000).
+        pixel_size: Size of the rendering pixels (default 740).
+        buffer_size: Size of the write buffer in bytes (default 1 MiB).
+    """
+
+    label_coordinates = iter(coordinates)
+
+    with open(file_path, "w", buffering=buffer_size) as file:
+        write = file.write
+        write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink"\n'
+            f'     width="{pixel_size}" height="{pixel_size}" '
+            f'viewBox="0 0 {width} {height}">\n'
+            f'<rect x="0" y="0" width="{width}" height="{height}" '
+            'fill="none" stroke="black" />\n'
+        )
+
+        # A selected circle always goes after its rectangle
+        label = 0
+        for index, point in enumerate(points):
+            if point.selected:
+                x, y = next(label_coordinates)
+                stroke = "red" if label in conflicts else "black"
+                write(
+                    f'<rect x="{x}" y="{y}" width="{label_width}" '
+                    f'height="{label_height}" fill="none" stroke="{stroke}" />\n'
+                )
+                label += 1
+
+            fill = "red" if index in point_conflicts else "black"
+            write(
+                f'<circle cx="{point.x}" cy="{point.y}" r="{radius}" fill="{fill}" />\n'
+            )
+
+        write("</svg>\n")
+
+
+class RasterCanvas:
+    """An RGB image stored in square tiles that are only allocated once drawn on.
+
+    Memory is bounded by the image size, whatever the number of shapes drawn.
+    """
+
+    def __init__(self, width: int, height: int, tile_size: int = 256):
+        """
+        Args:
+            width: Width of the image in pixels.
+            height: Height of the image in pixels.
+            tile_size: Width and height of the tiles in pixels (default 256).
+        """
+
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles: Dict[Tuple[int, int], bytearray] = {}
+        self.blank_tile_row = white * tile_size
+
+    def fill_span(self, row: int, start: int, end: int, color: bytes) -> None:
+        """Color the pixels [start, end) of a row, clipped to the image."""
+
+        if not 0 <= row < self.height:
+            return
+        start, end = max(start, 0), min(end, self.width)
+
+        tile_size = self.tile_size
+        tile_row, y = divmod(row, tile_size)
+        while start < end:
+            tile_column, x = divmod(start, tile_size)
+            span = min(end - start, tile_size - x)
+
+            tile = self.tiles.get((tile_row, tile_column))
+            if tile is None:
+                tile = bytearray(self.blank_tile_row * tile_size)
+                self.tiles[(tile_row, tile_column)] = tile
+
+            offset = 3 * (y * tile_size + x)
+            tile[offset : offset + 3 * span] = color * span
+            start += span
+
+    def fill_rect(
+        self, left: int, top: int, right: int, bottom: int, color: bytes
+    ) -> None:
+        """Color the pixels of the rectangle [left, right) x [top, bottom)."""
+
+        for row in range(max(top, 0), min(bottom, self.height)):
+            self.fill_span(row, left, right, color)
+
+    def outline_rect(
+        self, left: int, top: int, right: int, bottom: int, color: bytes
+    ) -> None:
+        """Color the one pixel wide border of the rectangle [left, right) x [top, bottom)."""
+
+        self.fill_span(top, left, right, color)
+        self.fill_span(bottom - 1, left, right, color)
+        for row in range(max(top + 1, 0), min(bottom - 1, self.height)):
+            self.fill_span(row, left, left + 1, color)
+            self.fill_span(row, right - 1, right, color)
+
+    def rows(self) -> Iterator[bytes]:
+        """Yield the RGB bytes of every row of the image, from the top."""
+
+        tile_size = self.tile_size
+        num_tile_columns = -(-self.width // tile_size)
+        for row in range(self.height):
+            tile_row, y = divmod(row, tile_size)
+            segments = []
+            for tile_column in range(num_tile_columns):
+                span = min(tile_size, self.width - tile_column * tile_size)
+                tile = self.tiles.get((tile_row, tile_column))
+                if tile is None:
+                    segments.append(self.blank_tile_row[: 3 * span])
+                else:
+                    offset = 3 * y * tile_size
+                    segments.append(tile[offset : offset + 3 * span])
+            yield b"".join(segments)
+
+
+def write_png(file_path: str, canvas: RasterCanvas) -> None:
+    """Write a canvas to a PNG file, compressing it row by row.
+
+    Args:
+        file_path: The PNG file to write.
+        canvas: The RasterCanvas to write.
+    """
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + chunk_type
+            + data
+            + struct.pack(">I", zlib.crc32(chunk_type + data))
+        )
+
+    compressor = zlib.compressobj()
+    with open(file_path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(
+            chunk(
+                b"IHDR",
+                struct.pack(">IIBBBBB", canvas.width, canvas.height, 8, 2, 0, 0, 0),
+            )
+        )
+
+        pending = []
+        pending_size = 0
+        for row in canvas.rows():
+            # Every row starts with filter type 0
+            data = compressor.compress(b"\x00" + row)
+            if data:
+                pending.append(data)
+                pending_size += len(data)
+            if pending_size >= 1 << 16:
+                file.write(chunk(b"IDAT", b"".join(pending)))
+                pending, pending_size = [], 0
+
+        pending.append(compressor.flush())
+        file.write(chunk(b"IDAT", b"".join(pending)))
+        file.write(chunk(b"IEND", b""))
+
+
+def write_raster_preview(
+    file_path: str,
+    points: Iterable,
+    coordinates: Iterable[Tuple[float, float]],
+    conflicts: Container[int] = frozenset(),
+    point_conflicts: Container[int] = frozenset(),
+    radius: int = point_radius,
+    label_width: int = box_width,
+    label_height: int = box_height,
+    width: int = boundary_width,
+    height: int = boundary_height,
+    pixel_size: int = pixel_size,
+    tile_size: int = 256,
+) -> None:
+    """Write a PNG overview of the points and label boxes at the render size.
+
+    Shapes are reduced to the level of detail the resolution allows: a point smaller
+    than a pixel becomes a single pixel, and a box less than three pixels wide or high
+    is filled instead of outlined. Conflicts are colored red as in the svg.
+
+    Args:
+        file_path: The PNG file to write.
+        points: Objects with x, y and selected attributes, e.g. Point objects.
+        coordinates: The (x, y) coordinates of the label boxes, in the order of the
+            selected points.
+        conflicts: The indexes of the labels to color red.
+        point_conflicts: The indexes of the points to color red.
+        radius: The radius of the points (default 4).
+        label_width: The width of the label (default 88).
+        label_height: The height of the label (default 23).
+        width: Width of the boundary (default 2000).
+        height: Height of the boundary (default 2000).
+        pixel_size: Width and height of the image in pixels (default 740).
+        tile_size: Width and height of the tiles of the canvas (default 256).
+    """
+
+    canvas = RasterCanvas(pixel_size, pixel_size, tile_size)
+    scale_x = pixel_size / width
+    scale_y = pixel_size / height
+    radius_x = max(int(radius * scale_x), 0)
+    radius_y = max(int(radius * scale_y), 0)
+    box_columns = max(round(label_width * scale_x), 1)
+    box_rows = max(round(label_height * scale_y), 1)
+    draw_box = canvas.outline_rect
+    if box_columns < 3 or box_rows < 3:
+        draw_box = canvas.fill_rect
+
+    canvas.outline_rect(0, 0, pixel_size, pixel_size, black)
+
+    label_coordinates = iter(coordinates)
+    label = 0
+    for index, point in enumerate(points):
+        if point.selected:
+            x, y = next(label_coordinates)
+            left, top = int(x * scale_x), int(y * scale_y)
+            color = red if label in conflicts else black
+            draw_box(left, top, left + box_columns, top + box_rows, color)
+            label += 1
+
+        column, row = int(point.x * scale_x), int(point.y * scale_y)
+        color = red if index in point_conflicts else black
+        canvas.fill_rect(
+            column - radius_x,
+            row - radius_y,
+            column + radius_x + 1,
+            row + radius_y + 1,
+            color,
+        )
+
+    write_png(file_path, canvas)
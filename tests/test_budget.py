@@ -0,0 +1,39 @@
+import random
+import pytest
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.solver import solve
+
+
+@pytest.fixture(scope="module")
+def points():
+    return generate_random_points(6)
+
+
+@pytest.mark.parametrize("algorithm", ["local_search", "simulated_annealing"])
+def test_iteration_budget_stops_early(points, algorithm):
+    """A search limited to one iteration stops before converging and reports so."""
+
+    full_stats, stats = Stats(), Stats()
+    full = solve(points, algorithm, full_stats, rng=random.Random(6))
+    budget = Budget(max_iterations=1)
+    result = solve(points, algorithm, stats, budget=budget, rng=random.Random(6))
+
+    assert full.converged
+    assert full_stats.counters["iterations"] > 1
+    assert not result.converged
+    assert budget.exhausted
+    assert stats.counters["iterations"] == 1
+    assert len(result.positions) == len(full.positions)
+
+
+@pytest.mark.parametrize("algorithm", ["greedy", "local_search", "simulated_annealing"])
+def test_expired_deadline_still_places_every_label(points, algorithm):
+    """With a deadline that has already passed every label still gets a position."""
+
+    result = solve(points, algorithm, budget=Budget(time_limit=0), rng=random.Random(6))
+
+    assert not result.converged
+    assert len(result.positions) == sum(point.selected for point in points)
+    assert all(position >= 0 for position in result.positions)
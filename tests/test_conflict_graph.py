@@ -0,0 +1,25 @@
+import random
+from automatic_label_placement.label_placement_utils import (
+    generate_random_points,
+    evaluate_placement,
+)
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    random_placement,
+)
+
+
+def test_graph_scores_match_geometry():
+    """The graph scores random placements with the overlap count of their boxes."""
+
+    points = generate_random_points(5, 600, 800, 800, num_selected=200)
+    graph = ConflictGraph(points, width=800, height=800)
+    rng = random.Random(5)
+
+    for _ in range(5):
+        placement = random_placement(graph, rng)
+        result = evaluate_placement(points, graph.label_boxes(placement))
+
+        assert result.num_overlaps > 0
+        assert graph.total_overlaps(placement) == result.num_overlaps
+        assert set(graph.conflicting_labels(placement)) == result.conflicts
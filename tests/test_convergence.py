@@ -0,0 +1,52 @@
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.convergence import Convergence
+
+
+def test_revisited_placement_is_a_cycle():
+    """Moving a label back and forth without improving stops on the second visit."""
+
+    stats = Stats()
+    convergence = Convergence(patience=10, stats=stats)
+    convergence.start([0, 1, 2])
+
+    assert convergence.update(5)
+    convergence.moved(1, 1, 3)
+    assert convergence.update(5)
+    convergence.moved(1, 3, 1)
+    assert not convergence.update(5)
+
+    assert convergence.reason == "cycled"
+    assert convergence.iterations == 3
+    assert stats.counters["cycles"] == 1
+
+
+def test_improvement_forgets_earlier_placements():
+    """A placement seen before an improvement does not count as a cycle after it."""
+
+    convergence = Convergence(patience=10)
+    convergence.start([0, 1])
+
+    assert convergence.update(5)
+    convergence.moved(0, 0, 2)
+    assert convergence.update(3)
+    convergence.moved(0, 2, 0)
+    assert convergence.update(3)
+    assert convergence.reason is None
+
+
+def test_stalled_and_settled():
+    """New placements without improvement stall after patience iterations, and an
+    empty worklist settles the search at once."""
+
+    convergence = Convergence(patience=2)
+    convergence.start([0])
+    assert convergence.update(4)
+    for position in (1, 2):
+        convergence.moved(0, position - 1, position)
+        convergence.update(4)
+    assert convergence.reason == "stalled"
+
+    convergence = Convergence(patience=2)
+    convergence.start([0])
+    assert not convergence.update(4, num_queued=0)
+    assert convergence.reason == "settled"
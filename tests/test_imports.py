@@ -0,0 +1,63 @@
+import subprocess
+import sys
+from pathlib import Path
+
+
+# The repository root, so the subprocesses import the package from this checkout
+root = Path(__file__).resolve().parent.parent
+
+# Cumulative microseconds `python -X importtime` may report for importing the solver
+import_time_budget = 100_000
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter in the repository root and capture its output."""
+
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_is_lazy():
+    """Importing the solver and the CLI loads neither NumPy nor drawsvg, and leaves
+    the config unparsed."""
+
+    script = "\n".join(
+        [
+            "import sys",
+            "import automatic_label_placement.solver",
+            "import automatic_label_placement.cli",
+            "config = sys.modules.get('automatic_label_placement.config_reader')",
+            "print('numpy' in sys.modules)",
+            "print('drawsvg' in sys.modules)",
+            "print(config is not None and 'boundary_width' in vars(config))",
+        ]
+    )
+
+    numpy_loaded, drawsvg_loaded, config_parsed = run_python(
+        "-c", script
+    ).stdout.split()
+
+    assert numpy_loaded == "False"
+    assert drawsvg_loaded == "False"
+    assert config_parsed == "False"
+
+
+def test_import_time_budget():
+    """Importing the solver stays within import_time_budget."""
+
+    stderr = run_python(
+        "-X", "importtime", "-c", "import automatic_label_placement.solver"
+    ).stderr
+
+    # After a header, the lines read "import time: <self> | <cumulative> | <module>"
+    cumulative = {}
+    for line in stderr.splitlines()[1:]:
+        _, microseconds, module = line.split("|")
+        cumulative[module.strip()] = int(microseconds)
+
+    assert cumulative["automatic_label_placement.solver"] < import_time_budget
@@ -0,0 +1,59 @@
+import os
+from automatic_label_placement import instance_cache
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.instance_cache import (
+    CachedInstance,
+    InstanceCache,
+    write_instance,
+)
+
+
+def test_miss_hit_and_eviction(tmp_path, monkeypatch):
+    """A miss stores the generated instance, a hit maps it without generating and
+    bumps it, and the least recently used file is evicted first."""
+
+    cache = InstanceCache(tmp_path)
+    instance = cache.load(1)
+    points = generate_random_points(1)
+
+    assert cache.path(1).exists()
+    assert [(p.x, p.y, p.selected) for p in instance.points] == [
+        (p.x, p.y, p.selected) for p in points
+    ]
+
+    cache.load(2)
+    file_size = cache.path(1).stat().st_size
+    cache.max_bytes = 2 * file_size + file_size // 2
+    os.utime(cache.path(1), (1, 1))
+    os.utime(cache.path(2), (2, 2))
+
+    def generate_random_points_on_miss(seed_value):
+        raise AssertionError(f"seed {seed_value} was generated on a hit")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            instance_cache, "generate_random_points", generate_random_points_on_miss
+        )
+        hit = cache.load(1)
+
+    assert len(hit.points) == len(points)
+    assert cache.path(1).stat().st_mtime > 2
+
+    cache.load(3)
+    assert cache.path(1).exists()
+    assert not cache.path(2).exists()
+    assert cache.path(3).exists()
+
+
+def test_label_size_round_trips(tmp_path):
+    """The label size of a graph, or None for labels of their own sizes, is stored."""
+
+    points = generate_random_points(1, 300, num_selected=60)
+    for graph in (
+        ConflictGraph(points, label_width=60, label_height=20),
+        ConflictGraph(points, label_widths=[40 + label % 30 for label in range(60)]),
+    ):
+        write_instance(tmp_path / "instance.inst", points, graph)
+        instance = CachedInstance(tmp_path / "instance.inst")
+        assert instance.graph.label_size == graph.label_size
@@ -0,0 +1,20 @@
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.local_search_algorithm.multi_start_local_search import (
+    multi_start_local_search,
+)
+
+
+def test_result_does_not_depend_on_the_workers():
+    """One worker and several find the same placement and the same restart records."""
+
+    points = generate_random_points(4, 600, 800, 800, num_selected=200)
+    runs = []
+    for max_workers in (1, 3):
+        stats = Stats()
+        boxes = multi_start_local_search(
+            points, num_restarts=4, master_seed=4, max_workers=max_workers, stats=stats
+        )
+        runs.append(([box.position for box in boxes], stats.records["restarts"]))
+
+    assert runs[0] == runs[1]
@@ -0,0 +1,79 @@
+import random
+from automatic_label_placement.config_reader import *
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.overlap_kernel import candidate_boxes, positions
+from automatic_label_placement.overlap_tracker import OverlapTracker
+
+
+def brute_force_overlaps(point_coordinates, box_coordinates):
+    """Count the overlaps of every box and the total by testing every pair."""
+
+    radius = point_radius
+    label_overlaps = [0] * len(box_coordinates)
+    total = 0
+
+    for index, (x, y) in enumerate(box_coordinates):
+        for px, py in point_coordinates:
+            if (
+                x < px + radius
+                and x + box_width > px - radius
+                and y < py + radius
+                and y + box_height > py - radius
+            ):
+                label_overlaps[index] += 1
+                total += 1
+        for other in range(index + 1, len(box_coordinates)):
+            bx, by = box_coordinates[other]
+            if (
+                x < bx + box_width
+                and x + box_width > bx
+                and y < by + box_height
+                and y + box_height > by
+            ):
+                label_overlaps[index] += 1
+                label_overlaps[other] += 1
+                total += 1
+
+    return label_overlaps, total
+
+
+def test_moves_match_brute_force():
+    """The deltas, the running total and the counters of the boxes agree with a
+    brute-force count after every move of a random walk."""
+
+    rng = random.Random(2)
+    points = generate_random_points(2, 400, 600, 600, num_selected=120)
+    point_coordinates = [(point.x, point.y) for point in points]
+    selected = [point for point in points if point.selected]
+    candidate_xs, candidate_ys = candidate_boxes(
+        [point.x for point in selected],
+        [point.y for point in selected],
+        backend="python",
+    )
+
+    def candidate(label, position):
+        return candidate_xs[label][position], candidate_ys[label][position]
+
+    box_coordinates = [
+        candidate(label, rng.randrange(len(positions)))
+        for label in range(len(selected))
+    ]
+    tracker = OverlapTracker(point_coordinates, box_coordinates)
+    label_overlaps, total = brute_force_overlaps(point_coordinates, box_coordinates)
+    assert total > 0
+    assert tracker.total == total
+    assert list(tracker.label_overlaps) == label_overlaps
+
+    for _ in range(200):
+        label = rng.randrange(len(selected))
+        x, y = candidate(label, rng.randrange(len(positions)))
+        delta = tracker.delta(label, x, y)
+
+        box_coordinates[label] = (x, y)
+        label_overlaps, new_total = brute_force_overlaps(
+            point_coordinates, box_coordinates
+        )
+        assert tracker.move(label, x, y) == new_total
+        assert new_total - total == delta
+        assert list(tracker.label_overlaps) == label_overlaps
+        total = new_total
@@ -0,0 +1,71 @@
+import random
+import pytest
+from automatic_label_placement.budget import Budget
+from automatic_label_placement.solver import solve
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    random_placement,
+)
+from automatic_label_placement.partitioned_solver import halo_margins, repair_seams
+
+
+def test_repair_seams_only_improves_seam_labels():
+    """Seam repair moves only the labels of the seam points, lowers the number of
+    overlaps and leaves no seam label with a cheaper position."""
+
+    points = generate_random_points(8, 1200, 1600, 800, num_selected=300)
+    graph = ConflictGraph(points)
+    rng = random.Random(8)
+    placement = random_placement(graph, rng)
+    before = list(placement)
+
+    # The labels of the points in a band around a vertical seam at x = 800
+    halo_x, halo_y = halo_margins()
+    selected = [index for index, point in enumerate(points) if point.selected]
+    seam_labels = {
+        label
+        for label, index in enumerate(selected)
+        if abs(points[index].x - 800) < halo_x
+    }
+    seam_points = [selected[label] for label in sorted(seam_labels)]
+
+    repair_seams(points, placement, seam_points, halo_x, halo_y, rng)
+
+    assert all(
+        placement[label] == before[label]
+        for label in range(graph.num_labels)
+        if label not in seam_labels
+    )
+    assert graph.total_overlaps(placement) < graph.total_overlaps(before)
+    for label in seam_labels:
+        cost = graph.cost(label, placement[label], placement)
+        assert all(
+            graph.cost(label, position, placement) >= cost
+            for position in graph.valid_positions(label)
+        )
+
+
+def test_solve_with_partition():
+    """solve runs the partitioned solver on request, seeded from its rng, and rejects
+    the options it cannot honour."""
+
+    points = generate_random_points(8, 3000, 3000, 3000, num_selected=600)
+    results = [
+        solve(
+            points,
+            "greedy",
+            partition=True,
+            rng=random.Random(8),
+            width=3000,
+            height=3000,
+        )
+        for _ in range(2)
+    ]
+
+    assert len(results[0].positions) == 600
+    assert results[0].positions == results[1].positions
+    with pytest.raises(ValueError):
+        solve(points, "greedy", partition=True, decompose=True)
+    with pytest.raises(ValueError):
+        solve(points, "greedy", partition=True, budget=Budget(time_limit=1))
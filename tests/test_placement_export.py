@@ -0,0 +1,59 @@
+import random
+import pytest
+from automatic_label_placement.label_placement_utils import (
+    generate_random_points,
+    label_boxes_from_positions,
+    evaluate_placement,
+)
+from automatic_label_placement.placement_export import (
+    PlacementFile,
+    write_placement,
+    write_csv,
+    write_geojson,
+    load_positions,
+)
+from automatic_label_placement.solver import solve
+
+
+@pytest.fixture(scope="module")
+def placement():
+    """A greedy placement of a small generated instance."""
+
+    points = generate_random_points(7, 1000, num_selected=300)
+    return points, solve(points, "greedy", rng=random.Random(7))
+
+
+@pytest.mark.parametrize("suffix", [".alp", ".csv", ".geojson"])
+def test_round_trip(placement, tmp_path, suffix):
+    """An exported placement reads back with the same positions and overlaps."""
+
+    points, result = placement
+    path = tmp_path / f"placement{suffix}"
+    if suffix == ".csv":
+        write_csv(path, points, result)
+    elif suffix == ".geojson":
+        write_geojson(path, points, result)
+    else:
+        write_placement(path, result)
+
+    label_positions = load_positions(path)
+    boxes = label_boxes_from_positions(points, label_positions)
+
+    assert list(label_positions) == list(result.positions)
+    assert evaluate_placement(points, boxes).num_overlaps == result.num_overlaps
+    if suffix == ".alp":
+        assert PlacementFile(path).num_overlaps == result.num_overlaps
+
+
+def test_csv_errors_name_the_file(tmp_path):
+    """An empty csv file and one without a position column are rejected by name."""
+
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    with pytest.raises(ValueError, match="empty.csv is empty"):
+        load_positions(empty)
+
+    other = tmp_path / "other.csv"
+    other.write_text("label,x,y\n0,1,2\n")
+    with pytest.raises(ValueError, match="other.csv has no position column"):
+        load_positions(other)
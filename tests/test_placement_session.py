@@ -0,0 +1,48 @@
+import random
+from automatic_label_placement.label_placement_utils import (
+    Point,
+    generate_random_points,
+    evaluate_placement,
+)
+from automatic_label_placement.placement_session import PlacementSession
+from automatic_label_placement.solver import solve
+
+
+def test_edits_match_a_solve_from_scratch():
+    """After adding, moving and removing points, the session holds the edited points,
+    its running overlap count matches evaluating its placement anew, and the placement
+    is no worse than a greedy solve of the edited points from scratch."""
+
+    rng = random.Random(9)
+    points = generate_random_points(9)
+    session = PlacementSession(
+        points, solve(points, "local_search", rng=random.Random(9)).label_boxes()
+    )
+    edited = {index: Point(p.x, p.y, p.selected) for index, p in enumerate(points)}
+
+    for _ in range(30):
+        x, y = rng.uniform(100, 1900), rng.uniform(100, 1900)
+        selected = rng.random() < 0.5
+        edited[session.add_point(x, y, selected)] = Point(x, y, selected)
+
+        point_id = rng.choice(sorted(edited))
+        x, y = rng.uniform(100, 1900), rng.uniform(100, 1900)
+        session.move_point(point_id, x, y)
+        edited[point_id] = Point(x, y, edited[point_id].selected)
+
+        point_id = rng.choice(sorted(edited))
+        session.remove_point(point_id)
+        del edited[point_id]
+
+    edited_points = [edited[point_id] for point_id in sorted(edited)]
+    result = session.result()
+    boxes = [session.boxes[point_id] for point_id in sorted(session.boxes)]
+    from_scratch = solve(edited_points, "greedy", rng=random.Random(9))
+
+    assert [(p.x, p.y, p.selected) for p in session.point_list()] == [
+        (p.x, p.y, p.selected) for p in edited_points
+    ]
+    assert session.num_overlaps == result.num_overlaps
+    assert evaluate_placement(edited_points, boxes).num_overlaps == result.num_overlaps
+    assert len(result.positions) == len(from_scratch.positions)
+    assert result.num_overlaps <= from_scratch.num_overlaps
@@ -0,0 +1,34 @@
+import random
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    random_placement,
+)
+
+
+def test_deltas_match_total_overlaps():
+    """The constant-time deltas and the running total agree with recounting the
+    whole placement after every move, starting with unplaced labels."""
+
+    points = generate_random_points(3, 600, 800, 800, num_selected=200)
+    graph = ConflictGraph(points, width=800, height=800)
+    rng = random.Random(3)
+
+    placement = random_placement(graph, rng)
+    for label in rng.sample(range(graph.num_labels), 20):
+        placement[label] = -1
+    state = PlacementState(graph, placement)
+    total = graph.total_overlaps(placement)
+    assert state.total == total > 0
+
+    for _ in range(500):
+        label = rng.randrange(graph.num_labels)
+        position = rng.choice(graph.valid_positions(label))
+        delta = state.delta(label, position)
+
+        placement[label] = position
+        new_total = graph.total_overlaps(placement)
+        assert state.move(label, position) == new_total
+        assert new_total - total == delta
+        assert state.placement == placement
+        total = new_total
@@ -0,0 +1,63 @@
+import random
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.conflict_graph import ConflictGraph
+from automatic_label_placement.instrumentation import Stats
+from automatic_label_placement.greedy_algorithm.greedy_algorithm_processor import (
+    priority_greedy_placement,
+)
+
+
+def rescanning_priority_greedy(graph, rng):
+    """The priority greedy placement, rescoring every unplaced label at every step."""
+
+    num_positions = graph.num_positions
+    placement = [-1] * graph.num_labels
+    valid_positions = [
+        graph.valid_positions(label) for label in range(graph.num_labels)
+    ]
+    degrees = [
+        sum(len(graph.neighbours[graph.node(label, p)]) for p in valid_positions[label])
+        for label in range(graph.num_labels)
+    ]
+
+    def priority(label):
+        free = sum(
+            1 for p in valid_positions[label] if graph.cost(label, p, placement) == 0
+        )
+        return (free if free > 0 else num_positions + 1, -degrees[label], label)
+
+    for _ in range(graph.num_labels):
+        unplaced = [label for label in range(graph.num_labels) if placement[label] < 0]
+        label = min(unplaced, key=priority)
+
+        list_tuples = [
+            (
+                p,
+                graph.cost(label, p, placement),
+                sum(
+                    1
+                    for other in graph.neighbours[graph.node(label, p)]
+                    if placement[other // num_positions] < 0
+                ),
+            )
+            for p in valid_positions[label]
+        ]
+        min_value = min(list_tuples, key=lambda x: x[1:])[1:]
+        placement[label] = rng.choice([t for t in list_tuples if t[1:] == min_value])[0]
+
+    return placement
+
+
+def test_lazy_heap_matches_rescanning():
+    """Skipping stale heap entries places the labels as rescoring all of them does."""
+
+    points = generate_random_points(11, 600, 800, 800, num_selected=200)
+    graph = ConflictGraph(points, width=800, height=800)
+    stats = Stats()
+
+    boxes = priority_greedy_placement(graph, stats, rng=random.Random(11))
+
+    assert stats.counters["stale_heap_entries"] > 0
+    assert [box.position for box in boxes] == rescanning_priority_greedy(
+        graph, random.Random(11)
+    )
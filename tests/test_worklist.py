@@ -0,0 +1,50 @@
+import random
+from automatic_label_placement.label_placement_utils import generate_random_points
+from automatic_label_placement.conflict_graph import ConflictGraph, PlacementState
+from automatic_label_placement.local_search_algorithm.local_search_algorithm_processor import (
+    Worklist,
+    move_red_labels,
+    random_placement,
+)
+
+
+def test_labels_are_queued_once_until_examined():
+    """A label is queued once per pass, stays flagged until it is examined and comes
+    back with requeue."""
+
+    worklist = Worklist(6, [4, 1, 4])
+    assert len(worklist) == 2
+
+    assert worklist.take() == [1, 4]
+    worklist.push(4)
+    worklist.push(2)
+    assert len(worklist) == 1
+
+    worklist.examine(4)
+    worklist.push(4)
+    worklist.requeue([1])
+    assert worklist.take() == [1, 2, 4]
+
+
+def test_labels_off_the_worklist_cannot_improve():
+    """After every pass, no conflicting label left off the worklist has a cheaper
+    position, so examining only the queued labels misses no improving move."""
+
+    points = generate_random_points(12, 600, 800, 800, num_selected=200)
+    graph = ConflictGraph(points, width=800, height=800)
+    rng = random.Random(12)
+    state = PlacementState(graph, random_placement(graph, rng))
+    worklist = Worklist(graph.num_labels)
+
+    for _ in range(10):
+        move_red_labels(state, rng, worklist=worklist)
+        assert len(worklist) < graph.num_labels
+
+        for label, current in enumerate(state.placement):
+            if worklist.queued[label]:
+                continue
+            cost = state.cost(label, current)
+            assert all(
+                state.cost(label, position) >= cost
+                for position in graph.valid_positions(label)
+            )